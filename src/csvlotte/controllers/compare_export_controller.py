@@ -2,61 +2,113 @@
 Module for CompareExportController: handles exporting comparison results to CSV files.
 """
 
+from csvlotte.utils.progress import ProgressReporter, ProgressState
 from csvlotte.views.compare_export_view import CompareExportView
-from typing import Any, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Stages of an export: computing a deferred result (summary mode) and writing the rows
+EXPORT_STAGES = [('results', 1), ('export', 1)]
+# Stage of computing a deferred result before the export dialog opens
+BUILD_STAGES = [('results', 1)]
 
 class CompareExportController:
     """
-    Controller to manage exporting of comparison result DataFrames.
+    Controller to manage exporting of comparison results.
     """
-    def __init__(self, parent: Any, dfs: List[Any], result_table_labels: List[str], current_tab: int = 0, default_dir: Optional[str] = None) -> None:
+    def __init__(self, parent: Any, results: List[Any], result_table_labels: List[str], current_tab: int = 0, default_dir: Optional[str] = None,
+                 progress: Optional[Callable[[ProgressState], None]] = None,
+                 lazy_results: Optional[Dict[int, Any]] = None, run_task: Optional[Callable[..., Any]] = None) -> None:
         """
         Initialize the export controller with parent window and data.
 
         Args:
             parent (Any): The parent GUI window.
-            dfs (List[Any]): List of DataFrames to export.
+            results (List[Any]): List of results (RowsResult or None) to export.
             result_table_labels (List[str]): Labels for each result tab.
             current_tab (int): Index of the currently selected tab.
             default_dir (Optional[str]): Default directory for export.
+            progress (Optional[Callable[[ProgressState], None]]): Receives the progress of an export.
+            lazy_results (Optional[Dict[int, Any]]): LazyResults by tab index whose full rows are not
+                built yet (summary mode); only the exported one is built.
+            run_task (Optional[Callable[..., Any]]): Runs an export in the background, called as
+                run_task(stages, work, on_done, on_error, on_cancel); the export runs at once if None.
         """
         self.parent = parent
-        self.dfs = dfs
+        self.results = results
         self.result_table_labels = result_table_labels
         self.current_tab = current_tab
         self.default_dir = default_dir
+        self.progress = progress
+        self.lazy_results = lazy_results or {}
+        self.run_task = run_task
 
     def open_export_dialog(self) -> None:
         """
         Open the export dialog window for user to select export options.
+
+        The columns of a deferred result (e.g. which value columns the changed rows have) are only
+        known once it is computed, so an unbuilt result of the current tab is built first, with
+        progress, and the dialog opens when it is done.
         """
-        # Bestimme den aktuellen Tab und zugehörigen DataFrame
-        df = self.dfs[self.current_tab] if self.dfs and self.dfs[self.current_tab] is not None else None
-        if df is None or df.empty:
+        lazy = self.lazy_results.get(self.current_tab)
+        if lazy is not None and not lazy.is_built:
+            from tkinter import messagebox
+            run = self.run_task or self._run_inline
+            run(BUILD_STAGES, lambda reporter: lazy.result(reporter.fraction_callback('results')),
+                self._show_dialog, lambda error: messagebox.showerror('Fehler', str(error)), lambda: None)
+            return
+        # Bestimme den aktuellen Tab und zugehöriges Ergebnis
+        result = lazy.result() if lazy is not None else self.results[self.current_tab] if self.results else None
+        self._show_dialog(result)
+
+    def _show_dialog(self, result: Any) -> None:
+        """Show the export dialog with the columns of the current tab's (full) result."""
+        if result is None or result.empty:
             from tkinter import messagebox
             messagebox.showerror('Fehler', 'Kein Ergebnis zum Exportieren!')
             return
-        CompareExportView(self.parent, self, self.dfs, self.result_table_labels, self.current_tab, self.default_dir)
+        results = list(self.results)
+        results[self.current_tab] = result
+        CompareExportView(self.parent, self, results, self.result_table_labels, self.current_tab, self.default_dir)
 
-    def export_result(self, idx: int, exclude_columns: Optional[List[str]], out_path: str, sep: str = ';', encoding: str = 'latin1') -> Tuple[bool, Optional[str]]:
+    def export_result(self, idx: int, exclude_columns: Optional[List[str]], out_path: str, sep: str = ';', encoding: str = 'latin1',
+                      on_finished: Optional[Callable[[bool, Optional[str]], None]] = None) -> None:
         """
-        Export the selected DataFrame to a CSV file.
+        Export the selected result to a CSV file; rows are built and written in chunks.
+
+        A deferred result of the summary mode is computed first. With run_task both happen in
+        the background and on_finished is called once the export has ended (also when it was cancelled).
 
         Args:
-            idx (int): Index of the DataFrame to export.
+            idx (int): Index of the result to export.
             exclude_columns (Optional[List[str]]): Columns to exclude.
             out_path (str): Path to save the CSV file.
             sep (str, optional): CSV separator. Defaults to ';'.
             encoding (str, optional): File encoding. Defaults to 'latin1'.
-
-        Returns:
-            Tuple[bool, Optional[str]]: (success flag, error message if failed).
+            on_finished (Optional[Callable[[bool, Optional[str]], None]]): Receives (success flag, error message if failed).
         """
+        lazy = self.lazy_results.get(idx)
+        finished = on_finished or (lambda success, error: None)
+
+        def work(reporter: ProgressReporter) -> None:
+            result = lazy.result(reporter.fraction_callback('results')) if lazy is not None else self.results[idx]
+            reporter.start('export', total=len(result))
+            result.to_csv(out_path, sep=sep, encoding=encoding, exclude_columns=exclude_columns or (),
+                          progress=reporter.update)
+
+        run = self.run_task or self._run_inline
+        run(EXPORT_STAGES, work, lambda _: finished(True, None), lambda error: finished(False, str(error)),
+            lambda: finished(False, None))
+
+    def _run_inline(self, stages: Sequence[Tuple[str, float]], work: Callable[[ProgressReporter], Any],
+                    on_done: Callable[[Any], None], on_error: Callable[[Exception], None],
+                    on_cancel: Callable[[], None]) -> None:
+        """Run an export at once, reporting its progress to self.progress."""
+        reporter = ProgressReporter(self.progress or (lambda state: None), stages)
         try:
-            df_export = self.dfs[idx]
-            if exclude_columns:
-                df_export = df_export.drop(columns=exclude_columns)
-            df_export.to_csv(out_path, sep=sep, encoding=encoding, index=False)
-            return True, None
+            outcome = work(reporter)
+            reporter.finish()
         except Exception as e:
-            return False, str(e)
+            on_error(e)
+            return
+        on_done(outcome)
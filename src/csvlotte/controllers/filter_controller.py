@@ -1,12 +1,23 @@
 """
 Module for filtering DataFrames using SQL-like WHERE conditions and exporting filtered results.
 """
+import numpy as np
 import pandas as pd
-from typing import List, Any
+from typing import List, Any, Optional, Tuple
+
+from csvlotte.utils.helpers import declare_date_columns, declared_date_columns, filter_namespace, sql_where_to_pandas
+from csvlotte.utils.result import RowsResult
+
+# Rows a filter is tried on while it is typed; its match count is extrapolated to all rows
+PREVIEW_SAMPLE_ROWS = 20_000
 
 class FilterController:
     """
     Controller to apply SQL-like filter expressions to a pandas DataFrame and manage the filtered data.
+
+    A filter is kept as a boolean mask over the rows instead of a copy of the matching rows:
+    the number of matches is the sum of the mask, the table shows the rows through their
+    positions, and the filtered DataFrame is only built when it is asked for (e.g. to export).
     """
 
     def __init__(self, df: pd.DataFrame) -> None:
@@ -17,18 +28,48 @@ class FilterController:
             df (pd.DataFrame): The DataFrame to be filtered.
         """
         self.df = df
+        # Rows matching the current filter; None if no filter is applied (all rows)
+        self.mask: Optional[np.ndarray] = None
         self.df_filtered = df
-        
+        # Fixed random sample for previews, drawn on first use
+        self._preview_sample: Optional[pd.DataFrame] = None
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows matching the current filter, counted from the mask."""
+        if self.df is None:
+            return 0
+        if self.mask is None:
+            return len(self.df)
+        return int(self.mask.sum())
+
     def get_filtered(self) -> pd.DataFrame:
         """
-        Return the currently filtered DataFrame.
+        Return the currently filtered DataFrame, building it from the mask on first use.
 
         Returns:
             pd.DataFrame: The filtered DataFrame (might be original DataFrame if no filter applied).
         """
+        if self.df_filtered is None and self.df is not None:
+            self.df_filtered = self.df[self.mask]
+            # The filtered rows stay declared as dates and keep their parsed values
+            declare_date_columns(self.df_filtered, declared_date_columns(self.df), parsed_from=self.df)
         return self.df_filtered
 
-    def apply_filter(self, filter_str: str) -> pd.DataFrame:
+    def get_rows_result(self) -> Optional[RowsResult]:
+        """
+        Return the filtered rows as positions into the DataFrame, without copying them.
+
+        Returns:
+            Optional[RowsResult]: The matching rows, or None if there is no DataFrame.
+        """
+        if self.df is None:
+            return None
+        if self.mask is None:
+            return RowsResult(self.df)
+        return RowsResult(self.df, np.flatnonzero(self.mask))
+
+    def apply_filter(self, filter_str: str) -> int:
         """
         Apply a SQL-like WHERE filter string to the DataFrame.
 
@@ -36,24 +77,71 @@ class FilterController:
             filter_str (str): SQL-like WHERE condition (e.g., "col1 = 'value' AND col2 > 10").
 
         Returns:
-            pd.DataFrame: The filtered DataFrame. On error, returns the original DataFrame.
+            int: The number of matching rows.
+
+        Raises:
+            Exception: If the filter cannot be evaluated; the current filter is kept then.
         """
         if self.df is None or self.df.empty or not filter_str:
+            self.mask = None
             self.df_filtered = self.df
-            return self.df
-        try:
-            from csvlotte.utils.helpers import sql_where_to_pandas
-            pandas_expr = sql_where_to_pandas(filter_str)
-            # Use only query() for filtering - never eval() to avoid assignment operations
-            # Make DataFrame available as 'df' for @df references in query
+            return self.row_count
+        self.mask = self.filter_mask(filter_str)
+        self.df_filtered = None
+        return self.row_count
+
+    def filter_mask(self, filter_str: str, df: Optional[pd.DataFrame] = None) -> np.ndarray:
+        """
+        Evaluate a SQL-like WHERE filter string to a boolean mask over the rows.
+
+        Args:
+            filter_str (str): SQL-like WHERE condition.
+            df (Optional[pd.DataFrame]): Rows to evaluate the filter on; defaults to the whole DataFrame.
+
+        Returns:
+            np.ndarray: True for every matching row.
+
+        Raises:
+            ValueError: If the expression does not evaluate to one boolean per row.
+        """
+        if df is None:
             df = self.df
-            self.df_filtered = self.df.query(pandas_expr, engine="python", local_dict={'df': df})
-        except Exception as e:
-            # Log the error for debugging purposes
-            print(f"Filter error: {e}")
-            # Return original DataFrame on any error
-            self.df_filtered = self.df
-        return self.df_filtered
+        # Date columns are declared on the loaded DataFrame, also for a preview on a sample of it
+        pandas_expr = sql_where_to_pandas(filter_str, date_columns=declared_date_columns(self.df))
+        # Evaluated like query() does, but without copying the matching rows; eval() on a
+        # DataFrame never assigns in place, an assignment only yields a (rejected) new frame.
+        # The namespace provides 'df' for @df references and 'to_date' for DATE comparisons
+        result = df.eval(pandas_expr, engine="python", local_dict=filter_namespace(df))
+        if not isinstance(result, pd.Series) or not pd.api.types.is_bool_dtype(result) or len(result) != len(df):
+            raise ValueError('Der Filter ergibt keine Bedingung je Zeile.')
+        return result.to_numpy(dtype=bool, na_value=False)
+
+    def estimate_matches(self, filter_str: str, sample_rows: int = PREVIEW_SAMPLE_ROWS) -> Tuple[int, bool]:
+        """
+        Estimate the number of rows matching a filter from a fixed sample of the DataFrame,
+        without changing the current filter. Errors in the filter are raised, not swallowed.
+
+        Args:
+            filter_str (str): SQL-like WHERE condition.
+            sample_rows (int): Size of the sample; smaller DataFrames are evaluated completely.
+
+        Returns:
+            Tuple[int, bool]: The (extrapolated) number of matches, and whether it is exact.
+        """
+        if self.df is None or self.df.empty:
+            return 0, True
+        if self._preview_sample is None or len(self._preview_sample) != min(sample_rows, len(self.df)):
+            if len(self.df) <= sample_rows:
+                self._preview_sample = self.df
+            else:
+                # Drawn evenly over all rows (fixed seed), so the share of matches carries over
+                positions = np.random.default_rng(0).choice(len(self.df), sample_rows, replace=False)
+                self._preview_sample = self.df.iloc[np.sort(positions)]
+                declare_date_columns(self._preview_sample, declared_date_columns(self.df), parsed_from=self.df)
+        matches = int(self.filter_mask(filter_str, self._preview_sample).sum())
+        if self._preview_sample is self.df:
+            return matches, True
+        return round(matches * len(self.df) / len(self._preview_sample)), False
 
     def get_columns(self) -> List[str]:
         """
@@ -62,8 +150,8 @@ class FilterController:
         Returns:
             List[str]: List of column names if data exists, otherwise empty.
         """
-        if self.df_filtered is not None and not self.df_filtered.empty:
-            return list(self.df_filtered.columns)
+        if self.df is not None and self.row_count:
+            return list(self.df.columns)
         return []
 
     def get_rows(self) -> List[List[Any]]:
@@ -73,8 +161,8 @@ class FilterController:
         Returns:
             List[List[Any]]: List of rows, where each row is a list of values.
         """
-        if self.df_filtered is not None and not self.df_filtered.empty:
-            return self.df_filtered.values.tolist()
+        if self.df is not None and self.row_count:
+            return self.get_filtered().values.tolist()
         return []
 
     def export_filtered(self, path: str, sep: str = ';', encoding: str = 'latin1') -> bool:
@@ -89,7 +177,7 @@ class FilterController:
         Returns:
             bool: True if export succeeded, False otherwise.
         """
-        if self.df_filtered is not None and not self.df_filtered.empty:
-            self.df_filtered.to_csv(path, sep=sep, encoding=encoding, index=False)
+        if self.df is not None and self.row_count:
+            self.get_filtered().to_csv(path, sep=sep, encoding=encoding, index=False)
             return True
         return False
@@ -3,9 +3,41 @@ Module for HomeController: handles loading CSV files, applying filters, comparin
 """
 
 from csvlotte.views.home_view import HomeView
+from csvlotte.utils.asymmetric_compare import asymmetric_compare_keys, asymmetric_file_compare, is_asymmetric
+from csvlotte.utils.background import BackgroundTask
+from csvlotte.utils.compare import (
+    keys_are_sorted, merge_compare_keys, multiset_compare, parse_slice,
+)
+from csvlotte.utils.diff import changed_cells, diff_rows
+from csvlotte.utils.external_compare import CsvSource, NotSortedError, partitioned_compare, sorted_merge_compare
+from csvlotte.utils.fuzzy import fuzzy_match, key_text
+from csvlotte.utils.helpers import declare_date_columns, filter_namespace, sql_where_to_pandas
+from csvlotte.utils.incremental_compare import ProbeCache, cached_compare_keys
+from csvlotte.utils.normalize import KeyCache
+from csvlotte.utils.parallel_compare import parallel_compare_keys
+from csvlotte.utils.progress import ProgressReporter
+from csvlotte.utils.result import LazyResult, RowsResult
+from csvlotte.utils.result_cache import ResultCache, file_fingerprint, rows_fingerprint
+import os
 import pandas as pd
 from tkinter import filedialog, messagebox, ttk
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Files above this size are only previewed and compared out-of-core
+LARGE_FILE_BYTES = 1024 ** 3
+# Number of rows loaded as preview of a large file
+PREVIEW_ROWS = 10_000
+# Files above this size are read in chunks, so the progress of loading them can be shown
+LOAD_PROGRESS_BYTES = 32 * 1024 ** 2
+# Rows read at once while loading a file in chunks
+LOAD_CHUNK_ROWS = 200_000
+# Stages of loading a file and of a compare, with their share of the total time
+LOAD_STAGES = [('load', 4), ('filter', 1)]
+COMPARE_STAGES = [('keys', 2), ('compare', 3), ('results', 1)]
+OUT_OF_CORE_STAGES = [('compare', 1)]
+MATERIALIZE_STAGES = [('results', 1)]
+# Rows shown per result tab in the summary mode before the tab is opened
+SUMMARY_SAMPLE_ROWS = 100
 
 class HomeController:
     """
@@ -19,108 +51,132 @@ class HomeController:
             root (Any): The root Tkinter window or parent widget.
         """
         self.view = HomeView(root, self)
+        # Sliced and normalised key columns, reused by repeated compares
+        self.key_cache = KeyCache()
+        # Encoded key codes per file, so a re-compare only encodes the file that changed
+        self.probe_cache = ProbeCache()
+        # Partitions of recent compares, keyed by file fingerprints and compare settings
+        self.result_cache = ResultCache()
+        # Flags and mismatch counts of the changed rows of the shown compare, once computed
+        self._diff: Dict[str, Any] = {}
+        # Running background compare; False runs compares inline (e.g. for scripting and tests)
+        self.task: Optional[BackgroundTask] = None
+        self.run_in_background = True
 
     def load_file(self, file_num: int) -> None:
         """
         Open file dialog and load the specified CSV file into the view, applying optional filters.
         :param file_num: 1 for file1, 2 for file2
         """
+        if self.task is not None:
+            return
         path = filedialog.askopenfilename(filetypes=[('CSV files', '*.csv')])
         if not path:
             return
-        if file_num == 1:
-            self.view.file1_path = path
-            self.view.file1_label.config(text=path)
-            self.view.file1_info_btn.config(state='normal')
-            self.view.file1_reload_btn.config(state='normal')
-            delim = self.view.delim_var1.get() if self.view.delim_var1.get() else ';'
-            encoding = self.view.encoding_var1.get() if self.view.encoding_var1.get() else 'latin1'
-            try:
-                df = pd.read_csv(path, sep=delim, encoding=encoding)
-                self.view.df1 = df
-            except Exception as e:
-                messagebox.showerror('Fehler', f'Datei 1 konnte nicht geladen werden:\n{e}')
-                self.view.df1 = None
-            if self.view.df1 is not None:
-                filter_str = self.view.filter1_var.get().strip()
-                if filter_str:
-                    try:
-                        self.view.df1 = self.view.df1.query(filter_str)
-                    except Exception as e:
-                        messagebox.showerror('Fehler', f'Filter für Datei 1 ungültig:\n{e}')
-        else:
-            self.view.file2_path = path
-            self.view.file2_label.config(text=path)
-            self.view.file2_info_btn.config(state='normal')
-            self.view.file2_reload_btn.config(state='normal')
-            delim = self.view.delim_var2.get() if self.view.delim_var2.get() else ';'
-            encoding = self.view.encoding_var2.get() if self.view.encoding_var2.get() else 'latin1'
-            try:
-                df = pd.read_csv(path, sep=delim, encoding=encoding)
-                self.view.df2 = df
-            except Exception as e:
-                messagebox.showerror('Fehler', f'Datei 2 konnte nicht geladen werden:\n{e}')
-                self.view.df2 = None
-            if self.view.df2 is not None:
-                filter_str = self.view.filter2_var.get().strip()
-                if filter_str:
-                    try:
-                        self.view.df2 = self.view.df2.query(filter_str)
-                    except Exception as e:
-                        messagebox.showerror('Fehler', f'Filter für Datei 2 ungültig:\n{e}')
-        self.update_columns()
-        self.enable_compare_btn()
-        self.update_tab_labels()
-        self.view.update_filter_buttons()
+        self._load_in_background(file_num, path)
 
     def reload_file(self, file_num: int) -> None:
         """
         Reload the specified CSV file (e.g., after changing delimiter or encoding) and reapply filters.
         :param file_num: 1 for file1, 2 for file2
         """
-        if file_num == 1:
-            path = self.view.file1_path
-            delim = self.view.delim_var1.get() if self.view.delim_var1.get() else ';'
-            encoding = self.view.encoding_var1.get() if self.view.encoding_var1.get() else 'latin1'
-            filter_var = self.view.filter1_var
-            df_attr = 'df1'
-            error_msg = 'Fehler', 'Datei 1 konnte nicht geladen werden:\n{}'
-            filter_error_msg = 'Fehler', 'Filter für Datei 1 ungültig:\n{}'
-        else:
-            path = self.view.file2_path
-            delim = self.view.delim_var2.get() if self.view.delim_var2.get() else ';'
-            encoding = self.view.encoding_var2.get() if self.view.encoding_var2.get() else 'latin1'
-            filter_var = self.view.filter2_var
-            df_attr = 'df2'
-            error_msg = 'Fehler', 'Datei 2 konnte nicht geladen werden:\n{}'
-            filter_error_msg = 'Fehler', 'Filter für Datei 2 ungültig:\n{}'
-
-        if path:
+        path = self.view.file1_path if file_num == 1 else self.view.file2_path
+        if path and self.task is None:
+            self._load_in_background(file_num, path)
+
+    def _load_in_background(self, file_num: int, path: str) -> None:
+        """
+        Read a CSV file and apply its filter in the background, then show it in the view.
+
+        The delimiter, encoding, filter and date columns are read from the view on the Tk thread; the
+        worker only reads and filters the file and parses the declared date columns once, so the window
+        keeps responding and Cancel works while a large file loads. The path, DataFrame and fingerprint
+        of the file are only replaced once the load has finished, so a cancelled load, or a new file
+        that cannot be read, leaves the loaded file as it was; a reload that fails leaves no data.
+        An invalid filter is reported and leaves the file unfiltered.
+        """
+        delim_var, encoding_var, filter_var = (
+            (self.view.delim_var1, self.view.encoding_var1, self.view.filter1_var) if file_num == 1
+            else (self.view.delim_var2, self.view.encoding_var2, self.view.filter2_var))
+        delim = delim_var.get() if delim_var.get() else ';'
+        encoding = encoding_var.get() if encoding_var.get() else 'latin1'
+        filter_str = filter_var.get().strip()
+        date_columns = self.view.get_date_columns(file_num)
+
+        def work(reporter: ProgressReporter) -> Tuple[pd.DataFrame, bool, Any, Optional[Exception]]:
+            df, preview_only = self._read_csv(path, delim, encoding, reporter)
+            fingerprint = file_fingerprint(path, delim, encoding)
+            filter_error = None
             try:
-                df = pd.read_csv(path, sep=delim, encoding=encoding)
-                setattr(self.view, df_attr, df)
-            except Exception as e:
-                messagebox.showerror(*error_msg[:1], error_msg[1].format(e))
-                setattr(self.view, df_attr, None)
-            if getattr(self.view, df_attr) is not None:
-                filter_str = filter_var.get().strip()
-                if filter_str:
-                    try:
-                        from csvlotte.utils.helpers import sql_where_to_pandas
-                        pandas_expr = sql_where_to_pandas(filter_str)
-                        try:
-                            df = getattr(self.view, df_attr)
-                            setattr(self.view, df_attr, df.query(pandas_expr, engine="python", local_dict={'df': df}))
-                        except Exception:
-                            df = getattr(self.view, df_attr)
-                            setattr(self.view, df_attr, df.eval(pandas_expr))
-                    except Exception as e:
-                        messagebox.showerror(*filter_error_msg[:1], filter_error_msg[1].format(e))
+                declare_date_columns(df, date_columns)
+            except ValueError as e:
+                filter_error = e
+            if filter_str and filter_error is None:
+                reporter.start('filter', total=len(df))
+                try:
+                    filtered = df.query(sql_where_to_pandas(filter_str, date_columns=date_columns),
+                                        engine="python", local_dict=filter_namespace(df))
+                    # The filtered rows keep the dates parsed above
+                    declare_date_columns(filtered, date_columns, parsed_from=df)
+                    df = filtered
+                except Exception as e:
+                    filter_error = e
+            return df, preview_only, fingerprint, filter_error
+
+        def show(df: Optional[pd.DataFrame], preview_only: bool, fingerprint: Any) -> None:
+            setattr(self.view, f'df{file_num}', df)
+            setattr(self.view, f'file{file_num}_preview_only', preview_only)
+            setattr(self.view, f'file{file_num}_fingerprint', fingerprint)
             self.update_columns()
             self.enable_compare_btn()
             self.update_tab_labels()
             self.view.update_filter_buttons()
 
+        def done(outcome: Tuple[pd.DataFrame, bool, Any, Optional[Exception]]) -> None:
+            df, preview_only, fingerprint, filter_error = outcome
+            setattr(self.view, f'file{file_num}_path', path)
+            getattr(self.view, f'file{file_num}_label').config(text=path)
+            getattr(self.view, f'file{file_num}_info_btn').config(state='normal')
+            getattr(self.view, f'file{file_num}_reload_btn').config(state='normal')
+            show(df, preview_only, fingerprint)
+            if filter_error is not None:
+                messagebox.showerror('Fehler', f'Filter für Datei {file_num} ungültig:\n{filter_error}')
+
+        def failed(error: Exception) -> None:
+            messagebox.showerror('Fehler', f'Datei {file_num} konnte nicht geladen werden:\n{error}')
+            if getattr(self.view, f'file{file_num}_path') == path:
+                # The loaded data no longer matches the delimiter or encoding of the reload
+                show(None, False, None)
+
+        self._start_task(LOAD_STAGES, work, done, failed)
+
+    def _read_csv(self, path: str, delim: str, encoding: str,
+                  reporter: Optional[ProgressReporter] = None) -> Tuple[pd.DataFrame, bool]:
+        """
+        Read a CSV file. Files larger than LARGE_FILE_BYTES are only
+        previewed (first PREVIEW_ROWS rows) and compared out-of-core; files larger than
+        LOAD_PROGRESS_BYTES are read in chunks and report the bytes read to the reporter.
+
+        Returns:
+            Tuple[pd.DataFrame, bool]: The DataFrame and whether it is only a preview.
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        if reporter:
+            reporter.start('load', total=size, unit='bytes')
+        if size > LARGE_FILE_BYTES:
+            return pd.read_csv(path, sep=delim, encoding=encoding, nrows=PREVIEW_ROWS), True
+        if reporter and size > LOAD_PROGRESS_BYTES:
+            chunks = []
+            with open(path, 'rb') as f:
+                for chunk in pd.read_csv(f, sep=delim, encoding=encoding, chunksize=LOAD_CHUNK_ROWS):
+                    chunks.append(chunk)
+                    reporter.update(f.tell())
+            return pd.concat(chunks, ignore_index=True), False
+        return pd.read_csv(path, sep=delim, encoding=encoding), False
+
     def show_file_info(self, file_num: int) -> None:
         """
         Display information (size, rows, columns) for the selected CSV file in a message box.
@@ -129,18 +185,20 @@ class HomeController:
         if file_num == 1:
             file_path = self.view.file1_path
             df = self.view.df1
+            preview_only = self.view.file1_preview_only
             title = 'Info Datei 1'
         else:
             file_path = self.view.file2_path
             df = self.view.df2
+            preview_only = self.view.file2_preview_only
             title = 'Info Datei 2'
         if file_path and df is not None:
-            import os
             try:
                 size_kb = os.path.getsize(file_path) / 1024
             except Exception:
                 size_kb = 0
-            info = f"Datei: {file_path}\nGröße: {size_kb:.1f} kB\nZeilen: {len(df)}\nSpalten: {len(df.columns)}"
+            rows = f"{len(df)} (Vorschau)" if preview_only else f"{len(df)}"
+            info = f"Datei: {file_path}\nGröße: {size_kb:.1f} kB\nZeilen: {rows}\nSpalten: {len(df.columns)}"
             messagebox.showinfo(title, info)
 
     def open_filter_window(self, file_num: int) -> None:
@@ -153,84 +211,183 @@ class HomeController:
         else:
             self.view.open_filter_window(2)
 
-    def compare_csvs(self) -> None:
+    def _get_compare_spec(self) -> Optional[Tuple[List[str], List[str], Optional[slice], Optional[slice]]]:
         """
-        Compare the selected columns from both CSVs, update progress bar, and prepare results for export.
+        Validate the compare settings in the view and show an error if they are incomplete.
+
+        Returns:
+            Optional[Tuple[List[str], List[str], Optional[slice], Optional[slice]]]:
+                Key columns of both files and their parsed slices, or None if invalid.
         """
         col1 = self.view.column_combo1.get()
         col2 = self.view.column_combo2.get()
         if not col1 or not col2:
             messagebox.showerror('Fehler', 'Bitte Vergleichsspalten auswählen!')
-            return
+            return None
         if self.view.df1 is None or self.view.df2 is None:
             messagebox.showerror('Fehler', 'Bitte beide CSV-Dateien laden!')
+            return None
+        extra1 = self.view.get_extra_key_columns(1)
+        extra2 = self.view.get_extra_key_columns(2)
+        if len(extra1) != len(extra2):
+            messagebox.showerror('Fehler', 'Bitte für beide Dateien gleich viele weitere Schlüsselspalten auswählen!')
+            return None
+        try:
+            slice1 = parse_slice(self.view.col1_text_var.get())
+        except ValueError as e:
+            messagebox.showerror('Fehler', f'Slice für Datei 1 ungültig:\n{e}')
+            return None
+        try:
+            slice2 = parse_slice(self.view.col2_text_var.get())
+        except ValueError as e:
+            messagebox.showerror('Fehler', f'Slice für Datei 2 ungültig:\n{e}')
+            return None
+        return [col1] + extra1, [col2] + extra2, slice1, slice2
+
+    def compare_csvs(self) -> None:
+        """
+        Compare the selected columns from both CSVs in the background and show the results when done.
+
+        The settings are read from the view here; slicing, hashing, partitioning and building the
+        results run in a worker (see _compare_results), and the results replace the shown ones at
+        once in _show_compare_results, so a cancelled or failed run leaves the tabs unchanged.
+        """
+        if self.task is not None:
+            return
+        spec = self._get_compare_spec()
+        if spec is None:
+            return
+        if self.view.file1_preview_only or self.view.file2_preview_only:
+            # Large files are only previewed in memory and must be compared from disk
+            self.compare_csvs_out_of_core()
             return
-        slice1_str = self.view.col1_text_var.get().strip()
-        slice2_str = self.view.col2_text_var.get().strip()
-        def apply_slice(series, slice_str):
-            if not slice_str:
-                return series
+        key_columns1, key_columns2, slice1, slice2 = spec
+        threshold = None
+        if self.view.fuzzy_var.get():
             try:
-                # Unterstützt vollständige Python-Slice-Syntax [start:stop:step]
-                def do_slice(val):
-                    try:
-                        # Splitte in bis zu 3 Teile (start, stop, step)
-                        parts = (slice_str + '::').split(':')[:3]
-                        # Leere Strings zu None, sonst int
-                        args = [int(x) if x.strip() else None for x in parts]
-                        return val[slice(*args)]
-                    except Exception:
-                        return val
-                return series.astype(str).apply(do_slice)
-            except Exception:
-                return series
-        self.view.progress.configure(style="Horizontal.TProgressbar")
-        self.view.progress['value'] = 0
-        self.view.progress.update_idletasks()
-        series1 = self.view.df1[col1]
-        series2 = self.view.df2[col2]
-        if slice1_str:
-            series1 = apply_slice(series1, slice1_str)
-        if slice2_str:
-            series2 = apply_slice(series2, slice2_str)
-        set1 = set(series1)
-        self.view.progress['value'] = 20
-        self.view.progress.update_idletasks()
-        set2 = set(series2)
-        self.view.progress['value'] = 40
-        self.view.progress.update_idletasks()
-        common = set1 & set2
-        self.view.progress['value'] = 60
-        self.view.progress.update_idletasks()
-        only1 = set1 - set2
-        only2 = set2 - set1
-        self.view.progress['value'] = 70
-        self.view.progress.update_idletasks()
-        mask1 = series1.isin(only1)
-        mask_common1 = series1.isin(common)
-        mask_common2 = series2.isin(common)
-        mask2 = series2.isin(only2)
-        df_only1 = self.view.df1[mask1]
-        self.view.progress['value'] = 80
-        self.view.progress.update_idletasks()
-        df_common1 = self.view.df1[mask_common1]
-        df_common2 = self.view.df2[mask_common2]
-        self.view.progress['value'] = 90
-        self.view.progress.update_idletasks()
-        df_only2 = self.view.df2[mask2]
-        self.view.progress['value'] = 95
-        self.view.progress.update_idletasks()
-        dfs = [df_only1, df_common1, df_common2, df_only2]
-        self.view._result_dfs = dfs
+                threshold = float(self.view.fuzzy_threshold_var.get().replace(',', '.'))
+            except ValueError:
+                threshold = -1.0
+            if not 0.0 < threshold <= 1.0:
+                messagebox.showerror('Fehler', 'Die Ähnlichkeitsschwelle muss zwischen 0 und 1 liegen!')
+                return
+        # Tk variables must not be read from the worker, so all settings are collected here
+        transforms = self.view.get_normalization()
+        multiset = bool(self.view.multiset_var.get())
+        parallel = bool(self.view.parallel_var.get())
+        summary = bool(self.view.summary_var.get())
+        persist = bool(self.view.cache_var.get())
+        cache_key = self._compare_cache_key(key_columns1, key_columns2, slice1, slice2, transforms, multiset)
+        df1, df2 = self.view.df1, self.view.df2
+        # Mismatch counts of the changed rows of this run, shown once the run is taken over
+        diff: Dict[str, Any] = {}
+
+        def work(reporter: ProgressReporter) -> Tuple[List[Optional[LazyResult]], List[Any], Dict[int, LazyResult]]:
+            return self._compare_results(reporter, df1, df2, key_columns1, key_columns2, slice1, slice2, transforms,
+                                         multiset, parallel, threshold, summary, cache_key, persist, diff)
+
+        self._start_task(COMPARE_STAGES, work, lambda outcome: self._show_compare_results(outcome, summary, diff))
+
+    def _compare_results(self, reporter: ProgressReporter, df1: pd.DataFrame, df2: pd.DataFrame,
+                         key_columns1: List[str], key_columns2: List[str], slice1: Optional[slice],
+                         slice2: Optional[slice], transforms: List[str], multiset: bool, parallel: bool,
+                         threshold: Optional[float], summary: bool, cache_key: Optional[Tuple[Any, ...]],
+                         persist: bool, diff: Dict[str, Any]
+                         ) -> Tuple[List[Optional[LazyResult]], List[Any], Dict[int, LazyResult]]:
+        """
+        Run the compare pipeline (worker thread): prepare the keys, classify the rows and build the results.
+
+        Must not touch any widget; progress goes to the reporter, whose reports are also the
+        points where a cancelled compare stops.
+
+        Returns:
+            Tuple[List[Optional[LazyResult]], List[Any], Dict[int, LazyResult]]: All results, the
+            results to show per tab and the results only shown as a sample until their tab is opened.
+        """
+        reporter.start('keys', total=len(df1) + len(df2))
+        # The slice applies to the main comparison column, the normalisation to all key columns
+        keys1 = [self.key_cache.get(df1, col, slice1 if i == 0 else None, transforms)
+                 for i, col in enumerate(key_columns1)]
+        reporter.update(len(df1))
+        keys2 = [self.key_cache.get(df2, col, slice2 if i == 0 else None, transforms)
+                 for i, col in enumerate(key_columns2)]
+        reporter.update(len(df1) + len(df2))
+        compare_progress = reporter.fraction_callback('compare', total=len(df1) + len(df2))
+        cached = self.result_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            # Unchanged files and settings: the stored partitions are reused without comparing again
+            partitions, count_differences, duplicates = cached
+        else:
+            partitions, count_differences, duplicates = self._compare_partitions(keys1, keys2, multiset, parallel,
+                                                                                 compare_progress)
+            if cache_key is not None:
+                self.result_cache.put(cache_key, (partitions, count_differences, duplicates), persist=persist)
+        only1, common1, common2, only2 = partitions
+        reporter.update(len(df1) + len(df2))
+        results: List[Optional[LazyResult]] = [
+            LazyResult.rows(df1, only1),
+            LazyResult.rows(df1, common1),
+            LazyResult.rows(df2, common2),
+            LazyResult.rows(df2, only2),
+            # Rows with a matching key whose other columns differ
+            LazyResult(lambda progress=None: self._changed_rows(df1, df2, keys1, keys2, key_columns1, key_columns2,
+                                                                diff, progress)),
+        ]
+        if count_differences is not None:
+            results += [
+                LazyResult.frame(count_differences),
+                LazyResult.rows(df1, duplicates[0]),
+                LazyResult.rows(df2, duplicates[1]),
+            ]
+        else:
+            results += [None, None, None]
+        if threshold is not None:
+            # Probable matches among the keys that found no exact partner; scoring them is slow, so
+            # it is deferred like the changed rows and reports its progress per batch
+            results.append(LazyResult(lambda progress=None: RowsResult(fuzzy_match(
+                key_text(keys1).iloc[only1], key_text(keys2).iloc[only2], threshold, progress=progress))))
+        else:
+            results.append(None)
+        if summary:
+            # Only counts and samples; deferred results are computed when a tab is opened or exported
+            shown = [result.sample(SUMMARY_SAMPLE_ROWS) if result else None for result in results]
+            # Tabs show only the sample until they are opened, even for results that are already known
+            lazy = {i: result for i, result in enumerate(results)
+                    if result and (not result.is_built or result.count > SUMMARY_SAMPLE_ROWS)}
+            return results, shown, lazy
+        # Results hold row positions into df1/df2; rows are only built for display and export
+        # Building the changed rows is the costly part; progress is counted per result and
+        # reported within the changed rows while they are computed
+        reporter.start('results', total=len(results), unit='results')
+        shown = []
+        for i, result in enumerate(results):
+            shown.append(result.result(lambda fraction, i=i: reporter.set_fraction((i + fraction) / len(results)))
+                         if result else None)
+            reporter.update(i + 1)
+        return results, shown, {}
+
+    def _show_compare_results(self, outcome: Tuple[List[Optional[LazyResult]], List[Any], Dict[int, LazyResult]],
+                              summary: bool, diff: Dict[str, Any]) -> None:
+        """
+        Take over the results of a finished compare: all tabs switch to the new results at once.
+        """
+        results, shown, lazy = outcome
+        self.view._results = shown
+        self.view._lazy_results = lazy
+        self._diff = diff
+        if summary:
+            self.view.show_diff_summary(None)
+        else:
+            self._show_diff(diff)
         # Update tab labels with row counts
-        labels = self.view.result_table_labels
-        for i, df in enumerate(dfs):
-            count = len(df) if df is not None else 0
-            label = labels[i].split(' (')[0]  # Remove any previous count
-            self.view.notebook.tab(i, text=f"{label} ({count})", state='normal')
+        for i, result in enumerate(results):
+            self._update_tab_label(i, result)
         self.view.export_btn.config(state='normal')
         current_tab = self.view.notebook.index(self.view.notebook.select()) if self.view.notebook.select() else None
-        if not hasattr(self.view, '_has_compared') or not self.view._has_compared:
+        if current_tab is not None and results[current_tab] is None:
+            current_tab = 1
+        # In the summary mode the current tab keeps its sample, as switching tabs builds the full frame
+        if not summary and (not hasattr(self.view, '_has_compared') or not self.view._has_compared):
             self.view.notebook.select(1)
             self.view._has_compared = True
         elif current_tab is not None:
@@ -239,22 +396,262 @@ class HomeController:
         style = ttk.Style(self.view.root)
         style.configure("green.Horizontal.TProgressbar", foreground='green', background='green')
         self.view.progress.configure(style="green.Horizontal.TProgressbar")
-        self.view.progress['value'] = 100
-        self.view.progress.update_idletasks()
+
+    def _start_task(self, stages: Sequence[Tuple[str, float]], work: Callable[[ProgressReporter], Any],
+                    on_done: Callable[[Any], None], on_error: Optional[Callable[[Exception], None]] = None,
+                    on_cancel: Optional[Callable[[], None]] = None) -> None:
+        """
+        Run an operation in the background; the compare buttons are disabled and Cancel is enabled meanwhile.
+
+        Args:
+            stages (Sequence[Tuple[str, float]]): Name and weight of the stages of the operation.
+            work (Callable[[ProgressReporter], Any]): The operation (worker thread, must not touch widgets).
+            on_done (Callable[[Any], None]): Receives the result of work (Tk thread).
+            on_error (Optional[Callable[[Exception], None]]): Receives an error of work; shown in a message box if None.
+            on_cancel (Optional[Callable[[], None]]): Called after the cancelled operation has stopped (Tk thread).
+        """
+        def cancelled() -> None:
+            self.view.show_cancelled()
+            if on_cancel:
+                on_cancel()
+
+        self.view.progress.configure(style="Horizontal.TProgressbar")
+        self.task = BackgroundTask(
+            self.view.root, work, stages, self.view.show_progress,
+            on_done=lambda result: self._end_task(on_done, result),
+            on_error=lambda error: self._end_task(on_error or self._show_task_error, error),
+            on_cancel=lambda: self._end_task(cancelled),
+            threaded=self.run_in_background,
+        )
+        self.view.compare_btn.config(state='disabled')
+        self.view.out_of_core_btn.config(state='disabled')
+        self.view.cancel_btn.config(state='normal')
+        self.task.start()
+
+    def _end_task(self, handler: Callable[..., None], *args: Any) -> None:
+        """Re-enable the compare buttons after a background operation and pass on its outcome."""
+        self.task = None
+        self.view.cancel_btn.config(state='disabled')
+        self.enable_compare_btn()
+        handler(*args)
+
+    @staticmethod
+    def _show_task_error(error: Exception) -> None:
+        """Report an error of a background operation."""
+        messagebox.showerror('Fehler', f'Vergleich fehlgeschlagen:\n{error}')
+
+    def cancel_task(self) -> None:
+        """
+        Cancel the running load, compare or export; it stops at its next progress report and leaves the
+        loaded files (paths, data and fingerprints) and the results unchanged.
+        """
+        if self.task is not None:
+            self.task.cancel()
+
+    def _compare_partitions(self, keys1: List[pd.Series], keys2: List[pd.Series], multiset: bool,
+                            parallel: bool = False,
+                            progress: Optional[Callable[[float], None]] = None) -> Tuple[Any, Any, Any]:
+        """
+        Classify the rows of both files with the compare strategy that fits the options and the keys.
+        Strategies that work in steps (the parallel compare) report their completed fraction to progress;
+        the others report between their steps, so a cancel takes effect there.
+
+        Returns:
+            Tuple[Any, Any, Any]: The four partitions, and in the duplicate-aware mode the count
+            differences and the duplicate row positions of both files (else None).
+        """
+        partitions = None
+        if multiset:
+            # Every occurrence of a key counts, so duplicate rows are paired one to one
+            return multiset_compare(keys1, keys2)
+        if parallel:
+            partitions = parallel_compare_keys(keys1, keys2, progress=progress)
+        elif is_asymmetric(len(keys1[0]), len(keys2[0])):
+            # A short list against a large file: only the short side is hashed, the large one is probed
+            partitions = asymmetric_compare_keys(keys1, keys2)
+        elif keys_are_sorted(keys1, keys2):
+            # Keys that are already sorted are merged in one linear pass instead of being hashed
+            try:
+                partitions = merge_compare_keys(keys1, keys2)
+            except TypeError:
+                # Keys of different types cannot be ordered against each other
+                partitions = None
+        if partitions is None:
+            if progress:
+                # Checkpoint before hashing, so a cancel after the sortedness check stops here
+                progress(0.5)
+            partitions = cached_compare_keys(self.probe_cache, keys1, keys2)
+        return partitions, None, None
+
+    def _compare_cache_key(self, key_columns1: List[str], key_columns2: List[str], slice1: Optional[slice],
+                           slice2: Optional[slice], transforms: List[str], multiset: bool) -> Optional[Tuple[Any, ...]]:
+        """
+        Build the result cache key of a compare: fingerprints of both loaded files and of the
+        rows of them being compared (see rows_fingerprint), plus all settings that change the partitions.
+
+        Returns:
+            Optional[Tuple[Any, ...]]: The key, or None if a file has no fingerprint (nothing is cached then).
+        """
+        fingerprint1 = getattr(self.view, 'file1_fingerprint', None)
+        fingerprint2 = getattr(self.view, 'file2_fingerprint', None)
+        if not isinstance(fingerprint1, tuple) or not isinstance(fingerprint2, tuple):
+            return None
+        # Slices are not hashable, so they are keyed by their bounds
+        slices = tuple((s.start, s.stop, s.step) if s is not None else None for s in (slice1, slice2))
+        return (
+            fingerprint1, rows_fingerprint(self.view.df1),
+            fingerprint2, rows_fingerprint(self.view.df2),
+            tuple(key_columns1), tuple(key_columns2), slices, tuple(sorted(transforms)), multiset,
+        )
+
+    def _changed_rows(self, df1: pd.DataFrame, df2: pd.DataFrame, keys1: List[pd.Series], keys2: List[pd.Series],
+                      key_columns1: List[str], key_columns2: List[str], diff: Dict[str, Any],
+                      progress: Optional[Callable[[float], None]] = None) -> RowsResult:
+        """
+        Build the changed-rows result with its changed cells marked; the mismatch counts per
+        column are kept in diff (it may run in the worker, so they are shown by _show_diff on the Tk thread).
+        The completed fraction of the row pairs compared is reported to progress.
+        """
+        changed, flags, mismatches = diff_rows(df1, df2, keys1, keys2, key_columns1, key_columns2, progress=progress)
+        diff['mismatches'] = mismatches
+        return RowsResult(changed, marks=changed_cells(changed, flags))
+
+    def _show_diff(self, diff: Dict[str, Any]) -> None:
+        """
+        Show the mismatch counts of the changed rows once they have been computed.
+        """
+        if 'mismatches' in diff:
+            self.view.show_diff_summary(diff['mismatches'])
+
+    def _update_tab_label(self, idx: int, result: Optional[LazyResult]) -> None:
+        """
+        Show the row count of a result in its tab label; tabs without a result are disabled.
+        """
+        label = self.view.result_table_labels[idx].split(' (')[0]  # Remove any previous count
+        if result is None:
+            # Tabs of optional compare modes stay disabled while the mode is off
+            self.view.notebook.tab(idx, text=label, state='disabled')
+            return
+        count = result.count if result.count is not None else '?'
+        self.view.notebook.tab(idx, text=f"{label} ({count})", state='normal')
+
+    def materialize_result(self, idx: int) -> None:
+        """
+        Compute the full result that so far only has a count or sample, e.g. when its tab is opened.
+
+        Args:
+            idx (int): Index of the result tab.
+        """
+        result = self.view._lazy_results.get(idx)
+        if result is None or self.task is not None:
+            return
+
+        def done(built: RowsResult) -> None:
+            if self.view._lazy_results.get(idx) is not result:
+                # A newer compare replaced the results meanwhile
+                return
+            del self.view._lazy_results[idx]
+            self.view._results[idx] = built
+            self._show_diff(self._diff)
+            self._update_tab_label(idx, result)
+            # Only this tab changed; the tables already filled in the other tabs are kept
+            self.view._render_result_table(idx)
+
+        # Computing e.g. the changed rows can take long, so it runs in the background and can be cancelled
+        self._start_task(MATERIALIZE_STAGES, lambda reporter: result.result(reporter.fraction_callback('results')), done)
+
+    def compare_csvs_out_of_core(self) -> None:
+        """
+        Compare both CSV files from disk with bounded memory and write the four results to a chosen folder.
+        Runs in the background like compare_csvs; a cancelled run may leave partly written result files.
+        """
+        if self.task is not None:
+            return
+        spec = self._get_compare_spec()
+        if spec is None:
+            return
+        key_columns1, key_columns2, slice1, slice2 = spec
+        if not self.view.file1_path or not self.view.file2_path:
+            messagebox.showerror('Fehler', 'Bitte beide CSV-Dateien laden!')
+            return
+        out_dir = filedialog.askdirectory(initialdir=os.path.dirname(self.view.file1_path))
+        if not out_dir:
+            return
+        source1 = CsvSource(
+            self.view.file1_path, key_columns1,
+            sep=self.view.delim_var1.get() if self.view.delim_var1.get() else ';',
+            encoding=self.view.encoding_var1.get() if self.view.encoding_var1.get() else 'latin1',
+            key_slice=slice1, filter_str=self.view.filter1_var.get(), transforms=self.view.get_normalization(),
+            date_columns=self.view.get_date_columns(1)
+        )
+        source2 = CsvSource(
+            self.view.file2_path, key_columns2,
+            sep=self.view.delim_var2.get() if self.view.delim_var2.get() else ';',
+            encoding=self.view.encoding_var2.get() if self.view.encoding_var2.get() else 'latin1',
+            key_slice=slice2, filter_str=self.view.filter2_var.get(), transforms=self.view.get_normalization(),
+            date_columns=self.view.get_date_columns(2)
+        )
+        # The changed-rows diff needs both files in memory and is not part of the streamed results
+        labels = [label.split(' (')[0] for label in self.view.result_table_labels[:4]]
+        out_paths = [os.path.join(out_dir, self._result_file_name(label)) for label in labels]
+
+        use_merge = self.view.sorted_var.get() and len(key_columns1) == 1
+        try:
+            total_bytes = os.path.getsize(source1.path) + os.path.getsize(source2.path)
+        except OSError:
+            total_bytes = None
+
+        def work(reporter: ProgressReporter, presort: bool = False) -> Tuple[int, int, int, int]:
+            # The streamed compares report fractions; shown as bytes of both files to give a throughput
+            report = reporter.fraction_callback('compare', total=total_bytes, unit='bytes')
+            if use_merge:
+                return sorted_merge_compare(source1, source2, out_paths, presort=presort, progress=report)
+            if is_asymmetric(os.path.getsize(source1.path), os.path.getsize(source2.path)):
+                # The small file is held in memory and the large one is streamed once, without spilling
+                return asymmetric_file_compare(source1, source2, out_paths, progress=report)
+            return partitioned_compare(source1, source2, out_paths, progress=report)
+
+        def done(counts: Tuple[int, int, int, int]) -> None:
+            style = ttk.Style(self.view.root)
+            style.configure("green.Horizontal.TProgressbar", foreground='green', background='green')
+            self.view.progress.configure(style="green.Horizontal.TProgressbar")
+            summary = '\n'.join(f'{label}: {count}' for label, count in zip(labels, counts))
+            messagebox.showinfo('Vergleich abgeschlossen', f'Ergebnisse gespeichert in {out_dir}\n\n{summary}')
+
+        def failed(error: Exception) -> None:
+            if not isinstance(error, NotSortedError):
+                self._show_task_error(error)
+            elif messagebox.askyesno('Nicht sortiert', f'{error}\n\nDateien vor dem Vergleich sortieren?'):
+                self._start_task(OUT_OF_CORE_STAGES, lambda reporter: work(reporter, presort=True), done)
+
+        self._start_task(OUT_OF_CORE_STAGES, work, done, failed)
+
+    @staticmethod
+    def _result_file_name(label: str) -> str:
+        """
+        Build a file name for a result tab label, e.g. 'Nur in a.csv' -> 'Nur_in_a.csv'.
+        """
+        name = label.replace(' ', '_').replace('ä','ae').replace('ö','oe').replace('ü','ue').replace('ß','ss')
+        return name if name.lower().endswith('.csv') else name + '.csv'
 
     def export_results_button(self) -> None:
         """
         Trigger export dialog for comparison results based on current tab selection.
         """
         from csvlotte.controllers.compare_export_controller import CompareExportController
+        if self.task is not None:
+            return
         current_tab = self.view.notebook.index(self.view.notebook.select())
-        dfs = self.view._result_dfs
+        results = self.view._results
         result_table_labels = self.view.result_table_labels
         default_dir = None
         if hasattr(self.view, 'file1_path') and self.view.file1_path:
             import os
             default_dir = os.path.dirname(self.view.file1_path)
-        controller = CompareExportController(self.view.root, dfs, result_table_labels, current_tab, default_dir)
+        # Results of the summary mode are only built for the tab that is actually exported
+        controller = CompareExportController(self.view.root, results, result_table_labels, current_tab, default_dir,
+                                             progress=self.view.show_progress, lazy_results=self.view._lazy_results,
+                                             run_task=self._start_task)
         controller.open_export_dialog()
 
     def update_columns(self) -> None:
@@ -265,6 +662,7 @@ class HomeController:
             self.view.column_combo1['values'] = list(self.view.df1.columns)
         if self.view.df2 is not None:
             self.view.column_combo2['values'] = list(self.view.df2.columns)
+        self.view.update_key_menus()
         if hasattr(self.view, 'export_btn'):
             self.view.export_btn.config(state='disabled')
         # Ensure sync_column_selection is always bound (rebind to avoid duplicate bindings)
@@ -276,12 +674,14 @@ class HomeController:
 
     def enable_compare_btn(self) -> None:
         """
-        Enable or disable the compare button based on whether both CSVs are loaded.
+        Enable or disable the compare button based on whether both CSVs are loaded and no compare is running.
         """
-        if self.view.df1 is not None and self.view.df2 is not None:
+        if self.view.df1 is not None and self.view.df2 is not None and self.task is None:
             self.view.compare_btn.config(state='normal')
+            self.view.out_of_core_btn.config(state='normal')
         else:
             self.view.compare_btn.config(state='disabled')
+            self.view.out_of_core_btn.config(state='disabled')
 
     def update_tab_labels(self) -> None:
         """
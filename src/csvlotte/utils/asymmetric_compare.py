@@ -0,0 +1,272 @@
+"""
+Asymmetric compare: checks a small file against a much larger one, hashing only the small side.
+"""
+import os
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from csvlotte.utils.compare import Keys, Partitions, align_key_columns, as_key_columns
+from csvlotte.utils.external_compare import CsvSource, output_formats, write_rows
+
+# Size ratio between the files from which only the smaller side is hashed
+ASYMMETRIC_RATIO = 50
+# Distinct keys on the small side from which a Bloom filter pre-checks the large side
+BLOOM_MIN_KEYS = 1_000_000
+# Filter bits per distinct key; 10 bits give about 1 % false positives
+BLOOM_BITS_PER_KEY = 10
+
+
+def is_asymmetric(size1: int, size2: int, ratio: float = ASYMMETRIC_RATIO) -> bool:
+    """Return True if one file is at least ratio times larger than the other (in rows or bytes)."""
+    small, large = sorted((size1, size2))
+    return large >= ratio * max(small, 1)
+
+
+def key_hashes(keys: Keys) -> np.ndarray:
+    """Hash the (composite) keys row-wise into uint64 values; the column hashes are mixed FNV-style."""
+    hashes = None
+    for col in as_key_columns(keys):
+        # Without categorizing, each value is hashed directly, which is much faster for mostly distinct keys
+        col_hashes = pd.util.hash_array(col.to_numpy(), categorize=False)
+        hashes = col_hashes if hashes is None else (hashes * np.uint64(0x100000001B3)) ^ col_hashes
+    return hashes
+
+
+class BloomFilter:
+    """
+    Bit array that answers "maybe contained" or "certainly not contained" for key hashes.
+
+    Every key sets n_hashes bits derived from its 64-bit hash by double hashing. The bits are
+    packed into a uint8 array, so a million keys take about 1.2 MB and a lookup is a few
+    vectorised gathers instead of a probe into a large hash table.
+    """
+
+    def __init__(self, hashes: np.ndarray, bits_per_key: int = BLOOM_BITS_PER_KEY) -> None:
+        """
+        Args:
+            hashes (np.ndarray): uint64 hashes of the keys to add.
+            bits_per_key (int): Filter size per key; more bits give fewer false positives.
+        """
+        n_bits = 1 << max(int(np.ceil(np.log2(max(len(hashes), 1) * bits_per_key))), 6)
+        self._mask = np.uint64(n_bits - 1)
+        self.n_hashes = max(1, round(bits_per_key * np.log(2)))
+        bits = np.zeros(n_bits, dtype=bool)
+        for positions in self._positions(hashes):
+            bits[positions] = True
+        self._bits = np.packbits(bits, bitorder='little')
+
+    def _positions(self, hashes: np.ndarray):
+        """Yield the bit positions of all hashes, one array per hash function."""
+        hashes = hashes.astype(np.uint64, copy=False)
+        step = (hashes >> np.uint64(32)) | np.uint64(1)
+        for i in range(self.n_hashes):
+            yield (hashes + np.uint64(i) * step) & self._mask
+
+    def might_contain(self, hashes: np.ndarray) -> np.ndarray:
+        """Return a boolean array, False where a hash was certainly not added."""
+        result = np.ones(len(hashes), dtype=bool)
+        for positions in self._positions(hashes):
+            result &= ((self._bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1).astype(bool)
+        return result
+
+
+class KeyProbe:
+    """
+    Hash structure over the distinct keys of one file, probed with keys of the other file.
+
+    Each key column gets an index of its distinct values; composite keys combine the column
+    codes and look them up in an index of the combinations that occur. In the asymmetric
+    compare only the small side is hashed into a table, so memory is bounded by the smaller file.
+    """
+
+    def __init__(self, keys: Keys, bloom_min_keys: Optional[int] = None,
+                 encoded: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None) -> None:
+        """
+        Args:
+            keys (Keys): Key column(s) of the file, usually the smaller one.
+            bloom_min_keys (Optional[int]): Use a Bloom filter pre-check from this many distinct keys on;
+                never if None. The keys of both sides must then be of the same type (e.g. text).
+            encoded (Optional[List[Tuple[np.ndarray, np.ndarray]]]): Row codes and distinct values per
+                key column if they are already known (see encode_pair); else every column is factorised.
+        """
+        columns = as_key_columns(keys)
+        if encoded is None:
+            # One hashing pass per column; missing values get their own code, like in encode_keys
+            encoded = [pd.factorize(col.to_numpy(), use_na_sentinel=False) for col in columns]
+        self._columns: List[pd.Index] = []
+        self._combinations: List[Optional[pd.Index]] = []
+        codes = None
+        for col_codes, uniques in encoded:
+            self._columns.append(pd.Index(uniques))
+            if codes is None:
+                codes = col_codes.astype(np.int64, copy=False)
+                self._combinations.append(None)
+                continue
+            codes, combinations = pd.factorize(codes * len(uniques) + col_codes)
+            self._combinations.append(pd.Index(combinations))
+        # Code of every row into the distinct keys of the file
+        self.codes = codes if codes is not None else np.array([], dtype=np.int64)
+        self.size = int(self.codes.max()) + 1 if len(self.codes) else 0
+        # Column codes of every distinct key; a single column's codes are the key codes themselves
+        if len(encoded) == 1:
+            self._distinct_codes = [np.arange(self.size)]
+        else:
+            first = np.empty(self.size, dtype=np.int64)
+            # Assign in reverse, so the first row of every key is written last and wins
+            first[self.codes[::-1]] = np.arange(len(self.codes) - 1, -1, -1)
+            self._distinct_codes = [col_codes[first] for col_codes, _ in encoded]
+        # The hash indexes of the distinct values are built by pandas on the first lookup
+        self.is_indexed = False
+        self._bloom = None
+        if bloom_min_keys is not None and self.size >= bloom_min_keys:
+            self._bloom = BloomFilter(key_hashes(keys))
+
+    def distinct_keys(self) -> List[pd.Series]:
+        """Return the key columns of the distinct keys, ordered by code."""
+        return [pd.Series(uniques.take(codes)) for uniques, codes in zip(self._columns, self._distinct_codes)]
+
+    def distinct_codes(self, column_maps: List[np.ndarray]) -> List[np.ndarray]:
+        """Translate the column codes of every distinct key with one code map per column (e.g. into another file)."""
+        return [column_map[codes] for column_map, codes in zip(column_maps, self._distinct_codes)]
+
+    @property
+    def uses_bloom(self) -> bool:
+        """True if lookups are pre-checked with a Bloom filter."""
+        return self._bloom is not None
+
+    def lookup_codes(self, column_codes: List[np.ndarray]) -> np.ndarray:
+        """
+        Combine column codes of this file (-1 for values it does not contain) into key codes, or -1 if absent.
+        """
+        codes = None
+        for col_codes, uniques, combinations in zip(column_codes, self._columns, self._combinations):
+            if codes is None:
+                codes = col_codes.astype(np.int64, copy=False)
+                continue
+            valid = (codes >= 0) & (col_codes >= 0)
+            codes = np.where(valid, combinations.get_indexer(codes * len(uniques) + col_codes), -1)
+        return codes
+
+    def lookup(self, keys: Keys) -> np.ndarray:
+        """
+        Return for every row of the other file the code of its key in this file, or -1 if absent.
+        """
+        columns = as_key_columns(keys)
+        n = len(columns[0]) if columns else 0
+        self.is_indexed = True
+        if len(columns) != len(self._columns):
+            raise ValueError('Beide Dateien benötigen gleich viele Schlüsselspalten.')
+        rows = None
+        if self._bloom is not None:
+            # Only keys that may be on the small side are looked up in the hash indexes
+            rows = np.flatnonzero(self._bloom.might_contain(key_hashes(columns)))
+            columns = [col.iloc[rows] for col in columns]
+        codes = self.lookup_codes([uniques.get_indexer(col.to_numpy()) for col, uniques in zip(columns, self._columns)])
+        if rows is None:
+            return codes
+        result = np.full(n, -1, dtype=np.int64)
+        result[rows] = codes
+        return result
+
+
+def asymmetric_compare_keys(keys1: Keys, keys2: Keys, bloom_min_keys: Optional[int] = BLOOM_MIN_KEYS) -> Partitions:
+    """
+    Classify the rows of two files of very different size by hashing only the smaller side.
+
+    The distinct keys of the smaller file form a KeyProbe; the larger file is only probed,
+    so no hash table over its keys is built. Rows of the smaller file are common if their
+    key was found at least once. Both sides get the same key dtypes first (see align_key_columns),
+    so the result matches compare_keys and the Bloom filter sees equal hashes for equal keys.
+
+    Args:
+        keys1 (Keys): Key column(s) of file 1.
+        keys2 (Keys): Key column(s) of file 2.
+        bloom_min_keys (Optional[int]): Distinct small-side keys from which the Bloom filter is used; never if None.
+
+    Returns:
+        Partitions: Row positions (only1, common1, common2, only2) into file 1 and file 2.
+    """
+    keys1, keys2 = align_key_columns(keys1, keys2)
+    first_small = len(keys1[0]) <= len(keys2[0])
+    small, large = (keys1, keys2) if first_small else (keys2, keys1)
+    probe = KeyProbe(small, bloom_min_keys)
+    large_codes = probe.lookup(large)
+    mask_large = large_codes >= 0
+    found = np.zeros(probe.size, dtype=bool)
+    found[large_codes[mask_large]] = True
+    mask_small = found[probe.codes]
+    mask_common1, mask_common2 = (mask_small, mask_large) if first_small else (mask_large, mask_small)
+    return (
+        np.flatnonzero(~mask_common1),
+        np.flatnonzero(mask_common1),
+        np.flatnonzero(mask_common2),
+        np.flatnonzero(~mask_common2),
+    )
+
+
+def asymmetric_file_compare(source1: CsvSource, source2: CsvSource, out_paths: Sequence[str], sep: Optional[str] = None,
+                            encoding: Optional[str] = None, chunksize: int = 100_000,
+                            bloom_min_keys: Optional[int] = BLOOM_MIN_KEYS,
+                            progress: Optional[Callable[[float], None]] = None) -> Tuple[int, int, int, int]:
+    """
+    Compare a small CSV file against a much larger one, streaming the larger file once.
+
+    The smaller file (by size on disk) is loaded and its keys form a KeyProbe, with a Bloom
+    filter pre-check if it has at least bloom_min_keys distinct keys. The larger file is
+    streamed chunk by chunk through the probe and its rows are written out directly, so
+    memory is bounded by the smaller file plus one chunk. No spill files are needed and all
+    output rows keep the order of the inputs.
+
+    Args:
+        source1 (CsvSource): File 1 with key columns and filter.
+        source2 (CsvSource): File 2 with key columns and filter.
+        out_paths (Sequence[str]): Output paths for only1, common1, common2 and only2.
+        sep (Optional[str]): Field separator of the output files; that of the source file if None.
+        encoding (Optional[str]): Encoding of the output files; that of the source file if None.
+        chunksize (int): Rows per chunk when streaming the files.
+        bloom_min_keys (Optional[int]): Distinct small-side keys from which the Bloom filter is used; never if None.
+        progress (Optional[Callable[[float], None]]): Called with the completed fraction (0..1).
+
+    Returns:
+        Tuple[int, int, int, int]: Row counts of only1, common1, common2 and only2.
+    """
+    if len(source1.key_columns) != len(source2.key_columns):
+        raise ValueError('Beide Dateien benötigen gleich viele Schlüsselspalten.')
+    formats = output_formats(source1, source2, out_paths, sep, encoding)
+    for path, columns in zip(out_paths, [source1.columns(), source1.columns(), source2.columns(), source2.columns()]):
+        write_rows(pd.DataFrame(columns=columns), path, formats, header=True)
+    first_small = os.path.getsize(source1.path) <= os.path.getsize(source2.path)
+    small, large = (source1, source2) if first_small else (source2, source1)
+    # Output paths (only, common) of the small and the large side
+    small_paths, large_paths = (out_paths[:2], out_paths[:1:-1]) if first_small else (out_paths[:1:-1], out_paths[:2])
+    small_chunks = [chunk for chunk, _ in small.chunks(chunksize)]
+    small_df = pd.concat(small_chunks, ignore_index=True) if small_chunks else pd.DataFrame(columns=small.columns())
+    probe = KeyProbe(small.keys(small_df), bloom_min_keys)
+    if progress:
+        progress(0.1)
+    found = np.zeros(probe.size, dtype=bool)
+    large_counts = [0, 0]
+    for chunk, fraction in large.chunks(chunksize):
+        if not chunk.empty:
+            codes = probe.lookup(large.keys(chunk))
+            common = codes >= 0
+            found[codes[common]] = True
+            for n, mask in enumerate((~common, common)):
+                if mask.any():
+                    write_rows(chunk[mask], large_paths[n], formats)
+                    large_counts[n] += int(mask.sum())
+        if progress:
+            progress(0.1 + 0.85 * fraction)
+    common = found[probe.codes]
+    small_counts = [0, 0]
+    for n, mask in enumerate((~common, common)):
+        if mask.any():
+            write_rows(small_df[mask], small_paths[n], formats)
+            small_counts[n] = int(mask.sum())
+    if progress:
+        progress(1.0)
+    if first_small:
+        return small_counts[0], small_counts[1], large_counts[1], large_counts[0]
+    return large_counts[0], large_counts[1], small_counts[1], small_counts[0]
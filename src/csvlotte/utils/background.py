@@ -0,0 +1,117 @@
+"""
+Background tasks: run a long operation in a worker thread while the Tk mainloop keeps running.
+"""
+import queue
+import threading
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from csvlotte.utils.progress import OperationCancelled, ProgressReporter, ProgressState
+
+# Milliseconds between two checks of the worker for progress and its outcome
+POLL_MS = 50
+
+
+class BackgroundTask:
+    """
+    Runs work(reporter) in a worker thread and hands its progress and outcome to the Tk thread.
+
+    The worker never touches widgets: progress states, the result or the error are put into a
+    queue that the Tk thread drains every poll_ms via root.after and passes to the callbacks.
+    Cancellation is cooperative: cancel() sets an event that the reporter checks at every
+    progress report, so the work stops at its next report with OperationCancelled. A result that
+    arrives after cancel() is discarded, so a cancelled task never delivers a partial outcome.
+    """
+
+    def __init__(self, root: Any, work: Callable[[ProgressReporter], Any], stages: Sequence[Tuple[str, float]],
+                 on_progress: Callable[[ProgressState], None], on_done: Callable[[Any], None],
+                 on_error: Callable[[Exception], None], on_cancel: Callable[[], None],
+                 threaded: bool = True, poll_ms: int = POLL_MS) -> None:
+        """
+        Args:
+            root (Any): Tk widget whose after() schedules the polling.
+            work (Callable[[ProgressReporter], Any]): The operation; reports its stages to the reporter.
+            stages (Sequence[Tuple[str, float]]): Name and weight of the stages of the operation.
+            on_progress (Callable[[ProgressState], None]): Shows the progress (Tk thread).
+            on_done (Callable[[Any], None]): Receives the result of work (Tk thread).
+            on_error (Callable[[Exception], None]): Receives an error raised by work (Tk thread).
+            on_cancel (Callable[[], None]): Called once the work stopped after cancel() (Tk thread).
+            threaded (bool): Run the work in a worker thread; if False it runs inline in start().
+            poll_ms (int): Milliseconds between two checks of the worker.
+        """
+        self.root = root
+        self.work = work
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.threaded = threaded
+        self.poll_ms = poll_ms
+        self._cancel_event = threading.Event()
+        self._queue: 'queue.Queue[Tuple[str, Any]]' = queue.Queue()
+        self._running = False
+        callback = self._queue_progress if threaded else on_progress
+        self.reporter = ProgressReporter(callback, stages, cancel_event=self._cancel_event)
+
+    @property
+    def is_running(self) -> bool:
+        """True from start() until the outcome has been handed to a callback."""
+        return self._running
+
+    def start(self) -> None:
+        """Start the work; with threaded=False it is run to completion before returning."""
+        self._running = True
+        if not self.threaded:
+            self._run()
+            self._poll()
+            return
+        threading.Thread(target=self._run, name='csvlotte-task', daemon=True).start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def cancel(self) -> None:
+        """Request the work to stop at its next progress report."""
+        self._cancel_event.set()
+
+    def _queue_progress(self, state: ProgressState) -> None:
+        """Pass a progress state from the worker to the Tk thread."""
+        self._queue.put(('progress', state))
+
+    def _run(self) -> None:
+        """Run the work and queue its outcome (worker thread)."""
+        try:
+            result = self.work(self.reporter)
+            self.reporter.finish()
+            self._queue.put(('done', result))
+        except OperationCancelled:
+            self._queue.put(('cancelled', None))
+        except Exception as e:
+            self._queue.put(('error', e))
+
+    def _poll(self) -> None:
+        """Show the latest progress and hand over the outcome once the work ended (Tk thread)."""
+        state: Optional[ProgressState] = None
+        outcome: Optional[Tuple[str, Any]] = None
+        while outcome is None:
+            try:
+                kind, value = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                state = value
+            else:
+                outcome = kind, value
+        if outcome is None:
+            # Only the latest state is shown; older ones of the same interval are outdated anyway
+            if state is not None:
+                self.on_progress(state)
+            self.root.after(self.poll_ms, self._poll)
+            return
+        self._running = False
+        kind, value = outcome
+        if kind == 'cancelled' or self._cancel_event.is_set():
+            self.on_cancel()
+        elif kind == 'error':
+            self.on_error(value)
+        else:
+            if state is not None:
+                self.on_progress(state)
+            self.on_done(value)
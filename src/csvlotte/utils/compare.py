@@ -0,0 +1,312 @@
+"""
+Compare engine: classifies the rows of two key columns into the four result partitions.
+"""
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_float_dtype, is_numeric_dtype
+
+Partitions = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+Keys = Union[pd.Series, pd.DataFrame, Sequence[pd.Series]]
+
+# Largest combined code that still fits into int64 when mixing column codes
+_MAX_CODE = 2 ** 63 - 1
+
+
+def parse_slice(slice_str: str) -> Optional[slice]:
+    """
+    Parse a Python slice spec like "1:5:2", "-4:" or "[:3]" once, before any row is touched.
+
+    A single number such as "3" keeps its historic meaning "from position 3 to the end".
+
+    Args:
+        slice_str (str): Slice spec as entered in the UI.
+
+    Returns:
+        Optional[slice]: The parsed slice, or None for an empty spec.
+
+    Raises:
+        ValueError: If the spec is not valid slice syntax.
+    """
+    spec = slice_str.strip()
+    if spec.startswith('[') and spec.endswith(']'):
+        spec = spec[1:-1].strip()
+    if not spec:
+        return None
+    parts = spec.split(':')
+    if len(parts) > 3:
+        raise ValueError(f"Ungültiger Slice: '{slice_str}'")
+    try:
+        args = [int(part) if part.strip() else None for part in parts]
+    except ValueError:
+        raise ValueError(f"Ungültiger Slice: '{slice_str}'") from None
+    args += [None] * (3 - len(args))
+    if args[2] == 0:
+        raise ValueError(f"Ungültiger Slice: '{slice_str}' (Schrittweite 0)")
+    return slice(*args)
+
+
+def as_text(values: pd.Series) -> pd.Series:
+    """
+    Render a column as text; whole floats (integer columns with gaps) lose their '.0', so the
+    same number gives the same text whether pandas read it as integer or float. Missing values stay missing.
+    """
+    text = values.astype(str).where(values.notna())
+    if is_float_dtype(values):
+        whole = (values % 1 == 0) & (values.abs() < 2 ** 63)
+        text[whole] = values[whole].astype(np.int64).astype(str)
+    return text
+
+
+def slice_keys(series: pd.Series, key_slice: Optional[slice]) -> pd.Series:
+    """
+    Apply a parsed slice to every value of a key column with one vectorised string kernel.
+
+    Args:
+        series (pd.Series): Key column.
+        key_slice (Optional[slice]): Slice from parse_slice(); None returns the column unchanged.
+
+    Returns:
+        pd.Series: Sliced key values as strings.
+    """
+    if key_slice is None:
+        return series
+    return as_text(series).str.slice(key_slice.start, key_slice.stop, key_slice.step)
+
+
+def as_key_columns(keys: Keys) -> List[pd.Series]:
+    """Return the key columns of a Series, DataFrame or list of Series as a list of Series."""
+    if isinstance(keys, pd.Series):
+        return [keys]
+    if isinstance(keys, pd.DataFrame):
+        return [keys.iloc[:, i] for i in range(keys.shape[1])]
+    return list(keys)
+
+
+def align_key_columns(keys1: Keys, keys2: Keys) -> Tuple[List[pd.Series], List[pd.Series]]:
+    """
+    Give each pair of key columns the same dtype, so equal keys hash equally in both files.
+
+    A column that is numeric in one file and text in the other is compared on its text (see
+    as_text), numbers of different dtypes as float, like in compare_keys. Strategies that
+    hash or index each file on its own (parallel, asymmetric, incremental) need this first.
+
+    Raises:
+        ValueError: If both files have a different number of key columns.
+    """
+    columns1 = as_key_columns(keys1)
+    columns2 = as_key_columns(keys2)
+    if len(columns1) != len(columns2) or not columns1:
+        raise ValueError('Beide Dateien benötigen gleich viele Schlüsselspalten.')
+    aligned1: List[pd.Series] = []
+    aligned2: List[pd.Series] = []
+    for col1, col2 in zip(columns1, columns2):
+        col1 = col1.reset_index(drop=True)
+        col2 = col2.reset_index(drop=True)
+        if is_numeric_dtype(col1) != is_numeric_dtype(col2):
+            col1, col2 = as_text(col1), as_text(col2)
+        elif col1.dtype != col2.dtype and is_numeric_dtype(col1):
+            col1, col2 = col1.astype(np.float64), col2.astype(np.float64)
+        aligned1.append(col1)
+        aligned2.append(col2)
+    return aligned1, aligned2
+
+
+def encode_keys(keys1: Keys, keys2: Keys) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Encode the (composite) keys of both files into one shared, dense integer code space.
+
+    Every key column is factorized once over both files. The per-column codes are combined
+    arithmetically (code * cardinality + next code) into a single int64 per row; if the
+    product of cardinalities would overflow int64, the combined codes are re-factorized
+    before the next column is mixed in. No Python-level row tuples are built. A column that
+    is numeric in one file and text in the other is compared on its text (see as_text), as
+    in the streamed compare of large files.
+
+    Args:
+        keys1 (Keys): Key column(s) of file 1.
+        keys2 (Keys): Key column(s) of file 2, paired positionally with keys1.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, int]: Codes of file 1, codes of file 2 and the number of distinct codes.
+
+    Raises:
+        ValueError: If both files have a different number of key columns.
+    """
+    columns1 = as_key_columns(keys1)
+    columns2 = as_key_columns(keys2)
+    if len(columns1) != len(columns2) or not columns1:
+        raise ValueError('Beide Dateien benötigen gleich viele Schlüsselspalten.')
+    n1 = len(columns1[0])
+    codes = None
+    size = 1
+    for col1, col2 in zip(columns1, columns2):
+        if is_numeric_dtype(col1) != is_numeric_dtype(col2):
+            col1, col2 = as_text(col1), as_text(col2)
+        combined = pd.concat([col1.reset_index(drop=True), col2.reset_index(drop=True)], ignore_index=True)
+        # Missing values get their own code, so NaN keys match each other like in a set
+        col_codes, uniques = pd.factorize(combined, use_na_sentinel=False)
+        cardinality = max(len(uniques), 1)
+        if codes is None:
+            codes = col_codes.astype(np.int64, copy=False)
+            size = cardinality
+            continue
+        if size * cardinality > _MAX_CODE:
+            codes, uniques = pd.factorize(codes)
+            size = max(len(uniques), 1)
+        codes = codes * cardinality + col_codes
+        size *= cardinality
+    if len(columns1) > 1:
+        # Make the combined codes dense again, so presence arrays stay small
+        codes, uniques = pd.factorize(codes)
+        size = len(uniques)
+    return codes[:n1], codes[n1:], size
+
+
+def compare_keys(keys1: Keys, keys2: Keys) -> Partitions:
+    """
+    Classify the rows of two files by their (composite) keys in a single hashing pass.
+
+    Both sides are encoded into one shared integer code space (see encode_keys). Membership
+    is then a vectorised lookup of each row's code in a presence array of the other side,
+    so every key is hashed exactly once.
+
+    Args:
+        keys1 (Keys): Key column(s) of file 1.
+        keys2 (Keys): Key column(s) of file 2.
+
+    Returns:
+        Partitions: Row positions (only1, common1, common2, only2) into file 1 and file 2.
+    """
+    codes1, codes2, size = encode_keys(keys1, keys2)
+    in1 = np.zeros(size, dtype=bool)
+    in2 = np.zeros(size, dtype=bool)
+    in1[codes1] = True
+    in2[codes2] = True
+    mask_common1 = in2[codes1]
+    mask_common2 = in1[codes2]
+    return (
+        np.flatnonzero(~mask_common1),
+        np.flatnonzero(mask_common1),
+        np.flatnonzero(mask_common2),
+        np.flatnonzero(~mask_common2),
+    )
+
+
+def keys_are_sorted(keys1: Keys, keys2: Keys) -> bool:
+    """
+    Check cheaply (one linear pass per file) whether both files are sorted by a single key column.
+
+    Args:
+        keys1 (Keys): Key column(s) of file 1.
+        keys2 (Keys): Key column(s) of file 2.
+
+    Returns:
+        bool: True if both sides have one key column that is sorted ascending without missing values.
+    """
+    columns1 = as_key_columns(keys1)
+    columns2 = as_key_columns(keys2)
+    if len(columns1) != 1 or len(columns2) != 1:
+        return False
+    for col in (columns1[0], columns2[0]):
+        if col.hasnans or not col.is_monotonic_increasing:
+            return False
+    return True
+
+
+def merge_compare_keys(keys1: Keys, keys2: Keys) -> Partitions:
+    """
+    Classify the rows of two files that are both sorted by their key, without hashing or re-sorting them.
+
+    As both key arrays are sorted, each one is located in the other with np.searchsorted;
+    a row is common if the value at its insertion point in the other file equals its key.
+    No hash table is built and no combined array is sorted.
+
+    Args:
+        keys1 (Keys): Sorted key column of file 1.
+        keys2 (Keys): Sorted key column of file 2.
+
+    Returns:
+        Partitions: Row positions (only1, common1, common2, only2) into file 1 and file 2.
+    """
+    values1 = as_key_columns(keys1)[0].to_numpy()
+    values2 = as_key_columns(keys2)[0].to_numpy()
+    mask_common1 = _sorted_membership(values1, values2)
+    mask_common2 = _sorted_membership(values2, values1)
+    return (
+        np.flatnonzero(~mask_common1),
+        np.flatnonzero(mask_common1),
+        np.flatnonzero(mask_common2),
+        np.flatnonzero(~mask_common2),
+    )
+
+
+def _sorted_membership(values: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Return for every value of a sorted array whether it occurs in the sorted array other."""
+    if not len(values) or not len(other):
+        return np.zeros(len(values), dtype=bool)
+    idx = np.searchsorted(other, values, side='left')
+    np.minimum(idx, len(other) - 1, out=idx)
+    return np.asarray(other[idx] == values, dtype=bool)
+
+
+def multiset_compare(keys1: Keys, keys2: Keys) -> Tuple[Partitions, pd.DataFrame, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Classify the rows of two files by key, counting every occurrence of a key separately.
+
+    A key that occurs three times in file 1 and once in file 2 makes one row of file 1
+    common and two rows "only in file 1". The n-th occurrence of a key (grouped cumulative
+    count) is common if the other file has at least n occurrences (value counts over the
+    shared codes of encode_keys). The same codes and counts give the rows of duplicate keys
+    within each file, without hashing the keys again.
+
+    Args:
+        keys1 (Keys): Key column(s) of file 1.
+        keys2 (Keys): Key column(s) of file 2.
+
+    Returns:
+        Tuple[Partitions, pd.DataFrame, Tuple[np.ndarray, np.ndarray]]: Row positions (only1,
+        common1, common2, only2), one row per key whose counts differ, with the key values, both
+        counts and their difference, and the positions of the duplicate rows of file 1 and file 2.
+    """
+    codes1, codes2, size = encode_keys(keys1, keys2)
+    counts1 = np.bincount(codes1, minlength=size)
+    counts2 = np.bincount(codes2, minlength=size)
+    rank1 = pd.Series(codes1).groupby(codes1).cumcount().to_numpy()
+    rank2 = pd.Series(codes2).groupby(codes2).cumcount().to_numpy()
+    mask_common1 = rank1 < counts2[codes1]
+    mask_common2 = rank2 < counts1[codes2]
+    partitions = (
+        np.flatnonzero(~mask_common1),
+        np.flatnonzero(mask_common1),
+        np.flatnonzero(mask_common2),
+        np.flatnonzero(~mask_common2),
+    )
+    differing = np.flatnonzero(counts1 != counts2)
+    # First row (over both files) of every key, to show its values
+    all_codes = np.concatenate([codes1, codes2])
+    first = np.empty(size, dtype=np.int64)
+    first[all_codes[::-1]] = np.arange(len(all_codes) - 1, -1, -1)
+    rows = first[differing]
+    differences = pd.DataFrame({
+        col1.name if col1.name is not None else f'Schlüssel {i + 1}':
+            pd.concat([col1.reset_index(drop=True), col2.reset_index(drop=True)], ignore_index=True).iloc[rows].to_numpy()
+        for i, (col1, col2) in enumerate(zip(as_key_columns(keys1), as_key_columns(keys2)))
+    })
+    differences['Anzahl Datei 1'] = counts1[differing]
+    differences['Anzahl Datei 2'] = counts2[differing]
+    differences['Differenz'] = counts1[differing] - counts2[differing]
+    duplicates = (duplicate_positions(codes1, counts1), duplicate_positions(codes2, counts2))
+    return partitions, differences, duplicates
+
+
+def duplicate_positions(codes: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Return the positions of all rows whose key occurs more than once in the same file.
+
+    Args:
+        codes (np.ndarray): Key code of every row of the file (see encode_keys).
+        counts (np.ndarray): Occurrences of every code in the file.
+    """
+    return np.flatnonzero(counts[codes] > 1)
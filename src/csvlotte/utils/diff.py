@@ -0,0 +1,139 @@
+"""
+Row diff: compares the remaining columns of rows whose keys occur in both files.
+"""
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from csvlotte.utils.compare import Keys, as_text, encode_keys
+
+# Matched row pairs compared at once, so memory stays bounded for millions of matches
+DIFF_CHUNK_ROWS = 200_000
+# Column of the changed-rows result that lists the differing columns of each row
+CHANGED_COLUMNS = 'Geänderte Spalten'
+
+RowDiff = Tuple[pd.DataFrame, pd.DataFrame, pd.Series]
+
+
+def match_rows(keys1: Keys, keys2: Keys) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pair the rows of both files by key. For duplicate keys the first row of each file is used.
+
+    Args:
+        keys1 (Keys): Key column(s) of file 1.
+        keys2 (Keys): Key column(s) of file 2.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Matching row positions in file 1 and file 2, ordered by file 1.
+    """
+    codes1, codes2, size = encode_keys(keys1, keys2)
+    first1 = np.full(size, -1, dtype=np.int64)
+    first2 = np.full(size, -1, dtype=np.int64)
+    # Assign in reverse, so the first row of a duplicate key is written last and wins
+    first1[codes1[::-1]] = np.arange(len(codes1) - 1, -1, -1)
+    first2[codes2[::-1]] = np.arange(len(codes2) - 1, -1, -1)
+    matched = (first1 >= 0) & (first2 >= 0)
+    pos1 = first1[matched]
+    pos2 = first2[matched]
+    order = np.argsort(pos1, kind='stable')
+    return pos1[order], pos2[order]
+
+
+def diff_columns(df1: pd.DataFrame, df2: pd.DataFrame, key_columns1: Sequence[str],
+                 key_columns2: Sequence[str]) -> List[str]:
+    """Return the columns present in both files that are not part of a key, in the order of file 1."""
+    keys = set(key_columns1) | set(key_columns2)
+    return [col for col in df1.columns if col in df2.columns and col not in keys]
+
+
+def values_equal(values1: pd.Series, values2: pd.Series) -> np.ndarray:
+    """
+    Compare two aligned columns cell by cell. Missing values on both sides count as equal;
+    columns of different kinds (e.g. number and text) are compared on their text.
+
+    Returns:
+        np.ndarray: Boolean array, True where both cells are equal.
+    """
+    values1 = values1.reset_index(drop=True)
+    values2 = values2.reset_index(drop=True)
+    if values1.dtype != values2.dtype and not (is_numeric_dtype(values1) and is_numeric_dtype(values2)):
+        values1 = as_text(values1)
+        values2 = as_text(values2)
+    equal = values1.eq(values2).fillna(False).to_numpy(dtype=bool)
+    return equal | (values1.isna().to_numpy() & values2.isna().to_numpy())
+
+
+def diff_rows(df1: pd.DataFrame, df2: pd.DataFrame, keys1: Keys, keys2: Keys, key_columns1: Sequence[str],
+              key_columns2: Sequence[str], chunk_rows: int = DIFF_CHUNK_ROWS,
+              progress: Optional[Callable[[float], None]] = None) -> RowDiff:
+    """
+    Find the rows whose key occurs in both files but whose other columns differ.
+
+    Matched row pairs are compared column by column with vectorised comparisons, in chunks
+    of chunk_rows pairs; only the changed rows of a chunk are kept. The result holds the key
+    columns of file 1, the changed column names and both values of every column that differs
+    in at least one row.
+
+    Args:
+        df1 (pd.DataFrame): File 1.
+        df2 (pd.DataFrame): File 2.
+        keys1 (Keys): Key values of file 1 as used for the compare (sliced).
+        keys2 (Keys): Key values of file 2 as used for the compare (sliced).
+        key_columns1 (Sequence[str]): Key column names of file 1.
+        key_columns2 (Sequence[str]): Key column names of file 2.
+        chunk_rows (int): Matched row pairs compared at once.
+        progress (Optional[Callable[[float], None]]): Called with the completed fraction after every chunk.
+
+    Returns:
+        RowDiff: Changed rows, per-cell change flags of the changed rows (one bool column per
+        compared column) and the number of mismatches per compared column.
+    """
+    columns = diff_columns(df1, df2, key_columns1, key_columns2)
+    pos1, pos2 = match_rows(keys1, keys2)
+    changed1: List[np.ndarray] = []
+    changed2: List[np.ndarray] = []
+    flag_chunks: List[np.ndarray] = []
+    for start in range(0, len(pos1), chunk_rows):
+        chunk1 = pos1[start:start + chunk_rows]
+        chunk2 = pos2[start:start + chunk_rows]
+        flags = np.empty((len(chunk1), len(columns)), dtype=bool)
+        for j, col in enumerate(columns):
+            flags[:, j] = ~values_equal(df1[col].iloc[chunk1], df2[col].iloc[chunk2])
+        changed = flags.any(axis=1)
+        changed1.append(chunk1[changed])
+        changed2.append(chunk2[changed])
+        flag_chunks.append(flags[changed])
+        if progress:
+            progress(min(start + chunk_rows, len(pos1)) / len(pos1))
+    rows1 = np.concatenate(changed1) if changed1 else np.array([], dtype=np.int64)
+    rows2 = np.concatenate(changed2) if changed2 else np.array([], dtype=np.int64)
+    flag_values = np.concatenate(flag_chunks) if flag_chunks else np.empty((0, len(columns)), dtype=bool)
+    flags = pd.DataFrame(flag_values, columns=columns)
+    mismatches = flags.sum().astype(np.int64)
+    result = df1[list(key_columns1)].iloc[rows1].reset_index(drop=True)
+    # One product of the flag matrix with the column names joins the names of every row
+    names = flag_values.dot(np.array([col + ', ' for col in columns], dtype=object))
+    result[CHANGED_COLUMNS] = pd.Series(names, dtype=object).str[:-2].to_numpy()
+    for col in columns:
+        if mismatches[col]:
+            result[f'{col} (1)'] = df1[col].iloc[rows1].to_numpy()
+            result[f'{col} (2)'] = df2[col].iloc[rows2].to_numpy()
+    return result, flags, mismatches
+
+
+def changed_cells(changed: pd.DataFrame, flags: pd.DataFrame) -> np.ndarray:
+    """
+    Mark the cells of the changed-rows result whose value differs: both value columns
+    ("col (1)", "col (2)") of every flagged column.
+
+    Returns:
+        np.ndarray: Boolean matrix with the shape of changed.
+    """
+    marks = np.zeros(changed.shape, dtype=bool)
+    for col in flags.columns:
+        for name in (f'{col} (1)', f'{col} (2)'):
+            if name in changed.columns:
+                marks[:, changed.columns.get_loc(name)] = flags[col].to_numpy()
+    return marks
@@ -0,0 +1,425 @@
+"""
+Out-of-core compare: compares CSV files larger than memory by spilling hash partitions to disk,
+or by merging two files that are sorted by their key.
+"""
+import csv
+import heapq
+import math
+import os
+import pickle
+import tempfile
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from csvlotte.utils.compare import as_text, compare_keys, merge_compare_keys, slice_keys
+from csvlotte.utils.helpers import filter_namespace, sql_where_to_pandas
+from csvlotte.utils.normalize import normalize_keys
+
+# Amount of CSV text per partition pair that is loaded at once in the compare phase
+PARTITION_BYTES = 256 * 1024 * 1024
+# Rows per sorted run when a file has to be sorted before the merge
+SORT_RUN_ROWS = 1_000_000
+
+
+class NotSortedError(ValueError):
+    """Raised by the sort-merge compare when a file is not sorted by its key column."""
+
+
+class CsvSource:
+    """
+    Description of one CSV file taking part in a streamed compare.
+    """
+
+    def __init__(self, path: str, key_columns: Sequence[str], sep: str = ';', encoding: str = 'latin1',
+                 key_slice: Optional[slice] = None, filter_str: str = '', transforms: Sequence[str] = (),
+                 date_columns: Sequence[str] = ()) -> None:
+        """
+        Args:
+            path (str): Path of the CSV file.
+            key_columns (Sequence[str]): Key column(s); the slice applies to the first one.
+            sep (str): Field separator.
+            encoding (str): File encoding.
+            key_slice (Optional[slice]): Parsed slice for the first key column.
+            filter_str (str): SQL-like WHERE filter applied to every chunk.
+            transforms (Sequence[str]): Key normalisation transforms for all key columns.
+            date_columns (Sequence[str]): Columns the filter compares as dates (see declare_date_columns).
+        """
+        self.path = path
+        self.key_columns = list(key_columns)
+        self.sep = sep
+        self.encoding = encoding
+        self.key_slice = key_slice
+        self.filter_str = filter_str.strip() if filter_str else ''
+        self.transforms = list(transforms)
+        self.date_columns = list(date_columns)
+
+    def columns(self) -> List[str]:
+        """Return the header of the file without reading any rows."""
+        return list(pd.read_csv(self.path, sep=self.sep, encoding=self.encoding, nrows=0).columns)
+
+    def chunks(self, chunksize: int) -> Iterator[Tuple[pd.DataFrame, float]]:
+        """
+        Stream the file in chunks with the filter applied.
+
+        Columns are typed as pandas infers them, like for a file loaded into memory, so
+        filters compare numbers as numbers; keys() turns the key columns into text.
+
+        Yields:
+            Tuple[pd.DataFrame, float]: The filtered chunk and the fraction of the file read so far.
+        """
+        pandas_expr = sql_where_to_pandas(self.filter_str, date_columns=self.date_columns) if self.filter_str else ''
+        size = max(os.path.getsize(self.path), 1)
+        with open(self.path, 'rb') as f:
+            for chunk in pd.read_csv(f, sep=self.sep, encoding=self.encoding, chunksize=chunksize):
+                if pandas_expr:
+                    chunk = chunk.query(pandas_expr, engine="python", local_dict=filter_namespace(chunk))
+                yield chunk, min(f.tell() / size, 1.0)
+
+    def keys(self, df: pd.DataFrame) -> List[pd.Series]:
+        """
+        Return the (sliced and normalised) key columns of a chunk or partition as text.
+
+        Numbers are rendered with as_text(), so a key gives the same text whether a chunk read
+        it as integer or float (e.g. 10 and 10.0), matching the in-memory compare. This also holds
+        for numbers in text columns, which a spilled partition gets from chunks typed differently.
+        """
+        columns = [_key_text(df[c]) for c in self.key_columns]
+        keys = [slice_keys(columns[0], self.key_slice)] + columns[1:]
+        return [normalize_keys(k, self.transforms) for k in keys]
+
+
+def _key_text(values: pd.Series) -> pd.Series:
+    """
+    Render a key column as text with the as_text() rule, also for numbers mixed into a text column.
+
+    pandas types every chunk of a file on its own, so one chunk may read a key column as numbers and
+    another as text; the partition they are spilled to then holds both in one object column.
+    """
+    if is_numeric_dtype(values):
+        return as_text(values)
+    if pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+        return values
+    numbers = values.map(lambda v: isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_)))
+    if not numbers.any():
+        return values
+    text = values.copy()
+    text[numbers] = as_text(values[numbers].infer_objects())
+    return text
+
+
+def output_formats(source1: CsvSource, source2: CsvSource, out_paths: Sequence[str], sep: Optional[str] = None,
+                   encoding: Optional[str] = None) -> Dict[str, Tuple[str, str]]:
+    """
+    Return separator and encoding per result file (only1, common1, common2, only2): those of the
+    file its rows come from, unless sep or encoding are given for all results.
+    """
+    sources = [source1, source1, source2, source2]
+    return {path: (sep or source.sep, encoding or source.encoding) for path, source in zip(out_paths, sources)}
+
+
+def write_rows(frame: pd.DataFrame, path: str, formats: Dict[str, Tuple[str, str]], header: bool = False) -> None:
+    """Append rows (or only the header of an empty frame) to a result file in its format."""
+    sep, encoding = formats[path]
+    frame.to_csv(path, sep=sep, encoding=encoding, index=False, header=header, mode='a' if not header else 'w')
+
+
+def partition_count(source1: CsvSource, source2: CsvSource, partition_bytes: int = PARTITION_BYTES) -> int:
+    """
+    Choose the number of spill partitions so that one partition pair fits comfortably into memory.
+    """
+    total = 0
+    for source in (source1, source2):
+        try:
+            total += os.path.getsize(source.path)
+        except OSError:
+            pass
+    return max(8, math.ceil(total / partition_bytes))
+
+
+def _partition_ids(keys: List[pd.Series], n_partitions: int) -> pd.Series:
+    """Hash the key columns of a chunk row-wise and map them to a partition number."""
+    frame = pd.concat([k.reset_index(drop=True) for k in keys], axis=1, ignore_index=True)
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return pd.Series(hashes % n_partitions, index=keys[0].index)
+
+
+def _spill(source: CsvSource, spill_dir: str, side: int, n_partitions: int, chunksize: int,
+           progress: Optional[Callable[[float], None]], progress_range: Tuple[float, float]) -> None:
+    """Stream a file once and append every row to the spill file of its key-hash partition."""
+    for chunk, fraction in source.chunks(chunksize):
+        if not chunk.empty:
+            part = _partition_ids(source.keys(chunk), n_partitions)
+            for p, piece in chunk.groupby(part, sort=False):
+                with open(os.path.join(spill_dir, f'{side}_{p}.pkl'), 'ab') as f:
+                    pickle.dump(piece, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if progress:
+            start, end = progress_range
+            progress(start + (end - start) * fraction)
+
+
+def _load_partition(spill_dir: str, side: int, p: int, columns: List[str]) -> pd.DataFrame:
+    """Read all pieces of one spilled partition back into a DataFrame."""
+    path = os.path.join(spill_dir, f'{side}_{p}.pkl')
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+    pieces = []
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                pieces.append(pickle.load(f))
+            except EOFError:
+                break
+    return pd.concat(pieces) if len(pieces) > 1 else pieces[0]
+
+
+def partitioned_compare(source1: CsvSource, source2: CsvSource, out_paths: Sequence[str], sep: Optional[str] = None,
+                        encoding: Optional[str] = None, n_partitions: Optional[int] = None, chunksize: int = 100_000,
+                        tmp_dir: Optional[str] = None,
+                        progress: Optional[Callable[[float], None]] = None) -> Tuple[int, int, int, int]:
+    """
+    Compare two CSV files with bounded memory and stream the four results to CSV files.
+
+    Both files are streamed once and every row is appended to one of N spill files on local
+    disk, chosen by the hash of its key. Rows with equal keys always land in the same
+    partition, so matching partitions can be compared one pair at a time with compare_keys.
+    Results are appended to the output files partition by partition, so the output rows are
+    grouped by partition rather than in file order.
+
+    Args:
+        source1 (CsvSource): File 1 with key columns and filter.
+        source2 (CsvSource): File 2 with key columns and filter.
+        out_paths (Sequence[str]): Output paths for only1, common1, common2 and only2.
+        sep (Optional[str]): Field separator of the output files; that of the source file if None.
+        encoding (Optional[str]): Encoding of the output files; that of the source file if None.
+        n_partitions (Optional[int]): Number of spill partitions; derived from the file sizes if None.
+        chunksize (int): Rows per chunk when streaming the input files.
+        tmp_dir (Optional[str]): Directory for the spill files (system temp directory if None).
+        progress (Optional[Callable[[float], None]]): Called with the completed fraction (0..1).
+
+    Returns:
+        Tuple[int, int, int, int]: Row counts of only1, common1, common2 and only2.
+    """
+    if len(source1.key_columns) != len(source2.key_columns):
+        raise ValueError('Beide Dateien benötigen gleich viele Schlüsselspalten.')
+    if n_partitions is None:
+        n_partitions = partition_count(source1, source2)
+    columns1 = source1.columns()
+    columns2 = source2.columns()
+    out_columns = [columns1, columns1, columns2, columns2]
+    formats = output_formats(source1, source2, out_paths, sep, encoding)
+    # Write the headers first, so empty results are still valid CSV files
+    for path, columns in zip(out_paths, out_columns):
+        write_rows(pd.DataFrame(columns=columns), path, formats, header=True)
+    counts = [0, 0, 0, 0]
+    with tempfile.TemporaryDirectory(prefix='csvlotte_', dir=tmp_dir) as spill_dir:
+        _spill(source1, spill_dir, 1, n_partitions, chunksize, progress, (0.0, 0.4))
+        _spill(source2, spill_dir, 2, n_partitions, chunksize, progress, (0.4, 0.8))
+        for p in range(n_partitions):
+            part1 = _load_partition(spill_dir, 1, p, columns1)
+            part2 = _load_partition(spill_dir, 2, p, columns2)
+            if not part1.empty or not part2.empty:
+                positions = compare_keys(source1.keys(part1), source2.keys(part2))
+                frames = [part1, part1, part2, part2]
+                for i, (path, frame, pos) in enumerate(zip(out_paths, frames, positions)):
+                    if len(pos):
+                        write_rows(frame.iloc[pos], path, formats)
+                        counts[i] += len(pos)
+            if progress:
+                progress(0.8 + 0.2 * (p + 1) / n_partitions)
+    return tuple(counts)
+
+
+def numeric_order(source: CsvSource, sample_rows: int = 10_000) -> bool:
+    """
+    Tell whether a file is ordered by the numeric value of its key: the unsliced, untransformed
+    key column holds numbers (as pandas infers them from the first sample_rows rows).
+    """
+    if source.key_slice is not None or source.transforms:
+        return False
+    head = pd.read_csv(source.path, sep=source.sep, encoding=source.encoding, usecols=source.key_columns[:1],
+                       nrows=sample_rows)
+    return is_numeric_dtype(head.iloc[:, 0])
+
+
+def _merge_keys(source: CsvSource, chunk: pd.DataFrame, numeric: bool = False) -> np.ndarray:
+    """
+    Return the ordering keys of a chunk: the key column as float if the files are ordered
+    numerically (missing values first, as -inf), else the prepared first key column as text
+    (missing values as '').
+    """
+    if numeric:
+        column = chunk[source.key_columns[0]]
+        if not is_numeric_dtype(column):
+            raise ValueError(f"Die Schlüsselspalte '{source.key_columns[0]}' enthält nicht nur Zahlen.")
+        return column.to_numpy(dtype=np.float64, na_value=-np.inf)
+    return source.keys(chunk)[0].fillna('').to_numpy(dtype=object)
+
+
+def _sorted_chunks(source: CsvSource, chunksize: int, side: int,
+                   numeric: bool = False) -> Iterator[Tuple[pd.DataFrame, np.ndarray, float]]:
+    """Stream a file in chunks and verify on the fly that its keys are ascending."""
+    last = None
+    for chunk, fraction in source.chunks(chunksize):
+        keys = _merge_keys(source, chunk, numeric)
+        if len(keys):
+            if (last is not None and keys[0] < last) or (keys[1:] < keys[:-1]).any():
+                raise NotSortedError(f'Datei {side} ist nicht nach der Schlüsselspalte sortiert.')
+            last = keys[-1]
+        yield chunk.reset_index(drop=True), keys, fraction
+
+
+def external_sort(source: CsvSource, sort_dir: str, side: int, run_rows: int = SORT_RUN_ROWS,
+                  progress: Optional[Callable[[float], None]] = None,
+                  progress_range: Tuple[float, float] = (0.0, 1.0), numeric: bool = False) -> CsvSource:
+    """
+    Sort a file by its key column with bounded memory.
+
+    The filtered file is cut into runs of run_rows rows that are sorted in memory and written
+    to sort_dir; the runs are then merged row by row with a k-way heap merge into one sorted
+    CSV file. Only one row per run is held in memory during the merge.
+
+    Args:
+        source (CsvSource): File to sort; its filter is applied while sorting.
+        sort_dir (str): Directory for the runs and the sorted file.
+        side (int): File number, used for the file names.
+        run_rows (int): Rows per sorted run.
+        progress (Optional[Callable[[float], None]]): Called with the completed fraction.
+        progress_range (Tuple[float, float]): Part of the overall progress covered by the sort.
+        numeric (bool): Sort by the numeric value of the key column instead of its text.
+
+    Returns:
+        CsvSource: The sorted copy with the same key columns and slice and without filter.
+    """
+    start, end = progress_range
+    runs = []
+    for i, (chunk, fraction) in enumerate(source.chunks(run_rows)):
+        if not chunk.empty:
+            keys = _merge_keys(source, chunk, numeric)
+            order = np.argsort(keys, kind='stable')
+            # Each run row starts with its ordering key, so the merge needs no slicing or normalising
+            run = chunk.iloc[order].copy()
+            run.insert(0, '_key', keys[order], allow_duplicates=True)
+            run_path = os.path.join(sort_dir, f'{side}_run_{i}.csv')
+            run.to_csv(run_path, sep=';', encoding='utf-8', index=False, header=False)
+            runs.append(run_path)
+        if progress:
+            progress(start + (end - start) * 0.5 * fraction)
+    columns = source.columns()
+    out_path = os.path.join(sort_dir, f'{side}_sorted.csv')
+    files = [open(path, newline='', encoding='utf-8') for path in runs]
+    try:
+        readers = [csv.reader(f, delimiter=';') for f in files]
+        with open(out_path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out, delimiter=';')
+            writer.writerow(columns)
+            run_key = (lambda row: float(row[0])) if numeric else (lambda row: row[0])
+            writer.writerows(row[1:] for row in heapq.merge(*readers, key=run_key))
+    finally:
+        for f in files:
+            f.close()
+    if progress:
+        progress(end)
+    return CsvSource(out_path, source.key_columns, sep=';', encoding='utf-8', key_slice=source.key_slice,
+                     transforms=source.transforms)
+
+
+def sorted_merge_compare(source1: CsvSource, source2: CsvSource, out_paths: Sequence[str], sep: Optional[str] = None,
+                         encoding: Optional[str] = None, chunksize: int = 100_000, presort: bool = False,
+                         tmp_dir: Optional[str] = None,
+                         progress: Optional[Callable[[float], None]] = None) -> Tuple[int, int, int, int]:
+    """
+    Compare two CSV files that are sorted by their key column in one streaming merge pass.
+
+    Both files are read chunk by chunk in parallel. All buffered rows with a key below the
+    smallest last buffered key of the files still being read are complete on both sides and
+    are classified with merge_compare_keys and written out; the rest is carried over. Memory
+    stays bounded by one chunk per file plus the rows of the current key, independent of the
+    file sizes, and no spill files are needed. Output rows keep the order of the inputs.
+    If both key columns hold numbers, the files are expected in numeric order (1, 2, 9, 10),
+    else in text order.
+
+    Args:
+        source1 (CsvSource): File 1 with one key column and filter.
+        source2 (CsvSource): File 2 with one key column and filter.
+        out_paths (Sequence[str]): Output paths for only1, common1, common2 and only2.
+        sep (Optional[str]): Field separator of the output files; that of the source file if None.
+        encoding (Optional[str]): Encoding of the output files; that of the source file if None.
+        chunksize (int): Rows per chunk when streaming the input files.
+        presort (bool): Sort both files with external_sort first instead of requiring sorted input.
+        tmp_dir (Optional[str]): Directory for the sorted copies (system temp directory if None).
+        progress (Optional[Callable[[float], None]]): Called with the completed fraction (0..1).
+
+    Returns:
+        Tuple[int, int, int, int]: Row counts of only1, common1, common2 and only2.
+
+    Raises:
+        NotSortedError: If presort is False and a file is not sorted ascending by its key.
+    """
+    if len(source1.key_columns) != 1 or len(source2.key_columns) != 1:
+        raise ValueError('Der sortierte Abgleich unterstützt nur eine Schlüsselspalte.')
+    columns1 = source1.columns()
+    columns2 = source2.columns()
+    # Taken before presorting, which replaces the sources by sorted copies in another format
+    formats = output_formats(source1, source2, out_paths, sep, encoding)
+    numeric = numeric_order(source1) and numeric_order(source2)
+    for path, columns in zip(out_paths, [columns1, columns1, columns2, columns2]):
+        write_rows(pd.DataFrame(columns=columns), path, formats, header=True)
+    counts = [0, 0, 0, 0]
+    merge_start = 0.0
+    with tempfile.TemporaryDirectory(prefix='csvlotte_', dir=tmp_dir) as sort_dir:
+        if presort:
+            source1 = external_sort(source1, sort_dir, 1, progress=progress, progress_range=(0.0, 0.25), numeric=numeric)
+            source2 = external_sort(source2, sort_dir, 2, progress=progress, progress_range=(0.25, 0.5), numeric=numeric)
+            merge_start = 0.5
+        streams = [_sorted_chunks(source1, chunksize, 1, numeric), _sorted_chunks(source2, chunksize, 2, numeric)]
+        frames = [pd.DataFrame(columns=columns1), pd.DataFrame(columns=columns2)]
+        key_dtype = np.float64 if numeric else object
+        keys = [np.array([], dtype=key_dtype), np.array([], dtype=key_dtype)]
+        done = [False, False]
+        fractions = [0.0, 0.0]
+
+        def pull(i: int) -> None:
+            try:
+                frame, chunk_keys, fractions[i] = next(streams[i])
+            except StopIteration:
+                done[i] = True
+                return
+            frames[i] = pd.concat([frames[i], frame], ignore_index=True) if len(keys[i]) else frame
+            keys[i] = np.concatenate([keys[i], chunk_keys])
+
+        pull(0)
+        pull(1)
+        while True:
+            # A file that is still being read needs buffered rows to bound the merge
+            for i in (0, 1):
+                while not done[i] and not len(keys[i]):
+                    pull(i)
+            open_sides = [i for i in (0, 1) if not done[i]]
+            bound = min(keys[i][-1] for i in open_sides) if open_sides else None
+            take = [len(keys[i]) if bound is None else int(np.searchsorted(keys[i], bound, side='left'))
+                    for i in (0, 1)]
+            if take[0] or take[1]:
+                positions = merge_compare_keys(pd.Series(keys[0][:take[0]]), pd.Series(keys[1][:take[1]]))
+                parts = [frames[0].iloc[:take[0]], frames[0].iloc[:take[0]],
+                         frames[1].iloc[:take[1]], frames[1].iloc[:take[1]]]
+                for n, (path, frame, pos) in enumerate(zip(out_paths, parts, positions)):
+                    if len(pos):
+                        write_rows(frame.iloc[pos], path, formats)
+                        counts[n] += len(pos)
+                for i in (0, 1):
+                    frames[i] = frames[i].iloc[take[i]:].reset_index(drop=True)
+                    keys[i] = keys[i][take[i]:]
+            if bound is None:
+                break
+            # Rows with the bound key may continue in the next chunk of the file that set it
+            for i in open_sides:
+                if keys[i][-1] == bound:
+                    pull(i)
+            if progress:
+                progress(merge_start + (1.0 - merge_start) * sum(fractions) / 2)
+    if progress:
+        progress(1.0)
+    return tuple(counts)
@@ -0,0 +1,199 @@
+"""
+Fuzzy compare: finds probable matches between keys that differ slightly, e.g. in names or addresses.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from csvlotte.utils.compare import Keys, as_key_columns
+
+# Neighbours on each side of a key in the sorted order that become candidate pairs
+FUZZY_WINDOW = 4
+# Keys are compared on at most this many characters
+FUZZY_MAX_LEN = 64
+# Candidate pairs scored in one vectorised batch
+FUZZY_BATCH = 20_000
+# Below this number of candidate pairs the process start-up costs more than it saves
+FUZZY_PARALLEL_MIN_PAIRS = 200_000
+
+
+def key_text(keys: Keys) -> pd.Series:
+    """
+    Return the key of every row as one text; the values of composite keys are joined by spaces.
+    """
+    columns = [col.astype(str).where(col.notna(), '').reset_index(drop=True) for col in as_key_columns(keys)]
+    text = columns[0]
+    for col in columns[1:]:
+        text = text + ' ' + col
+    return text
+
+
+def _encode(strings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode strings as a (n, longest length) array of code points, padded with 0, and their lengths."""
+    series = pd.Series(strings, dtype=object).str.slice(0, FUZZY_MAX_LEN)
+    lengths = series.str.len().to_numpy(dtype=np.int64)
+    width = max(int(lengths.max()), 1)
+    fixed = np.array(series.tolist(), dtype=f'<U{width}')
+    return fixed.view(np.uint32).reshape(len(series), width), lengths
+
+
+def levenshtein_similarity(strings1: np.ndarray, strings2: np.ndarray) -> np.ndarray:
+    """
+    Score pairs of strings with the normalised Levenshtein similarity 1 - distance / longer length.
+
+    The edit-distance matrix is filled row by row for all pairs at once. Substitutions and
+    deletions come from the previous row; insertions within a row are resolved with a
+    cumulative minimum, so each row costs a few numpy operations over all pairs.
+
+    Args:
+        strings1 (np.ndarray): First string of every pair.
+        strings2 (np.ndarray): Second string of every pair.
+
+    Returns:
+        np.ndarray: Similarity per pair between 0 (nothing in common) and 1 (identical).
+    """
+    n = len(strings1)
+    if n == 0:
+        return np.array([], dtype=np.float64)
+    codes1, len1 = _encode(strings1)
+    codes2, len2 = _encode(strings2)
+    width1 = int(len1.max())
+    width2 = int(len2.max())
+    steps = np.arange(width2 + 1, dtype=np.int32)
+    prev = np.tile(steps, (n, 1))
+    distance = prev[np.arange(n), len2].copy()  # distance for empty first strings
+    for i in range(1, width1 + 1):
+        cost = (codes2[:, :width2] != codes1[:, i - 1:i]).astype(np.int32)
+        best = np.minimum(prev[:, :-1] + cost, prev[:, 1:] + 1)
+        row = np.empty_like(prev)
+        row[:, 0] = i
+        row[:, 1:] = best
+        row = np.minimum.accumulate(row - steps, axis=1) + steps
+        done = len1 == i
+        distance[done] = row[done, len2[done]]
+        prev = row
+    longest = np.maximum(np.maximum(len1, len2), 1)
+    return 1.0 - distance / longest
+
+
+def candidate_pairs(values1: np.ndarray, values2: np.ndarray, window: int = FUZZY_WINDOW) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build candidate pairs with a sorted-neighbourhood blocking index instead of scoring all n·m pairs.
+
+    The keys of both files are sorted together, once as they are and once reversed (to also
+    catch differences at the start), and every key is paired with the keys of the other file
+    among its next `window` neighbours.
+
+    Args:
+        values1 (np.ndarray): Distinct key texts of file 1.
+        values2 (np.ndarray): Distinct key texts of file 2.
+        window (int): Number of following neighbours considered for every key.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Indices into values1 and values2 of the distinct candidate pairs.
+    """
+    n1 = len(values1)
+    n2 = len(values2)
+    if not n1 or not n2:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+    combined = pd.Series(np.concatenate([values1, values2]), dtype=object)
+    is_first = np.arange(n1 + n2) < n1
+    pair_ids: List[np.ndarray] = []
+    for sort_keys in (combined, combined.str[::-1]):
+        order = np.argsort(sort_keys.to_numpy(), kind='stable')
+        side = is_first[order]
+        for d in range(1, window + 1):
+            cross = side[:-d] != side[d:]
+            a = order[:-d][cross]
+            b = order[d:][cross]
+            idx1 = np.where(a < n1, a, b)
+            idx2 = np.where(a < n1, b, a) - n1
+            pair_ids.append(idx1 * n2 + idx2)
+    ids = np.unique(np.concatenate(pair_ids))
+    return ids // n2, ids % n2
+
+
+def _score_batches(strings1: np.ndarray, strings2: np.ndarray, workers: Optional[int],
+                   progress: Optional[Callable[[float], None]] = None) -> np.ndarray:
+    """
+    Score all candidate pairs in length-bucketed batches, in a process pool for many pairs.
+    progress receives the fraction of batches scored after every batch.
+    """
+    longest = np.maximum(pd.Series(strings1, dtype=object).str.len().to_numpy(),
+                         pd.Series(strings2, dtype=object).str.len().to_numpy())
+    # Batches of similar length keep the padded code arrays small
+    order = np.argsort(longest, kind='stable')
+    batches = [order[start:start + FUZZY_BATCH] for start in range(0, len(order), FUZZY_BATCH)]
+    scores = np.empty(len(order), dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(order) < FUZZY_PARALLEL_MIN_PAIRS:
+        for n, batch in enumerate(batches):
+            scores[batch] = levenshtein_similarity(strings1[batch], strings2[batch])
+            if progress:
+                progress((n + 1) / len(batches))
+        return scores
+    # Spawned, not forked: the compare runs in a thread of the Tk process
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(levenshtein_similarity, strings1[batch], strings2[batch]) for batch in batches]
+        try:
+            for n, (batch, future) in enumerate(zip(batches, futures)):
+                scores[batch] = future.result()
+                if progress:
+                    progress((n + 1) / len(batches))
+        except BaseException:
+            # E.g. a cancel raised by progress: the batches not started yet are dropped
+            for future in futures:
+                future.cancel()
+            raise
+    return scores
+
+
+def fuzzy_match(keys1: pd.Series, keys2: pd.Series, threshold: float = 0.85, window: int = FUZZY_WINDOW,
+                workers: Optional[int] = None, progress: Optional[Callable[[float], None]] = None) -> pd.DataFrame:
+    """
+    Find probable matches between the key texts of two files.
+
+    Distinct keys are paired by the sorted-neighbourhood blocking of candidate_pairs and the
+    candidates are scored with levenshtein_similarity. Identical keys are left out, as they
+    are exact matches already, and so are pairs whose lengths alone rule out the threshold.
+
+    Args:
+        keys1 (pd.Series): Key texts of file 1 (see key_text), usually the rows only in file 1.
+        keys2 (pd.Series): Key texts of file 2, usually the rows only in file 2.
+        threshold (float): Minimum similarity (0..1) of a reported pair.
+        window (int): Neighbourhood size of the blocking index.
+        workers (Optional[int]): Worker processes for scoring (all cores if None).
+        progress (Optional[Callable[[float], None]]): Called with the completed fraction after the
+            candidate pairs are built and after every scored batch.
+
+    Returns:
+        pd.DataFrame: One row per probable match with both keys and the similarity, best first.
+    """
+    values1 = pd.unique(keys1.dropna().to_numpy(dtype=object))
+    values2 = pd.unique(keys2.dropna().to_numpy(dtype=object))
+    idx1, idx2 = candidate_pairs(values1, values2, window)
+    strings1 = values1[idx1]
+    strings2 = values2[idx2]
+    len1 = pd.Series(strings1, dtype=object).str.slice(0, FUZZY_MAX_LEN).str.len().to_numpy()
+    len2 = pd.Series(strings2, dtype=object).str.slice(0, FUZZY_MAX_LEN).str.len().to_numpy()
+    # The length difference alone is a lower bound of the distance, so hopeless pairs are never scored
+    possible = (strings1 != strings2) & (np.abs(len1 - len2) <= (1.0 - threshold) * np.maximum(len1, len2))
+    strings1 = strings1[possible]
+    strings2 = strings2[possible]
+    if progress:
+        # Building the candidates is counted as the first tenth, scoring them as the rest
+        progress(0.1)
+    scores = _score_batches(strings1, strings2, workers,
+                            (lambda fraction: progress(0.1 + 0.9 * fraction)) if progress else None)
+    keep = scores >= threshold
+    result = pd.DataFrame({
+        'Schlüssel 1': strings1[keep],
+        'Schlüssel 2': strings2[keep],
+        'Ähnlichkeit': np.round(scores[keep], 3),
+    })
+    return result.sort_values('Ähnlichkeit', ascending=False, kind='stable', ignore_index=True)
@@ -1,9 +1,207 @@
 """
-Utility functions for SQL-like WHERE to pandas expression conversion.
+Utility functions for SQL-like WHERE to pandas expression conversion, DATE literals and column widths.
 """
 import re
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
-def sql_where_to_pandas(query_str: str, df_name: str ="df") -> str:
+import numpy as np
+import pandas as pd
+
+# ISO 8601 dates with an optional time part, e.g. "2024-01-31" or "2024-01-31 13:45:00"
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+# Rows inspected to estimate the display width of the columns of a table
+WIDTH_SAMPLE_ROWS = 1000
+
+# Per DataFrame (by id, dropped with the frame): its declared date columns and the columns parsed as dates so far
+_frame_dates: Dict[int, Dict[str, Any]] = {}
+
+
+def sample_positions(n_rows: int, sample_rows: int = WIDTH_SAMPLE_ROWS) -> np.ndarray:
+    """
+    Pick a bounded sample of row positions: the first and last rows plus rows drawn at random
+    (with a fixed seed) from between them, so the sample is the same for the same row count.
+
+    Args:
+        n_rows (int): Number of rows to sample from.
+        sample_rows (int): Maximum sample size.
+
+    Returns:
+        np.ndarray: Sorted row positions; all rows if there are at most sample_rows.
+    """
+    if n_rows <= sample_rows:
+        return np.arange(n_rows)
+    edge = sample_rows // 3
+    middle = edge + np.random.default_rng(0).choice(n_rows - 2 * edge, sample_rows - 2 * edge, replace=False)
+    return np.sort(np.concatenate([np.arange(edge), middle, np.arange(n_rows - edge, n_rows)]))
+
+
+def text_lengths(df: pd.DataFrame) -> List[int]:
+    """
+    Return the length of the longest value per column as shown in a table (its str() form),
+    computed with vectorised string operations instead of a loop over the cells.
+
+    Returns:
+        List[int]: One length per column, in column order (0 for an empty frame).
+    """
+    if df.empty:
+        return [0] * df.shape[1]
+    return [int(df.iloc[:, i].astype(str).str.len().max()) for i in range(df.shape[1])]
+
+
+def to_dates(values: pd.Series) -> pd.Series:
+    """
+    Read a column as dates for a comparison with a DATE literal.
+
+    Text is parsed as ISO 8601 (with or without a time part); values that are no date become
+    NaT and therefore match no date comparison. Columns that already hold dates are returned as is.
+
+    Args:
+        values (pd.Series): Column of the filtered DataFrame.
+
+    Returns:
+        pd.Series: The column as datetime64.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, format='ISO8601', errors='coerce')
+
+
+def _dates_entry(df: pd.DataFrame) -> Dict[str, Any]:
+    """Return the date cache entry of a DataFrame, creating it on first use."""
+    entry = _frame_dates.get(id(df))
+    if entry is None or entry['frame']() is not df:
+        entry = {'frame': weakref.ref(df), 'declared': [], 'dates': {}}
+        _frame_dates[id(df)] = entry
+        # The entry goes with the frame, so a later frame reusing the id starts empty
+        weakref.finalize(df, _frame_dates.pop, id(df), None)
+    return entry
+
+
+def date_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """
+    Return a column of a DataFrame as dates (see to_dates), parsed only on first use.
+
+    The parsed column is kept as long as the DataFrame lives, so every later filter and live
+    preview on the same loaded frame compares datetime64 values without parsing the text
+    again. Loaded frames are never changed in place; filtering creates a new frame.
+
+    Args:
+        df (pd.DataFrame): DataFrame the column belongs to.
+        column (str): Column name.
+
+    Returns:
+        pd.Series: The column as datetime64.
+    """
+    dates = _dates_entry(df)['dates']
+    if column not in dates:
+        dates[column] = to_dates(df[column])
+    return dates[column]
+
+
+def declare_date_columns(df: pd.DataFrame, columns: Iterable[str], parsed_from: Optional[pd.DataFrame] = None) -> None:
+    """
+    Declare columns of a loaded DataFrame as dates and parse them once, right away.
+
+    Filters compare declared columns as dates also with plain quoted values (e.g. booked > '2024-01-31',
+    see sql_where_to_pandas); the DataFrame keeps its text. A frame of rows taken from another
+    one (e.g. filtered) passes it as parsed_from and takes over its parsed dates instead of parsing again.
+
+    Args:
+        df (pd.DataFrame): The loaded (or filtered) DataFrame.
+        columns (Iterable[str]): Names of the date columns.
+        parsed_from (Optional[pd.DataFrame]): Frame whose rows df holds, with the same index labels.
+
+    Raises:
+        ValueError: If a column does not exist.
+    """
+    columns = list(columns)
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Unbekannte Datumsspalte(n): {', '.join(missing)}")
+    entry = _dates_entry(df)
+    entry['declared'] = columns
+    source = _frame_dates.get(id(parsed_from)) if parsed_from is not None else None
+    for col in columns:
+        if (source is not None and source['frame']() is parsed_from and col in source['dates']
+                and parsed_from.index.is_unique):
+            entry['dates'][col] = source['dates'][col].reindex(df.index)
+        else:
+            date_column(df, col)
+
+
+def declared_date_columns(df: Optional[pd.DataFrame]) -> List[str]:
+    """Return the columns declared as dates for a DataFrame (see declare_date_columns)."""
+    if df is None:
+        return []
+    entry = _frame_dates.get(id(df))
+    if entry is None or entry['frame']() is not df:
+        return []
+    return list(entry['declared'])
+
+
+def parse_column_list(text: str) -> List[str]:
+    """Split a comma-separated list of column names as entered in the UI."""
+    return [name.strip() for name in text.split(',') if name.strip()]
+
+
+def filter_namespace(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Return the local names a filter from sql_where_to_pandas() is evaluated with.
+
+    'df' gives access to columns with dots in their name, 'to_date' types a column only where
+    it is compared with a DATE literal (or is a declared date column); the DataFrame itself keeps
+    its text, so LIKE filters and compare keys see the values as loaded. Columns of df are parsed
+    once per DataFrame (see date_column), other values on every call.
+
+    Args:
+        df (pd.DataFrame): DataFrame the filter is evaluated on.
+
+    Returns:
+        Dict[str, Any]: Names for the local_dict of DataFrame.query() / DataFrame.eval().
+    """
+    def to_date(values: pd.Series) -> pd.Series:
+        # query() hands over a new Series of the column, so it is recognised by name, index and data
+        if (values.name in df.columns and values.index is df.index
+                and np.may_share_memory(values.to_numpy(), df[values.name].to_numpy())):
+            return date_column(df, values.name)
+        return to_dates(values)
+
+    return {'df': df, 'to_date': to_date}
+
+
+def _date_value(value: str) -> pd.Timestamp:
+    """Read a date literal in ISO ("2024-01-31") or German ("31.01.2024") notation."""
+    value = value.strip()
+    if _ISO_DATE_RE.match(value):
+        return pd.Timestamp(value)
+    return pd.to_datetime(value, dayfirst=True)
+
+
+def _quoted_date(ts: pd.Timestamp) -> str:
+    """Quote a timestamp as ISO literal, without a time part for whole days."""
+    if ts == ts.normalize():
+        return f"'{ts.strftime('%Y-%m-%d')}'"
+    return f"'{ts.isoformat()}'"
+
+
+def date_literal(value: str) -> str:
+    """
+    Normalise a date literal to an ISO string, which pandas compares against datetime64 columns.
+
+    Args:
+        value (str): Date as ISO ("2024-01-31") or German ("31.01.2024") notation.
+
+    Returns:
+        str: Quoted ISO literal, e.g. "'2024-01-31'".
+
+    Raises:
+        ValueError: If the value is not a valid date.
+    """
+    return _quoted_date(_date_value(value))
+
+
+def sql_where_to_pandas(query_str: str, df_name: str ="df", date_columns: Sequence[str] = ()) -> str:
     """
     Convert a comprehensive SQL-like WHERE condition into a pandas-compatible boolean expression string.
 
@@ -13,6 +211,8 @@ def sql_where_to_pandas(query_str: str, df_name: str ="df") -> str:
     - IN / NOT IN with value lists (e.g., "col IN ('a', 'b')")
     - IS NULL / IS NOT NULL (e.g., "col IS NULL")
     - BETWEEN (e.g., "col BETWEEN 10 AND 20")
+    - Date literals (e.g., "col > DATE('2024-01-01')" or "col > DATE '31.12.2024'"), and plain
+      quoted values compared with a declared date column (e.g., "booked > '2024-01-01'")
     - Standard operators: =, !=, <>, <, >, <=, >=
     - Logical operators: AND, OR, NOT
     - Parentheses for grouping
@@ -20,9 +220,11 @@ def sql_where_to_pandas(query_str: str, df_name: str ="df") -> str:
     Args:
         query_str (str): SQL-like WHERE clause.
         df_name (str): DataFrame name to prefix column names for dot notation support.
+        date_columns (Sequence[str]): Columns declared as dates (see declare_date_columns).
 
     Returns:
-        str: Equivalent pandas expression for DataFrame.query().
+        str: Equivalent pandas expression for DataFrame.query(), to be evaluated with
+        local_dict=filter_namespace(df).
     """
     def prefix_column_name(col):
         """Prefix column name with @df_name to handle dot notation in pandas.query()."""
@@ -93,7 +295,55 @@ def sql_where_to_pandas(query_str: str, df_name: str ="df") -> str:
     # Updated regex pattern to handle column names with dots - more specific to avoid capturing values
     col_pattern = r"([\w\.]+)"
     
-    # Handle single = operator FIRST (convert to ==) - preserve quotes
+    # DATE('...') or DATE '...'; the literal is in group 1 or 2 of the pattern
+    date_pattern = r"DATE\s*(?:\(\s*'([^']*)'\s*\)|'([^']*)')"
+
+    def date_of(match, group):
+        return _date_value(match.group(group) if match.group(group) is not None else match.group(group + 1))
+
+    def date_range(col, low, high):
+        # A whole end day includes every time of that day, like equality with a day does
+        if high == high.normalize():
+            return f"({col} >= {_quoted_date(low)}) & ({col} < {_quoted_date(high + pd.Timedelta(days=1))})"
+        return f"({col} >= {_quoted_date(low)}) & ({col} <= {_quoted_date(high)})"
+
+    def date_between_to_pandas(match):
+        col = f"@to_date({prefix_column_name(match.group(1))})"
+        return date_range(col, date_of(match, 2), date_of(match, 4))
+
+    def date_comparison_to_pandas(match):
+        # The column is only typed for this comparison (see filter_namespace); the DataFrame keeps its text
+        col = f"@to_date({prefix_column_name(match.group(1))})"
+        op = match.group(2)
+        ts = date_of(match, 3)
+        if op not in ('==', '=', '!=', '<>'):
+            return f"{col} {op} {_quoted_date(ts)}"
+        # pandas.query() rewrites "== 'string'" to isin(), which does not match datetime64 values,
+        # so equality is expressed as a range: a whole day matches every time of that day
+        expr = date_range(col, ts, ts)
+        if op in ('!=', '<>'):
+            return f"~({expr})"
+        return expr
+    
+    # Plain quoted values compared with a declared date column are read as DATE literals
+    for date_col in date_columns:
+        name = re.escape(date_col)
+        query_str = re.sub(rf"(?<![\w\.])({name})\s+BETWEEN\s+'([^']*)'\s+AND\s+'([^']*)'",
+                           lambda m: f"{m.group(1)} BETWEEN DATE('{m.group(2)}') AND DATE('{m.group(3)}')",
+                           query_str, flags=re.IGNORECASE)
+        query_str = re.sub(rf"(?<![\w\.])({name})\s*(==|=|!=|<>|>=|<=|>|<)\s*'([^']*)'",
+                           lambda m: f"{m.group(1)} {m.group(2)} DATE('{m.group(3)}')", query_str)
+
+    # Handle date literals FIRST, so the operators below only see plain quoted values
+    query_str = re.sub(rf"\b([\w\.]+)\s+BETWEEN\s+{date_pattern}\s+AND\s+{date_pattern}",
+                      date_between_to_pandas, query_str, flags=re.IGNORECASE)
+    query_str = re.sub(rf"\b([\w\.]+)\s*(==|=|!=|<>|>=|<=|>|<)\s*{date_pattern}",
+                      date_comparison_to_pandas, query_str, flags=re.IGNORECASE)
+    # Remaining literals (e.g. in IN lists) become plain ISO strings
+    query_str = re.sub(rf"\b{date_pattern}", lambda m: date_literal(m.group(1) if m.group(1) is not None else m.group(2)),
+                      query_str, flags=re.IGNORECASE)
+    
+    # Handle single = operator (convert to ==) - preserve quotes
     # First handle quoted strings - be more specific about column names
     query_str = re.sub(r"\b([\w\.]+)\s*=\s*'([^']*)'", lambda m: f"{prefix_column_name(m.group(1))} == '{m.group(2)}'", query_str)
     # Then handle unquoted values - be more specific  
@@ -101,7 +351,7 @@ def sql_where_to_pandas(query_str: str, df_name: str ="df") -> str:
     query_str = re.sub(r"\b([\w\.]+)\s*=\s*([a-zA-Z_]\w*)\b", lambda m: f"{prefix_column_name(m.group(1))} == {m.group(2)}", query_str)
     
     # Handle BETWEEN
-    query_str = re.sub(r"\b([\w\.]+)\s+BETWEEN\s+(\d+\.?\d*)\s+AND\s+(\d+\.?\d*)", 
+    query_str = re.sub(r"\b([\w\.]+)\s+BETWEEN\s+(\d+\.?\d*|'[^']*')\s+AND\s+(\d+\.?\d*|'[^']*')", 
                       between_to_pandas, query_str, flags=re.IGNORECASE)
     
     # Handle IS NOT NULL
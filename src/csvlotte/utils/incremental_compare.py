@@ -0,0 +1,193 @@
+"""
+Incremental compare: keeps the encoded keys of each file between compares, so a re-compare
+after changing one file (e.g. its filter) only encodes that file again.
+"""
+import weakref
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from csvlotte.utils.asymmetric_compare import KeyProbe
+from csvlotte.utils.compare import Keys, Partitions, align_key_columns, as_key_columns
+
+
+class ProbeCache:
+    """
+    Cache of KeyProbe encodings (factorised key codes plus hash indexes) per file.
+
+    Entries are keyed by the identity of the prepared key columns, which KeyCache returns
+    unchanged as long as a file, its slice and its normalisation stay the same. The columns
+    are only referenced weakly, so a changed side simply misses the cache and is encoded
+    again, while the other side keeps its entry.
+    """
+
+    def __init__(self, max_entries: int = 4) -> None:
+        """
+        Args:
+            max_entries (int): Encoded files kept; the least recently used is dropped first.
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[int, ...], Tuple[List[weakref.ref], KeyProbe]]' = OrderedDict()
+
+    def get(self, keys: Keys) -> Optional[KeyProbe]:
+        """Return the stored encoding of the key columns of one file, or None if they changed."""
+        columns = as_key_columns(keys)
+        key = tuple(id(col) for col in columns)
+        entry = self._entries.get(key)
+        if entry is None or not all(ref() is col for ref, col in zip(entry[0], columns)):
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, keys: Keys, probe: KeyProbe) -> None:
+        """Store the encoding of the key columns of one file."""
+        columns = as_key_columns(keys)
+        key = tuple(id(col) for col in columns)
+        self._entries[key] = ([weakref.ref(col) for col in columns], probe)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all encodings."""
+        self._entries.clear()
+
+
+def _partitions(probe1: KeyProbe, probe2: KeyProbe, mapped: np.ndarray, probed_first: bool) -> Partitions:
+    """
+    Derive the row partitions from the codes of one file's distinct keys in the other file.
+
+    Args:
+        probe1 (KeyProbe): Encoded keys of file 1.
+        probe2 (KeyProbe): Encoded keys of file 2.
+        mapped (np.ndarray): For every distinct key of the probing file its code in the probed file, or -1.
+        probed_first (bool): True if file 1 was probed (mapped holds codes of file 1 for keys of file 2).
+    """
+    target, source = (probe1, probe2) if probed_first else (probe2, probe1)
+    mask_source = mapped[source.codes] >= 0
+    found = np.zeros(target.size, dtype=bool)
+    found[mapped[mapped >= 0]] = True
+    mask_target = found[target.codes]
+    mask_common1, mask_common2 = (mask_target, mask_source) if probed_first else (mask_source, mask_target)
+    return (
+        np.flatnonzero(~mask_common1),
+        np.flatnonzero(mask_common1),
+        np.flatnonzero(mask_common2),
+        np.flatnonzero(~mask_common2),
+    )
+
+
+def _split_codes(codes: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Turn shared codes (0..size-1) of one file into dense codes of that file alone.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The file's codes and the shared code of each of its distinct values.
+    """
+    present = np.zeros(size, dtype=bool)
+    present[codes] = True
+    shared = np.flatnonzero(present)
+    dense = np.full(size, -1, dtype=np.int64)
+    dense[shared] = np.arange(len(shared))
+    return dense[codes], shared
+
+
+def encode_pair(keys1: Keys, keys2: Keys) -> Tuple[KeyProbe, KeyProbe, Partitions]:
+    """
+    Encode both files for a first compare and classify their rows.
+
+    Like encode_keys, every key column is factorised once over both files, after giving both
+    columns the same dtype (see align_key_columns). The shared codes
+    are split into per-file codes with array lookups, so both encodings and
+    the match between them cost no more hashing of key values than a plain compare_keys.
+
+    Args:
+        keys1 (Keys): Key column(s) of file 1.
+        keys2 (Keys): Key column(s) of file 2.
+
+    Returns:
+        Tuple[KeyProbe, KeyProbe, Partitions]: Encodings of file 1 and file 2 and the row partitions.
+    """
+    columns1, columns2 = align_key_columns(keys1, keys2)
+    n1 = len(columns1[0])
+    encoded1 = []
+    encoded2 = []
+    column_maps = []
+    for col1, col2 in zip(columns1, columns2):
+        combined = pd.concat([col1, col2], ignore_index=True)
+        codes, uniques = pd.factorize(combined, use_na_sentinel=False)
+        codes1, shared1 = _split_codes(codes[:n1], len(uniques))
+        codes2, shared2 = _split_codes(codes[n1:], len(uniques))
+        encoded1.append((codes1, uniques[shared1]))
+        encoded2.append((codes2, uniques[shared2]))
+        # Column code in file 1 of every distinct value of file 2, -1 if file 1 lacks it
+        in_file1 = np.full(len(uniques), -1, dtype=np.int64)
+        in_file1[shared1] = np.arange(len(shared1))
+        column_maps.append(in_file1[shared2])
+    probe1 = KeyProbe(columns1, encoded=encoded1)
+    probe2 = KeyProbe(columns2, encoded=encoded2)
+    mapped = probe1.lookup_codes(probe2.distinct_codes(column_maps))
+    return probe1, probe2, _partitions(probe1, probe2, mapped, probed_first=True)
+
+
+def probe_compare_keys(probe1: KeyProbe, probe2: KeyProbe) -> Partitions:
+    """
+    Classify the rows of two files from their per-file encodings.
+
+    Only the distinct keys of one file are looked up in the hash indexes of the other file,
+    preferring indexes that already exist from an earlier compare; row membership then
+    follows from the row codes of both files with array lookups. With a cached encoding for
+    one file, a compare costs the encoding of the other file plus this probe.
+
+    Args:
+        probe1 (KeyProbe): Encoded keys of file 1.
+        probe2 (KeyProbe): Encoded keys of file 2.
+
+    Returns:
+        Partitions: Row positions (only1, common1, common2, only2) into file 1 and file 2.
+    """
+    # A file whose hash indexes exist from an earlier compare is probed; else the one with more distinct keys
+    if probe1.is_indexed != probe2.is_indexed:
+        probe_first = probe1.is_indexed
+    else:
+        probe_first = probe1.size >= probe2.size
+    if probe_first:
+        return _partitions(probe1, probe2, probe1.lookup(probe2.distinct_keys()), probed_first=True)
+    return _partitions(probe1, probe2, probe2.lookup(probe1.distinct_keys()), probed_first=False)
+
+
+def cached_compare_keys(cache: ProbeCache, keys1: Keys, keys2: Keys) -> Partitions:
+    """
+    Classify the rows of two files, reusing the encoding of every file whose keys are unchanged.
+
+    Without any stored encoding both files are encoded together (encode_pair). Otherwise only
+    the changed file is encoded and probed against the stored one (probe_compare_keys), so
+    e.g. changing the filter of file 2 does not hash the keys of file 1 again. A key column that
+    is numeric in one file and text in the other is compared on its text; those converted keys
+    are encoded anew for every compare and not cached.
+
+    Args:
+        cache (ProbeCache): Encodings of earlier compares; updated with the new ones.
+        keys1 (Keys): Key column(s) of file 1, as returned by KeyCache.
+        keys2 (Keys): Key column(s) of file 2, as returned by KeyCache.
+
+    Returns:
+        Partitions: Row positions (only1, common1, common2, only2) into file 1 and file 2.
+    """
+    if any(is_numeric_dtype(col1) != is_numeric_dtype(col2)
+           for col1, col2 in zip(as_key_columns(keys1), as_key_columns(keys2))):
+        return encode_pair(keys1, keys2)[2]
+    probe1 = cache.get(keys1)
+    probe2 = cache.get(keys2)
+    if probe1 is None and probe2 is None:
+        probe1, probe2, partitions = encode_pair(keys1, keys2)
+    else:
+        probe1 = probe1 or KeyProbe(keys1)
+        probe2 = probe2 or KeyProbe(keys2)
+        partitions = probe_compare_keys(probe1, probe2)
+    cache.put(keys1, probe1)
+    cache.put(keys2, probe2)
+    return partitions
@@ -0,0 +1,118 @@
+"""
+Key normalisation: vectorised string transforms that make differently formatted keys match.
+"""
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from csvlotte.utils.compare import slice_keys
+
+# Matches plain decimal numbers like "+007", "-1.50", ".5" or "3."
+_NUMBER_RE = r'^[+-]?(?:\d+\.?\d*|\.\d+)$'
+
+
+def _canonical_numbers(text: pd.Series) -> pd.Series:
+    """
+    Rewrite numbers in one canonical text form: "+007.50" -> "7.5", "1,0" -> "1", "-0" -> "0".
+
+    Works on the text only, so long account or article numbers never lose digits to float precision.
+    """
+    text = text.str.replace(r'^([+-]?\d+),(\d+)$', r'\1.\2', regex=True)
+    is_number = text.str.match(_NUMBER_RE, na=False)
+    numbers = text[is_number]
+    numbers = numbers.str.replace(r'^\+', '', regex=True)
+    numbers = numbers.str.replace(r'(\.\d*?)0+$', r'\1', regex=True)
+    numbers = numbers.str.replace(r'\.$', '', regex=True)
+    numbers = numbers.str.replace(r'^(-?)0+(?=\d)', r'\1', regex=True)
+    numbers = numbers.str.replace(r'^(-?)\.', r'\g<1>0.', regex=True)
+    numbers = numbers.str.replace(r'^-0$', '0', regex=True)
+    text = text.copy()
+    text[is_number] = numbers
+    return text
+
+
+# Available transforms in the order they are applied
+TRANSFORMS: Dict[str, Callable[[pd.Series], pd.Series]] = {
+    'nfkc': lambda text: text.str.normalize('NFKC'),
+    'strip': lambda text: text.str.strip(),
+    'casefold': lambda text: text.str.casefold(),
+    'leading_zeros': lambda text: text.str.replace(r'^0+(?=[^.,])', '', regex=True),
+    'numbers': _canonical_numbers,
+}
+
+
+def normalize_keys(series: pd.Series, transforms: Sequence[str]) -> pd.Series:
+    """
+    Apply the selected transforms to a key column, each as one vectorised string kernel.
+
+    Args:
+        series (pd.Series): Key column (any dtype); missing values stay missing.
+        transforms (Sequence[str]): Names from TRANSFORMS; they are applied in the order of TRANSFORMS.
+
+    Returns:
+        pd.Series: The normalised keys as text, or the column unchanged if no transform is selected.
+
+    Raises:
+        ValueError: If a transform name is unknown.
+    """
+    unknown = set(transforms) - set(TRANSFORMS)
+    if unknown:
+        raise ValueError(f"Unbekannte Normalisierung: {', '.join(sorted(unknown))}")
+    if not transforms:
+        return series
+    text = series.astype(str).where(series.notna())
+    for name, transform in TRANSFORMS.items():
+        if name in transforms:
+            text = transform(text)
+    return text
+
+
+class KeyCache:
+    """
+    Cache of sliced and normalised key columns, so repeated compares reuse the prepared keys.
+
+    Entries are keyed by the DataFrame, the column, the slice and the transform set. The
+    DataFrame is only referenced weakly: a reloaded or filtered file is a new DataFrame and
+    misses the cache, while the old one can still be freed.
+    """
+
+    def __init__(self, max_entries: int = 8) -> None:
+        """
+        Args:
+            max_entries (int): Number of key columns kept; the least recently used is dropped first.
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[Any, ...], Tuple[weakref.ref, pd.Series]]' = OrderedDict()
+
+    def get(self, df: pd.DataFrame, column: str, key_slice: Optional[slice] = None,
+            transforms: Sequence[str] = ()) -> pd.Series:
+        """
+        Return the sliced and normalised keys of a column, computing them only on a cache miss.
+
+        Args:
+            df (pd.DataFrame): The loaded file.
+            column (str): Key column.
+            key_slice (Optional[slice]): Parsed slice applied before normalising.
+            transforms (Sequence[str]): Normalisation transforms.
+
+        Returns:
+            pd.Series: The prepared key column.
+        """
+        slice_id = (key_slice.start, key_slice.stop, key_slice.step) if key_slice is not None else None
+        key = (id(df), column, slice_id, tuple(sorted(transforms)))
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is df:
+            self._entries.move_to_end(key)
+            return entry[1]
+        keys = normalize_keys(slice_keys(df[column], key_slice), transforms)
+        self._entries[key] = (weakref.ref(df), keys)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return keys
+
+    def clear(self) -> None:
+        """Drop all cached key columns."""
+        self._entries.clear()
@@ -0,0 +1,140 @@
+"""
+Parallel compare: classifies key-hash partitions of both files on several CPU cores.
+"""
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from csvlotte.utils.compare import Keys, Partitions, align_key_columns, compare_keys
+
+# Below this number of rows the process start-up costs more than it saves
+PARALLEL_MIN_ROWS = 1_000_000
+# Partitions per worker, so uneven partitions still keep all cores busy
+PARTITIONS_PER_WORKER = 4
+
+# Worker processes are started once and reused by every later compare
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared process pool, (re)starting it if the number of workers changed."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        # Spawned, not forked: the pool is created from a compare thread of the multithreaded Tk
+        # process, and forked children could inherit locks held by other threads and the Tk state
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        _pool_workers = workers
+    return _pool
+
+
+@atexit.register
+def shutdown_pool() -> None:
+    """Stop the shared worker processes."""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+    _pool = None
+    _pool_workers = 0
+
+
+def _partition_ids(columns: List[pd.Series], n_partitions: int) -> np.ndarray:
+    """Worker: hash a chunk of key rows and return the partition of every row."""
+    frame = pd.DataFrame({i: column for i, column in enumerate(columns)})
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return (hashes % np.uint64(n_partitions)).astype(np.uint16)
+
+
+def _compare_partition(columns1: List[pd.Series], columns2: List[pd.Series]) -> Partitions:
+    """Worker: classify the rows of one partition on their actual key values."""
+    return compare_keys(columns1, columns2)
+
+
+def _row_chunks(columns: List[pd.Series], n_chunks: int) -> List[List[pd.Series]]:
+    """Split key columns into n_chunks contiguous row ranges."""
+    bounds = np.linspace(0, len(columns[0]), n_chunks + 1).astype(np.int64)
+    return [[column.iloc[start:end] for column in columns] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def parallel_compare_keys(keys1: Keys, keys2: Keys, workers: Optional[int] = None,
+                          min_rows: int = PARALLEL_MIN_ROWS,
+                          progress: Optional[Callable[[float], None]] = None) -> Partitions:
+    """
+    Classify the rows of two files by key on several CPU cores.
+
+    The workers first hash contiguous row chunks of both files into P partitions. Rows with
+    equal keys always share a partition, so each partition is then classified independently
+    by compare_keys on its actual key values; a hash collision can only put two keys into the
+    same partition, never make them match. The per-partition row positions are merged back
+    afterwards. The worker processes are started once and kept for later compares.
+
+    Args:
+        keys1 (Keys): Key column(s) of file 1.
+        keys2 (Keys): Key column(s) of file 2.
+        workers (Optional[int]): Number of worker processes (all cores if None).
+        min_rows (int): Inputs with fewer rows are compared in-process with compare_keys.
+        progress (Optional[Callable[[float], None]]): Called with the completed fraction whenever
+            a worker has finished a chunk or partition.
+
+    Returns:
+        Partitions: Row positions (only1, common1, common2, only2) into file 1 and file 2.
+    """
+    columns1, columns2 = align_key_columns(keys1, keys2)
+    n1 = len(columns1[0])
+    n2 = len(columns2[0])
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or n1 + n2 < min_rows:
+        return compare_keys(columns1, columns2)
+    n_partitions = workers * PARTITIONS_PER_WORKER
+    pool = _get_pool(workers)
+    chunks1: List[Future] = []
+    chunks2: List[Future] = []
+    futures: List[Tuple[np.ndarray, np.ndarray, Future]] = []
+    try:
+        chunks1 = [pool.submit(_partition_ids, chunk, n_partitions) for chunk in _row_chunks(columns1, workers)]
+        chunks2 = [pool.submit(_partition_ids, chunk, n_partitions) for chunk in _row_chunks(columns2, workers)]
+        hashed: List[np.ndarray] = []
+        for future in chunks1 + chunks2:
+            hashed.append(future.result())
+            if progress:
+                # Hashing is counted as the first half, classifying the partitions as the second
+                progress(0.5 * len(hashed) / (len(chunks1) + len(chunks2)))
+        part1 = np.concatenate(hashed[:len(chunks1)])
+        part2 = np.concatenate(hashed[len(chunks1):])
+        # A stable sort of 16-bit partition ids is a linear-time radix sort in numpy
+        order1 = np.argsort(part1, kind='stable')
+        order2 = np.argsort(part2, kind='stable')
+        bounds1 = np.searchsorted(part1[order1], np.arange(n_partitions + 1))
+        bounds2 = np.searchsorted(part2[order2], np.arange(n_partitions + 1))
+        for p in range(n_partitions):
+            rows1 = order1[bounds1[p]:bounds1[p + 1]]
+            rows2 = order2[bounds2[p]:bounds2[p + 1]]
+            if len(rows1) or len(rows2):
+                future = pool.submit(_compare_partition, [column.iloc[rows1] for column in columns1],
+                                     [column.iloc[rows2] for column in columns2])
+                futures.append((rows1, rows2, future))
+        results: List[Partitions] = []
+        for rows1, rows2, future in futures:
+            only1, common1, common2, only2 = future.result()
+            results.append((rows1[only1], rows1[common1], rows2[common2], rows2[only2]))
+            if progress:
+                progress(0.5 + 0.5 * len(results) / len(futures))
+    except BaseException as error:
+        # E.g. a cancel raised by progress: queued work is dropped so the kept pool is free for the next compare
+        for future in chunks1 + chunks2 + [future for _, _, future in futures]:
+            future.cancel()
+        if isinstance(error, BrokenProcessPool):
+            shutdown_pool()
+        raise
+    merged: List[np.ndarray] = []
+    for i in range(4):
+        parts = [result[i] for result in results]
+        merged.append(np.sort(np.concatenate(parts)).astype(np.int64, copy=False) if parts else np.array([], dtype=np.int64))
+    return tuple(merged)
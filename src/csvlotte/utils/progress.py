@@ -0,0 +1,177 @@
+"""
+Progress reporting: the stages of a long operation (load, filter, compare, export) report the
+rows or bytes they processed; the reporter derives the overall progress, throughput and ETA.
+"""
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+# Minimum seconds between two updates passed on to the display
+PROGRESS_INTERVAL = 0.1
+
+
+class OperationCancelled(Exception):
+    """Raised at a progress update of an operation whose cancellation was requested."""
+
+
+class ProgressState(NamedTuple):
+    """Snapshot of a running operation, as passed to the display."""
+    stage: str
+    # Rows (or bytes) processed in the current stage, and their total if known
+    done: int
+    total: Optional[int]
+    unit: str
+    # Completed fraction of the whole operation (0..1)
+    fraction: float
+    # Rows (or bytes) per second in the current stage, None until measurable
+    rate: Optional[float]
+    # Estimated seconds until the whole operation is done, None until measurable
+    eta: Optional[float]
+    elapsed: float
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration as m:ss or h:mm:ss, e.g. 75 -> '1:15'."""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f'{hours}:{minutes:02d}:{secs:02d}' if hours else f'{minutes}:{secs:02d}'
+
+
+def format_amount(value: float, unit: str) -> str:
+    """Format a number of rows with thousands separators, or a number of bytes in MB."""
+    if unit == 'bytes':
+        return f'{value / 1024 ** 2:,.1f} MB'
+    return f'{value:,.0f}'
+
+
+class ProgressReporter:
+    """
+    Collects the progress of the stages of one operation and passes it on to a display.
+
+    Every stage has a weight, its share of the whole operation. A stage is begun with start()
+    and then reports the rows (or bytes) it processed with update()/advance(), or only a
+    completed fraction with set_fraction() for code that reports fractions. Updates are passed
+    on at most every interval seconds, so reporting from tight loops stays cheap; beginning a
+    stage and finish() are always passed on.
+
+    Every report is also a cancellation point: once the cancel event is set, the next report
+    (or checkpoint()) raises OperationCancelled in the reporting code.
+    """
+
+    def __init__(self, callback: Callable[[ProgressState], None], stages: Sequence[Tuple[str, float]],
+                 interval: float = PROGRESS_INTERVAL, clock: Callable[[], float] = time.monotonic,
+                 cancel_event: Optional[threading.Event] = None) -> None:
+        """
+        Args:
+            callback (Callable[[ProgressState], None]): Receives the progress, e.g. to update a progress bar.
+            stages (Sequence[Tuple[str, float]]): Name and weight of every stage, in order.
+            interval (float): Minimum seconds between two updates passed to the callback.
+            clock (Callable[[], float]): Time source in seconds.
+            cancel_event (Optional[threading.Event]): Set to request cancellation of the operation.
+        """
+        if not stages:
+            raise ValueError('Mindestens eine Phase erforderlich.')
+        self.callback = callback
+        self.interval = interval
+        self.cancel_event = cancel_event
+        self._clock = clock
+        weight_sum = sum(weight for _, weight in stages) or 1.0
+        self._spans: Dict[str, Tuple[float, float]] = {}
+        position = 0.0
+        for name, weight in stages:
+            self._spans[name] = (position / weight_sum, (position + weight) / weight_sum)
+            position += weight
+        self._started = clock()
+        self._last_emit: Optional[float] = None
+        self._stage = stages[0][0]
+        self._stage_started = self._started
+        self._done = 0
+        self._total: Optional[int] = None
+        self._unit = 'rows'
+        self._stage_fraction = 0.0
+        self._finished = False
+
+    def start(self, stage: str, total: Optional[int] = None, unit: str = 'rows') -> None:
+        """
+        Begin a stage; stages that are skipped simply count as done.
+
+        Args:
+            stage (str): Name of the stage, as given to the constructor.
+            total (Optional[int]): Rows (or bytes) the stage will process, if known.
+            unit (str): 'rows' or 'bytes'.
+        """
+        if stage not in self._spans:
+            raise ValueError(f'Unbekannte Phase: {stage}')
+        self.checkpoint()
+        self._stage = stage
+        self._stage_started = self._clock()
+        self._done = 0
+        self._total = total
+        self._unit = unit
+        self._stage_fraction = 0.0
+        self._emit(force=True)
+
+    def update(self, done: int) -> None:
+        """Report the rows (or bytes) processed so far in the current stage."""
+        self.checkpoint()
+        self._done = done
+        if self._total:
+            self._stage_fraction = min(done / self._total, 1.0)
+        self._emit()
+
+    def advance(self, count: int) -> None:
+        """Report count more rows (or bytes) processed in the current stage."""
+        self.update(self._done + count)
+
+    def set_fraction(self, fraction: float) -> None:
+        """Report the completed fraction (0..1) of the current stage."""
+        self.checkpoint()
+        self._stage_fraction = min(max(fraction, 0.0), 1.0)
+        if self._total:
+            self._done = int(self._stage_fraction * self._total)
+        self._emit()
+
+    def fraction_callback(self, stage: str, total: Optional[int] = None, unit: str = 'rows') -> Callable[[float], None]:
+        """
+        Begin a stage and return a callback for code that reports completed fractions.
+        """
+        self.start(stage, total, unit)
+        return self.set_fraction
+
+    def checkpoint(self) -> None:
+        """Raise OperationCancelled if cancellation was requested."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise OperationCancelled()
+
+    def finish(self) -> None:
+        """Mark the whole operation as done."""
+        self._stage_fraction = 1.0
+        if self._total:
+            self._done = self._total
+        self._finished = True
+        self._emit(force=True)
+
+    @property
+    def state(self) -> ProgressState:
+        """The current progress of the operation."""
+        now = self._clock()
+        start, end = self._spans[self._stage]
+        fraction = 1.0 if self._finished else start + (end - start) * self._stage_fraction
+        elapsed = now - self._started
+        stage_elapsed = now - self._stage_started
+        rate = self._done / stage_elapsed if self._done and stage_elapsed > 0 else None
+        eta = None
+        if self._finished:
+            eta = 0.0
+        elif fraction > 0 and elapsed > 0:
+            eta = elapsed / fraction * (1.0 - fraction)
+        return ProgressState(self._stage, self._done, self._total, self._unit, fraction, rate, eta, elapsed)
+
+    def _emit(self, force: bool = False) -> None:
+        """Pass the progress to the callback, at most every interval seconds unless forced."""
+        now = self._clock()
+        if not force and self._last_emit is not None and now - self._last_emit < self.interval:
+            return
+        self._last_emit = now
+        self.callback(self.state)
@@ -0,0 +1,251 @@
+"""
+Compare results: rows of the loaded files referenced by position, built into frames only on demand.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Rows materialised at once when a result is written to CSV
+EXPORT_CHUNK_ROWS = 100_000
+
+
+class RowsResult:
+    """
+    One compare result as row positions into a loaded file.
+
+    Only the positions are stored (int32 if the file allows it, else int64), so a result costs
+    4 or 8 bytes per row instead of a copy of every column. Rows are built for a display
+    page, a sort or an export when they are needed. Sort permutations are kept per column and
+    direction, so sorting by a column again costs one reordering of the positions; likewise a
+    search index per column is built on the first search in that column and kept.
+    """
+
+    def __init__(self, df: pd.DataFrame, positions: Optional[np.ndarray] = None,
+                 marks: Optional[np.ndarray] = None) -> None:
+        """
+        Args:
+            df (pd.DataFrame): The loaded file (or a computed result frame).
+            positions (Optional[np.ndarray]): Row positions into df; all rows if None.
+            marks (Optional[np.ndarray]): Boolean matrix with the shape of df flagging cells to
+                highlight, e.g. the changed values of the changed-rows result.
+        """
+        self.df = df
+        self.marks = marks
+        dtype = np.int32 if len(df) <= np.iinfo(np.int32).max else np.int64
+        if positions is None:
+            positions = np.arange(len(df), dtype=dtype)
+        self.positions = np.asarray(positions).astype(dtype, copy=False)
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._indexes: Dict[str, Tuple[pd.Index, np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        """Number of rows of the result."""
+        return len(self.positions)
+
+    @property
+    def columns(self) -> pd.Index:
+        """Columns of the result."""
+        return self.df.columns
+
+    @property
+    def empty(self) -> bool:
+        """True if the result has no rows."""
+        return len(self.positions) == 0
+
+    def head(self, n: int) -> 'RowsResult':
+        """Return the first n rows as a new result, without copying any row."""
+        return RowsResult(self.df, self.positions[:n], self.marks)
+
+    def page(self, start: int, stop: int) -> pd.DataFrame:
+        """Build the rows start..stop of the result, e.g. for one page of a table."""
+        return self.df.iloc[self.positions[start:stop]]
+
+    def page_marks(self, start: int, stop: int) -> Optional[np.ndarray]:
+        """Return the cell marks of the rows start..stop, or None if the result has no marks."""
+        if self.marks is None:
+            return None
+        return self.marks[self.positions[start:stop]]
+
+    def take(self, indices: np.ndarray) -> pd.DataFrame:
+        """Build the rows at the given indices of the result, e.g. for a sample."""
+        return self.df.iloc[self.positions[indices]]
+
+    def column(self, name: str) -> pd.Series:
+        """Return the values of one column for all rows of the result."""
+        return self.df[name].iloc[self.positions]
+
+    def frame(self) -> pd.DataFrame:
+        """Build all rows of the result as a DataFrame."""
+        return self.df.iloc[self.positions]
+
+    def sort_order(self, column: str, ascending: bool = True) -> np.ndarray:
+        """
+        Return the permutation of the result's rows that sorts them by one column.
+
+        It is computed once per column and direction and then kept with the result.
+
+        Args:
+            column (str): Column to sort by.
+            ascending (bool): Sort direction; missing values always come last.
+
+        Returns:
+            np.ndarray: Indices into the result's rows in sorted order.
+        """
+        order = self._orders.get((column, ascending))
+        if order is None:
+            values = self.column(column).reset_index(drop=True)
+            order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+            order = order.astype(self.positions.dtype, copy=False)
+            self._orders[(column, ascending)] = order
+        return order
+
+    def lookup(self, column: str, value: str) -> np.ndarray:
+        """
+        Return the rows of the result whose value in one column equals a text, as shown in a table.
+
+        The first lookup in a column builds a hash index over its distinct values (as text) and
+        the rows grouped by value; it is kept, so further lookups only cost one hash probe.
+
+        Args:
+            column (str): Column to search in.
+            value (str): Text to look for.
+
+        Returns:
+            np.ndarray: Indices into the result's rows, ascending.
+        """
+        index = self._indexes.get(column)
+        if index is None:
+            codes, uniques = pd.factorize(self.column(column).astype(str).to_numpy())
+            # Rows grouped by value (in their order), with the bounds of every group
+            order = np.argsort(codes, kind='stable').astype(self.positions.dtype, copy=False)
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            index = (pd.Index(uniques), order, bounds)
+            self._indexes[column] = index
+        uniques, order, bounds = index
+        code = uniques.get_indexer([value])[0]
+        if code < 0:
+            return order[:0]
+        return order[bounds[code]:bounds[code + 1]]
+
+    def contains(self, column: str, text: str) -> np.ndarray:
+        """
+        Return the rows of the result whose value in one column contains a text (ignoring case).
+
+        Args:
+            column (str): Column to search in.
+            text (str): Text to look for.
+
+        Returns:
+            np.ndarray: Indices into the result's rows, ascending.
+        """
+        values = self.column(column).astype(str)
+        return np.flatnonzero(values.str.contains(text, case=False, regex=False).to_numpy())
+
+    def find(self, column: str, text: str) -> Tuple[np.ndarray, bool]:
+        """
+        Search a column for a value: exact matches via lookup(), otherwise rows containing the text.
+
+        Args:
+            column (str): Column to search in.
+            text (str): Text to look for.
+
+        Returns:
+            Tuple[np.ndarray, bool]: Indices into the result's rows, and whether they match exactly.
+        """
+        rows = self.lookup(column, text)
+        if len(rows):
+            return rows, True
+        return self.contains(column, text), False
+
+    def sorted(self, column: str, ascending: bool = True) -> 'RowsResult':
+        """
+        Return the result ordered by one column; only the positions are reordered.
+
+        Args:
+            column (str): Column to sort by.
+            ascending (bool): Sort direction; missing values always come last.
+
+        Returns:
+            RowsResult: The sorted result.
+        """
+        return RowsResult(self.df, self.positions[self.sort_order(column, ascending)], self.marks)
+
+    def to_csv(self, path: str, sep: str = ';', encoding: str = 'latin1', exclude_columns: Sequence[str] = (),
+               chunk_rows: int = EXPORT_CHUNK_ROWS, progress: Optional[Callable[[int], None]] = None) -> None:
+        """
+        Write the result to a CSV file, building chunk_rows rows at a time.
+
+        Args:
+            path (str): Output path.
+            sep (str): Field separator.
+            encoding (str): File encoding.
+            exclude_columns (Sequence[str]): Columns left out of the file.
+            chunk_rows (int): Rows built and written at once.
+            progress (Optional[Callable[[int], None]]): Called with the number of rows written so far.
+        """
+        columns: List[str] = [col for col in self.df.columns if col not in set(exclude_columns)]
+        self.df.iloc[:0][columns].to_csv(path, sep=sep, encoding=encoding, index=False)
+        for start in range(0, len(self.positions), chunk_rows):
+            self.page(start, start + chunk_rows)[columns].to_csv(
+                path, sep=sep, encoding=encoding, index=False, header=False, mode='a')
+            if progress:
+                progress(min(start + chunk_rows, len(self.positions)))
+
+
+class LazyResult:
+    """
+    One compare result that knows its row count but is only computed when needed.
+
+    The build function receives an optional progress callback, to which a long computation
+    (e.g. the changed rows) reports its completed fraction.
+    """
+
+    def __init__(self, build: Callable[[Optional[Callable[[float], None]]], RowsResult],
+                 count: Optional[int] = None) -> None:
+        """
+        Args:
+            build (Callable[[Optional[Callable[[float], None]]], RowsResult]): Computes the result.
+            count (Optional[int]): Number of rows, if known without computing the result.
+        """
+        self._build = build
+        self._result: Optional[RowsResult] = None
+        self.count = count
+
+    @classmethod
+    def ready(cls, result: RowsResult) -> 'LazyResult':
+        """Wrap a result that is already available."""
+        lazy = cls(lambda progress=None: result, len(result))
+        lazy._result = result
+        return lazy
+
+    @classmethod
+    def rows(cls, df: pd.DataFrame, positions: np.ndarray) -> 'LazyResult':
+        """Wrap rows of a loaded file selected by position; no rows are copied."""
+        return cls.ready(RowsResult(df, positions))
+
+    @classmethod
+    def frame(cls, frame: pd.DataFrame) -> 'LazyResult':
+        """Wrap a computed result frame."""
+        return cls.ready(RowsResult(frame))
+
+    @property
+    def is_built(self) -> bool:
+        """True once the result has been computed."""
+        return self._result is not None
+
+    def result(self, progress: Optional[Callable[[float], None]] = None) -> RowsResult:
+        """
+        Return the result, computing it on first use.
+
+        Args:
+            progress (Optional[Callable[[float], None]]): Receives the completed fraction while computing.
+        """
+        if self._result is None:
+            self._result = self._build(progress)
+            self.count = len(self._result)
+        return self._result
+
+    def sample(self, n: int) -> Optional[RowsResult]:
+        """Return the first n rows if the result is available, else None."""
+        return self._result.head(n) if self._result is not None else None
@@ -0,0 +1,125 @@
+"""
+Result cache: keeps the partitions of recent compares, keyed by the inputs and the compare settings.
+"""
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+import pandas as pd
+
+# Folder of the compare results kept on disk between sessions
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.csvlotte', 'cache')
+# Compare results kept on disk; the least recently written are deleted first
+CACHE_DISK_ENTRIES = 20
+
+
+def file_fingerprint(path: str, sep: str, encoding: str) -> Optional[Tuple[str, int, int, str, str]]:
+    """
+    Identify the state of a loaded file: absolute path, size, modification time and the read options.
+
+    Returns:
+        Optional[Tuple[str, int, int, str, str]]: The fingerprint, or None if the file cannot be accessed.
+    """
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns, sep, encoding
+
+
+def rows_fingerprint(df: pd.DataFrame) -> Tuple[int, str]:
+    """
+    Identify which rows of a loaded file a (possibly filtered) frame holds, by its index labels.
+
+    Filters keep the labels of the loaded rows, so two frames of the same file state with the
+    same labels hold the same rows in the same order, whatever filter texts produced them.
+
+    Returns:
+        Tuple[int, str]: The row count and a hash of all labels.
+    """
+    labels = pd.util.hash_pandas_object(df.index, index=False).to_numpy()
+    return len(labels), hashlib.sha256(labels.tobytes()).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache of compare results, so an unchanged compare is answered without recomputing.
+
+    Entries are kept in memory for the session (least recently used dropped first) and can
+    additionally be written to cache_dir as pickle files named by a hash of the key, so the
+    same compare can be reopened in a later session. Keys must be tuples of plain values
+    (strings, numbers, None), as their text form names the file on disk.
+    """
+
+    def __init__(self, max_entries: int = 8, cache_dir: str = CACHE_DIR, disk_entries: int = CACHE_DISK_ENTRIES) -> None:
+        """
+        Args:
+            max_entries (int): Results kept in memory.
+            cache_dir (str): Folder for results kept on disk.
+            disk_entries (int): Results kept on disk.
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.disk_entries = disk_entries
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+
+    def _path(self, key: Hashable) -> str:
+        """Return the file of a key in the cache folder."""
+        return os.path.join(self.cache_dir, hashlib.sha256(repr(key).encode('utf-8')).hexdigest() + '.pkl')
+
+    def _remember(self, key: Hashable, value: Any) -> None:
+        """Store a result in memory and drop the least recently used ones beyond max_entries."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the result stored for a key, from memory or from disk, or None on a cache miss.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        try:
+            with open(self._path(key), 'rb') as f:
+                stored_key, value = pickle.load(f)
+        except Exception:
+            # Missing, unreadable or outdated cache files are treated as a miss
+            return None
+        if stored_key != key:
+            return None
+        self._remember(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any, persist: bool = False) -> None:
+        """
+        Store a result for a key.
+
+        Args:
+            key (Hashable): Fingerprints and settings of the compare.
+            value (Any): The result; must be picklable if persist is True.
+            persist (bool): Also write the result to the cache folder for later sessions.
+        """
+        self._remember(key, value)
+        if not persist:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + '.tmp', path)
+            files = sorted((os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.pkl')),
+                           key=os.path.getmtime)
+            for old in files[:-self.disk_entries]:
+                os.remove(old)
+        except (OSError, pickle.PicklingError):
+            # The disk cache is optional; the result stays cached for this session
+            pass
+
+    def clear(self) -> None:
+        """Drop all results kept in memory (the disk cache is left untouched)."""
+        self._entries.clear()
@@ -13,7 +13,7 @@ class CompareExportView(tk.Toplevel, TranslationMixin):
     View class for exporting comparison result tables to CSV files via a GUI dialog.
     """
 
-    def __init__(self, parent: Any, controller: Any, dfs: List[Any], result_table_labels: List[str], current_tab: int = 0, default_dir: Optional[str] = None) -> None:
+    def __init__(self, parent: Any, controller: Any, results: List[Any], result_table_labels: List[str], current_tab: int = 0, default_dir: Optional[str] = None) -> None:
         # Initialize parent classes
         tk.Toplevel.__init__(self, parent)
         TranslationMixin.__init__(self)
@@ -22,7 +22,7 @@ class CompareExportView(tk.Toplevel, TranslationMixin):
         self.grab_set()
         self.resizable(False, False)
         self.controller = controller
-        self.dfs = dfs
+        self.results = results
         self.result_table_labels = result_table_labels
         self.current_tab = current_tab
         self.default_dir = default_dir or os.getcwd()
@@ -41,8 +41,8 @@ class CompareExportView(tk.Toplevel, TranslationMixin):
         tk.Label(self, text=self._get_text('columns_not_export')).grid(row=1, column=0, sticky='nw', padx=10, pady=5)
         self.listbox = tk.Listbox(self, selectmode='multiple', height=8, exportselection=0)
         # Show columns of the current DataFrame in the listbox
-        if self.dfs[self.current_tab] is not None:
-            for col in self.dfs[self.current_tab].columns:
+        if self.results[self.current_tab] is not None:
+            for col in self.results[self.current_tab].columns:
                 self.listbox.insert('end', col)
         self.listbox.grid(row=1, column=1, columnspan=3, sticky='w', padx=5, pady=5)
         self.listbox.config(width=40)
@@ -70,7 +70,8 @@ class CompareExportView(tk.Toplevel, TranslationMixin):
         export_encoding_combo = ttk.Combobox(self, textvariable=self.export_encoding_var, values=['latin1', 'utf-8', 'cp1252', 'utf-16', 'iso-8859-1'], state='readonly', width=10)
         export_encoding_combo.grid(row=4, column=3, sticky='w', padx=5, pady=5)
         # Button to trigger export
-        tk.Button(self, text=self._get_text('export_button'), command=self.do_export).grid(row=5, column=0, columnspan=4, pady=10)
+        self.export_btn = tk.Button(self, text=self._get_text('export_button'), command=self.do_export)
+        self.export_btn.grid(row=5, column=0, columnspan=4, pady=10)
         # Center the dialog on the parent window
         self.update_idletasks()
         x = self.master.winfo_x() + (self.master.winfo_width() // 2) - (self.winfo_width() // 2)
@@ -87,20 +88,36 @@ class CompareExportView(tk.Toplevel, TranslationMixin):
 
     def do_export(self) -> None:
         """
-        Execute the export of the selected result DataFrame to a CSV file, showing success or error messages.
+        Start the export of the selected result to a CSV file; success or errors are shown once it has ended.
+
+        While the export runs in the background the dialog releases its grab, so its progress
+        can be followed and it can be cancelled in the main window.
         """
         idx = int(self.result_var.get())
         exclude = [self.listbox.get(i) for i in self.listbox.curselection()]
         out_path = os.path.join(self.path_var.get(), self.name_var.get())
-        success, error_msg = self.controller.export_result(
+        self.export_btn.config(state='disabled')
+        self.grab_release()
+        self.controller.export_result(
             idx,
             exclude,
             out_path,
             sep=self.export_delim_var.get(),
-            encoding=self.export_encoding_var.get()
+            encoding=self.export_encoding_var.get(),
+            on_finished=lambda success, error_msg: self._export_finished(out_path, success, error_msg)
         )
+
+    def _export_finished(self, out_path: str, success: bool, error_msg: Optional[str]) -> None:
+        """
+        Show the outcome of an export; the dialog closes after a successful one.
+        """
+        if not self.winfo_exists():
+            return
         if success:
             messagebox.showinfo(self._get_text('export_success_title'), self._get_text('comparison_export_success_message').format(out_path))
             self.destroy()
-        else:
+            return
+        self.export_btn.config(state='normal')
+        self.grab_set()
+        if error_msg is not None:
             messagebox.showerror(self._get_text('error'), self._get_text('export_error_message').format(error_msg))
@@ -3,18 +3,24 @@ Module for FilterView: GUI dialog to apply SQL-like filters to DataFrame and vie
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import messagebox
 from ..controllers.filter_controller import FilterController
+from ..utils.helpers import sample_positions, text_lengths
 from ..utils.translation import TranslationMixin
+from .virtual_table import VIRTUAL_BUFFER_ROWS, VirtualTable, column_width
 from typing import Any, Callable, Optional
 
+# Milliseconds without typing before the filter is tried on the preview sample
+PREVIEW_DELAY_MS = 300
+
 class FilterView(tk.Toplevel, TranslationMixin):
     """
     View class for filtering a DataFrame: shows data in a table, allows filter input, and updates view.
     """
-    def __init__(self, parent: Any, df: Any, var: Any, title: str, apply_callback: Optional[Callable[[str], None]] = None, source_path: Optional[str] = None) -> None:
+    def __init__(self, parent: Any, df: Any, var: Any, title: str, apply_callback: Optional[Callable[[str], None]] = None, source_path: Optional[str] = None, page_rows: int = VIRTUAL_BUFFER_ROWS) -> None:
         """
         Initialize the filter dialog with DataFrame and callback for applying filters.
+        page_rows is the number of rows the table loads before and after the rows in view.
         """
         # Initialize parent class first
         tk.Toplevel.__init__(self, parent)
@@ -28,6 +34,7 @@ class FilterView(tk.Toplevel, TranslationMixin):
         self.apply_callback = apply_callback
         self.controller = FilterController(df)
         self.source_path = source_path
+        self.page_rows = page_rows
         screen_w = self.winfo_screenwidth()
         screen_h = self.winfo_screenheight()
         width = int(screen_w * 2 / 3)
@@ -41,26 +48,26 @@ class FilterView(tk.Toplevel, TranslationMixin):
         # Table frame at the top (contains the data table and scrollbars)
         table_frame = tk.Frame(self)
         table_frame.pack(fill='both', expand=True, side='top', padx=10, pady=(10, 2))
-        # Treeview widget for displaying the DataFrame as a table
-        self.tree = ttk.Treeview(table_frame, show='headings')
-        self.tree.grid(row=0, column=0, sticky='nsew')
+        # Virtual table for displaying the DataFrame; only the rows in view are inserted
+        self.table = VirtualTable(table_frame, buffer_rows=self.page_rows)
+        self.table.grid(row=0, column=0, sticky='nsew')
+        self.tree = self.table.tree
         # Show all columns in the table
         self.tree['displaycolumns'] = '#all'
-        # Vertical scrollbar for the table
-        yscroll = ttk.Scrollbar(table_frame, orient='vertical', command=self.tree.yview)
-        yscroll.grid(row=0, column=1, sticky='ns')
-        self.tree.configure(yscrollcommand=yscroll.set)
-        # Horizontal scrollbar for the table
-        xscroll = ttk.Scrollbar(table_frame, orient='horizontal', command=self.tree.xview)
-        xscroll.grid(row=1, column=0, sticky='ew')
-        self.tree.configure(xscrollcommand=xscroll.set)
         table_frame.rowconfigure(0, weight=1)
         table_frame.columnconfigure(0, weight=1)
+        # Filtered rows shown in the table; keeps the sort permutations of its columns
+        self._rows = None
 
         # Label for row count (between table and filter input)
         self.rowcount_var = tk.StringVar()
         self.rowcount_label = tk.Label(self, textvariable=self.rowcount_var, anchor='w')
         self.rowcount_label.pack(fill='x', padx=10, pady=(0, 2))
+        # Label for the live preview (estimated matches or the error of the typed filter)
+        self.preview_var = tk.StringVar()
+        self.preview_label = tk.Label(self, textvariable=self.preview_var, anchor='w')
+        self.preview_label.pack(fill='x', padx=10, pady=(0, 2))
+        self._preview_job = None
 
         # Bottom frame contains filter input and action buttons
         bottom_frame = tk.Frame(self)
@@ -71,7 +78,11 @@ class FilterView(tk.Toplevel, TranslationMixin):
         self.text = tk.Entry(bottom_frame)
         self.text.pack(side='left', padx=(0, 5), fill='x', expand=True)
         self.text.insert(0, self.var.get())
-
+        self._entry_bg = self.text.cget('background')
+        # Live preview: the typed filter is tried on a sample once typing pauses
+        self.live_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(bottom_frame, text=self._get_text('live_preview'), variable=self.live_var,
+                       command=self._schedule_preview).pack(side='left', padx=(0, 5))
 
         # Frame for action buttons (Apply, Export, Close)
         btn_frame = tk.Frame(bottom_frame)
@@ -86,6 +97,7 @@ class FilterView(tk.Toplevel, TranslationMixin):
         # Bind Enter key to apply the filter (Entry widget, kein Zeilenumbruch möglich)
         self.text.bind('<Return>', self._on_enter)
         self.text.bind('<KP_Enter>', self._on_enter)  # Numpad Enter
+        self.text.bind('<KeyRelease>', self._schedule_preview)
 
         # Initially populate the table with data (must be last!)
         self._populate_table()
@@ -97,40 +109,78 @@ class FilterView(tk.Toplevel, TranslationMixin):
     def _on_enter(self, event=None) -> None:
         self._apply_and_update()
 
+    def _schedule_preview(self, event=None) -> None:
+        """Try the typed filter on the preview sample after PREVIEW_DELAY_MS without further typing."""
+        if event is not None and event.keysym in ('Return', 'KP_Enter'):
+            return
+        self._cancel_preview()
+        if self.live_var.get():
+            self._preview_job = self.after(PREVIEW_DELAY_MS, self._run_preview)
+        else:
+            self.preview_var.set('')
+            self.text.config(background=self._entry_bg)
+
+    def _cancel_preview(self) -> None:
+        if self._preview_job is not None:
+            self.after_cancel(self._preview_job)
+            self._preview_job = None
+
+    def _run_preview(self) -> None:
+        """Show the estimated number of matches of the typed filter, or its error."""
+        self._preview_job = None
+        filter_str = self.text.get().strip()
+        self.text.config(background=self._entry_bg)
+        if not filter_str:
+            self.preview_var.set('')
+            return
+        try:
+            count, exact = self.controller.estimate_matches(filter_str)
+        except Exception as e:
+            self.text.config(background='#f4c7c3')
+            self.preview_var.set(self._get_text('preview_error').format(error=e))
+            return
+        key = 'preview_exact' if exact else 'preview_estimate'
+        self.preview_var.set(self._get_text(key).format(count=f'{count:,}'))
+
+    def destroy(self) -> None:
+        self._cancel_preview()
+        super().destroy()
+
     def _populate_table(self) -> None:
-        df = self.controller.get_filtered()
-        self.tree.delete(*self.tree.get_children())
+        # The filtered rows are positions into the DataFrame; the table only loads the rows in view
+        rows = self.controller.get_rows_result()
         self._sort_state = getattr(self, '_sort_state', {})
-        # Update row count label
-        if df is not None and not df.empty:
-            self.rowcount_var.set(self._get_text('rows_found').format(len(df)))
-            cols = list(df.columns)
+        # Update row count label (counted from the filter mask)
+        if rows is not None and not rows.empty:
+            self.rowcount_var.set(self._get_text('rows_found').format(self.controller.row_count))
+            cols = list(rows.columns)
             self.tree['columns'] = cols
-            for col in cols:
+            # Widths are estimated from a sample of rows instead of every cell
+            lengths = text_lengths(rows.take(sample_positions(len(rows))))
+            for col, length in zip(cols, lengths):
                 arrow = ''
                 if col in self._sort_state:
                     arrow = ' ▲' if self._sort_state[col] else ' ▼'
                 self.tree.heading(col, text=col + arrow, command=lambda c=col: self._sort_by_column(c, False))
-                maxlen = max([len(str(val)) for val in df[col]] + [len(str(col))])
-                width = min(max(80, maxlen * 8), 300)
-                self.tree.column(col, width=width, minwidth=80, stretch=False)
-            for _, row in df.iterrows():
-                self.tree.insert('', 'end', values=list(row))
+                self.tree.column(col, width=column_width(max(length, len(str(col)))), minwidth=80, stretch=False)
+            self._rows = rows
+            self.table.set_result(self._rows)
         else:
             self.rowcount_var.set(self._get_text('rows_found').format(0))
+            self._rows = None
+            self.table.clear()
             self.tree['columns'] = []
 
     def _sort_by_column(self, col: str, reverse: bool) -> None:
-        df = self.controller.get_filtered()
-        if df is None or df.empty:
+        if self._rows is None or self._rows.empty:
             return
+        df = self._rows.df
         try:
-            sorted_df = df.sort_values(by=col, ascending=not reverse)
+            # The permutation of each column and direction is computed once; the table only re-maps its rows
+            sorted_rows = self._rows.sorted(col, ascending=not reverse)
         except Exception:
             return
-        self.tree.delete(*self.tree.get_children())
-        for _, row in sorted_df.iterrows():
-            self.tree.insert('', 'end', values=list(row))
+        self.table.set_result(sorted_rows)
         if not hasattr(self, '_sort_state'):
             self._sort_state = {}
         self._sort_state = {c: None for c in df.columns}
@@ -144,9 +194,16 @@ class FilterView(tk.Toplevel, TranslationMixin):
     def _apply_and_update(self) -> None:
         filter_str = self.text.get().strip()
         self.var.set(filter_str)
-        df_filtered = self.controller.apply_filter(filter_str)
-        if df_filtered is None:
-            messagebox.showerror(self._get_text('error'), self._get_text('filter_error'))
+        # The full evaluation replaces the estimate of the preview
+        self._cancel_preview()
+        self.preview_var.set('')
+        self.text.config(background=self._entry_bg)
+        try:
+            self.controller.apply_filter(filter_str)
+        except Exception as e:
+            # The previous filter and its rows stay; the entry is marked like an invalid preview
+            self.text.config(background='#f4c7c3')
+            messagebox.showerror(self._get_text('error'), f"{self._get_text('filter_error')}\n{e}")
             return
         self._populate_table()
         if self.apply_callback:
@@ -154,10 +211,10 @@ class FilterView(tk.Toplevel, TranslationMixin):
 
     def _export_filtered(self) -> None:
         from csvlotte.controllers.filter_export_controller import FilterExportController
-        df = self.controller.get_filtered()
-        if df is None or df.empty:
+        if not self.controller.row_count:
             messagebox.showerror(self._get_text('error'), self._get_text('no_data_export'))
             return
+        df = self.controller.get_filtered()
         source_path = self.source_path
         if not source_path:
             if hasattr(self.master, 'df1') and self.master.df1 is not None and self.controller.df is self.master.df1:
@@ -4,8 +4,12 @@ Module for HomeView: renders the main GUI, displays CSV data, and integrating fi
 
 import tkinter as tk
 from tkinter import messagebox, ttk
-from typing import Any
+from typing import Any, List
+from ..utils.helpers import parse_column_list, sample_positions, text_lengths
+from ..utils.normalize import TRANSFORMS
+from ..utils.progress import ProgressState, format_amount, format_duration
 from ..utils.translation import TranslationMixin
+from .virtual_table import CELL_MARK, VirtualTable, column_width
 
 class HomeView(TranslationMixin):
     """
@@ -26,6 +30,12 @@ class HomeView(TranslationMixin):
         self.file2_path = ''
         self.df1 = None
         self.df2 = None
+        # True if only a preview of a large file is held in memory
+        self.file1_preview_only = False
+        self.file2_preview_only = False
+        # Path, size, modification time and read options of the loaded files, for the result cache
+        self.file1_fingerprint = None
+        self.file2_fingerprint = None
 
         # Load language settings and apply to translation system
         self._load_language_settings()
@@ -149,6 +159,9 @@ class HomeView(TranslationMixin):
         style.theme_use('default')
         style.configure("green.Horizontal.TProgressbar", foreground='green', background='green')
         self.progress.configure(style="green.Horizontal.TProgressbar")
+        # Stage, processed rows, throughput and remaining time of a running operation
+        self.progress_label = tk.Label(self.root, text='', anchor='w')
+        self.progress_label.pack(side='bottom', fill='x', padx=10)
 
         # Top control panel: vertical stack, left-aligned
         self.control_frame = tk.Frame(self.root)
@@ -192,6 +205,13 @@ class HomeView(TranslationMixin):
         # Button to open filter dialog for CSV 1
         self.filter1_btn = tk.Button(filter_row1, text='...', width=2, command=lambda: self.open_filter_window(1), state='disabled')
         self.filter1_btn.pack(side='left', padx=(2,0), pady=2)
+        # Columns declared as dates (comma-separated): parsed once when the file is loaded
+        self.date_columns1_label = tk.Label(filter_row1, text=self._get_text('date_columns'))
+        self.date_columns1_label.pack(side='left', padx=(10,2), pady=2)
+        self.date_columns1_var = tk.StringVar()
+        self.date_columns1_entry = tk.Entry(filter_row1, textvariable=self.date_columns1_var, width=20)
+        self.date_columns1_entry.pack(side='left', padx=2, pady=2)
+        self.date_columns1_entry.bind('<Return>', lambda e: self.controller.reload_file(1))
 
         # --- File selection row for CSV 2 ---
         file_row2 = tk.Frame(self.control_frame)
@@ -230,8 +250,17 @@ class HomeView(TranslationMixin):
         # Button to open filter dialog for CSV 2
         self.filter2_btn = tk.Button(filter_row2, text='...', width=2, command=lambda: self.open_filter_window(2), state='disabled')
         self.filter2_btn.pack(side='left', padx=(2,0), pady=2)
+        # Columns declared as dates (comma-separated): parsed once when the file is loaded
+        self.date_columns2_label = tk.Label(filter_row2, text=self._get_text('date_columns'))
+        self.date_columns2_label.pack(side='left', padx=(10,2), pady=2)
+        self.date_columns2_var = tk.StringVar()
+        self.date_columns2_entry = tk.Entry(filter_row2, textvariable=self.date_columns2_var, width=20)
+        self.date_columns2_entry.pack(side='left', padx=2, pady=2)
+        self.date_columns2_entry.bind('<Return>', lambda e: self.controller.reload_file(2))
 
         # --- Comparison columns and slice entries ---
+        self._extra_keys = {1: [], 2: []}
+        self._extra_key_vars = {1: {}, 2: {}}
         col_frame = tk.Frame(self.control_frame)
         col_frame.pack(anchor='w', fill='x')
         # Row for comparison column and slice for CSV 1
@@ -244,6 +273,12 @@ class HomeView(TranslationMixin):
         self.col1_text_var = tk.StringVar()
         self.col1_text_entry = tk.Entry(row_col1, textvariable=self.col1_text_var, width=7)
         self.col1_text_entry.pack(side='left', padx=2, pady=5)
+        self.col1_text_var.trace_add('write', lambda *args: self._validate_slice_entry(self.col1_text_var, self.col1_text_entry))
+        # Menu to pick additional key columns for a composite key
+        self.extra_keys_btn1 = tk.Menubutton(row_col1, text=self._get_text('extra_keys'), relief='raised', state='disabled')
+        self.extra_keys_menu1 = tk.Menu(self.extra_keys_btn1, tearoff=0)
+        self.extra_keys_btn1['menu'] = self.extra_keys_menu1
+        self.extra_keys_btn1.pack(side='left', padx=(10,2), pady=5)
         # Row for comparison column and slice for CSV 2
         row_col2 = tk.Frame(col_frame)
         row_col2.pack(anchor='w', fill='x')
@@ -254,6 +289,50 @@ class HomeView(TranslationMixin):
         self.col2_text_var = tk.StringVar()
         self.col2_text_entry = tk.Entry(row_col2, textvariable=self.col2_text_var, width=7)
         self.col2_text_entry.pack(side='left', padx=2, pady=5)
+        self.col2_text_var.trace_add('write', lambda *args: self._validate_slice_entry(self.col2_text_var, self.col2_text_entry))
+        # Menu to pick additional key columns for a composite key
+        self.extra_keys_btn2 = tk.Menubutton(row_col2, text=self._get_text('extra_keys'), relief='raised', state='disabled')
+        self.extra_keys_menu2 = tk.Menu(self.extra_keys_btn2, tearoff=0)
+        self.extra_keys_btn2['menu'] = self.extra_keys_menu2
+        self.extra_keys_btn2.pack(side='left', padx=(10,2), pady=5)
+
+        # --- Compare options ---
+        options_row = tk.Frame(self.control_frame)
+        options_row.pack(anchor='w', fill='x')
+        self.parallel_var = tk.BooleanVar(value=False)
+        self.parallel_check = tk.Checkbutton(options_row, text=self._get_text('use_all_cores'), variable=self.parallel_var)
+        self.parallel_check.pack(side='left', padx=5, pady=2)
+        # Checkbox: files are sorted by the key, so the out-of-core compare can merge them
+        self.sorted_var = tk.BooleanVar(value=False)
+        self.sorted_check = tk.Checkbutton(options_row, text=self._get_text('files_sorted'), variable=self.sorted_var)
+        self.sorted_check.pack(side='left', padx=5, pady=2)
+        # Checkbox: count every occurrence of a key (duplicate-aware compare)
+        self.multiset_var = tk.BooleanVar(value=False)
+        self.multiset_check = tk.Checkbutton(options_row, text=self._get_text('count_duplicates'), variable=self.multiset_var)
+        self.multiset_check.pack(side='left', padx=5, pady=2)
+        # Checkbox: only count the results and build their rows when a tab is opened or exported
+        self.summary_var = tk.BooleanVar(value=False)
+        self.summary_check = tk.Checkbutton(options_row, text=self._get_text('counts_only'), variable=self.summary_var)
+        self.summary_check.pack(side='left', padx=5, pady=2)
+        # Checkbox: also keep compare results on disk, so an unchanged compare can be reopened later
+        self.cache_var = tk.BooleanVar(value=False)
+        self.cache_check = tk.Checkbutton(options_row, text=self._get_text('cache_on_disk'), variable=self.cache_var)
+        self.cache_check.pack(side='left', padx=5, pady=2)
+        # Checkbox and threshold: probable matches for keys without an exact partner
+        self.fuzzy_var = tk.BooleanVar(value=False)
+        self.fuzzy_check = tk.Checkbutton(options_row, text=self._get_text('fuzzy_match'), variable=self.fuzzy_var)
+        self.fuzzy_check.pack(side='left', padx=(5, 0), pady=2)
+        self.fuzzy_threshold_var = tk.StringVar(value='0.85')
+        self.fuzzy_threshold_spin = tk.Spinbox(options_row, from_=0.5, to=1.0, increment=0.05, width=5, textvariable=self.fuzzy_threshold_var)
+        self.fuzzy_threshold_spin.pack(side='left', padx=(0, 5), pady=2)
+        # Menu button: key normalisation transforms applied to all key columns before comparing
+        self.normalize_btn = tk.Menubutton(options_row, text=self._get_text('normalize_keys'), relief='raised')
+        self.normalize_menu = tk.Menu(self.normalize_btn, tearoff=0)
+        self.normalize_btn['menu'] = self.normalize_menu
+        self.normalize_btn.pack(side='left', padx=5, pady=2)
+        self._normalize_vars = {name: tk.BooleanVar(value=False) for name in TRANSFORMS}
+        for name, var in self._normalize_vars.items():
+            self.normalize_menu.add_checkbutton(label=self._get_text(f'normalize_{name}'), variable=var)
 
         # --- Compare and export buttons ---
         row5 = tk.Frame(self.control_frame)
@@ -261,6 +340,12 @@ class HomeView(TranslationMixin):
         # Button to start comparison
         self.compare_btn = tk.Button(row5, text=self._get_text('compare'), command=self.controller.compare_csvs, state='disabled')
         self.compare_btn.pack(side='left', padx=5, pady=10)
+        # Button to compare large files from disk and write the results to a folder
+        self.out_of_core_btn = tk.Button(row5, text=self._get_text('compare_out_of_core'), command=self.controller.compare_csvs_out_of_core, state='disabled')
+        self.out_of_core_btn.pack(side='left', padx=5, pady=10)
+        # Button to cancel a running comparison
+        self.cancel_btn = tk.Button(row5, text=self._get_text('cancel'), command=self.controller.cancel_task, state='disabled')
+        self.cancel_btn.pack(side='left', padx=5, pady=10)
         # Button to export comparison results
         self.export_btn = tk.Button(row5, text=self._get_text('export_comparison'), command=self.controller.export_results_button, state='disabled')
         self.export_btn.pack(side='left', padx=5, pady=10)
@@ -277,85 +362,262 @@ class HomeView(TranslationMixin):
             f"{self._get_text('only_in')} {file1_name}",
             f"{self._get_text('common_in')} {file1_name}",
             f"{self._get_text('common_in')} {file2_name}",
-            f"{self._get_text('only_in')} {file2_name}"
+            f"{self._get_text('only_in')} {file2_name}",
+            self._get_text('changed_rows'),
+            self._get_text('count_differences'),
+            f"{self._get_text('duplicates_in')} {file1_name}",
+            f"{self._get_text('duplicates_in')} {file2_name}",
+            self._get_text('probable_matches')
         ]
         # Notebook widget for result tables
         self.notebook = ttk.Notebook(result_frame)
         self.notebook.grid(row=0, column=0, sticky='nsew', padx=0, pady=0)
         self.result_table_frames = []
         self.result_tables = []
-        self._result_dfs = [None, None, None, None]
+        self._results = [None] * len(self.result_table_labels)
+        # Results of the summary mode that are computed when their tab is opened
+        self._lazy_results = {}
+        # Tables that show the current results; the others are filled when their tab is selected
+        self._rendered_tables = [False] * len(self.result_table_labels)
         self._tab_ids = []
+        # Search bar of every tab, and the hits of its last search
+        self.search_labels = []
+        self.search_entries = []
+        self.search_columns = []
+        self.search_status_labels = []
+        self._search_states = [None] * len(self.result_table_labels)
         for label in self.result_table_labels:
-            # Each tab contains a frame with a Treeview (table) and scrollbars
+            idx = len(self.result_tables)
+            # Each tab contains a search bar and a virtual table, which only holds the rows in view
             tab_frame = tk.Frame(self.notebook)
-            tab_frame.rowconfigure(0, weight=1)
+            tab_frame.rowconfigure(1, weight=1)
             tab_frame.columnconfigure(0, weight=1)
-            tree = ttk.Treeview(tab_frame, show='headings')
-            tree.grid(row=0, column=0, sticky='nsew')
-            xscroll = ttk.Scrollbar(tab_frame, orient='horizontal', command=tree.xview)
-            xscroll.grid(row=1, column=0, sticky='ew')
-            tree.configure(xscrollcommand=xscroll.set)
-            yscroll = ttk.Scrollbar(tab_frame, orient='vertical', command=tree.yview)
-            yscroll.grid(row=0, column=1, sticky='ns')
-            tree.configure(yscrollcommand=yscroll.set)
+            search_frame = tk.Frame(tab_frame)
+            search_frame.grid(row=0, column=0, sticky='ew', pady=(2, 2))
+            search_label = tk.Label(search_frame, text=self._get_text('search'))
+            search_label.pack(side='left', padx=(0, 5))
+            search_entry = tk.Entry(search_frame, width=30)
+            search_entry.pack(side='left')
+            search_entry.bind('<Return>', lambda e, i=idx: self._search_result(i))
+            search_entry.bind('<KP_Enter>', lambda e, i=idx: self._search_result(i))
+            # Column to search in; defaults to the key column
+            search_column = ttk.Combobox(search_frame, state='readonly', width=20)
+            search_column.pack(side='left', padx=5)
+            search_status = tk.Label(search_frame, anchor='w')
+            search_status.pack(side='left', padx=5)
+            self.search_labels.append(search_label)
+            self.search_entries.append(search_entry)
+            self.search_columns.append(search_column)
+            self.search_status_labels.append(search_status)
+            table = VirtualTable(tab_frame)
+            table.grid(row=1, column=0, sticky='nsew')
+            if idx == 4:
+                # The changed-rows tab additionally lists the number of mismatches per column
+                self.diff_summary_label = tk.Label(tab_frame, anchor='w', justify='left')
+                self.diff_summary_label.grid(row=2, column=0, sticky='ew')
             tab_id = self.notebook.add(tab_frame, text=label, state='disabled')
             tab_frame.pack_propagate(False)
             tab_frame.grid_propagate(True)
             self.result_table_frames.append(tab_frame)
-            self.result_tables.append(tree)
+            self.result_tables.append(table)
             self._tab_ids.append(tab_frame)
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_result_tab_changed)
+
+    def _validate_slice_entry(self, var: Any, entry: Any) -> None:
+        """
+        Highlight a slice entry while its content is not a valid slice spec.
+        """
+        from ..utils.compare import parse_slice
+        if not hasattr(self, '_entry_bg'):
+            self._entry_bg = entry.cget('background')
+        try:
+            parse_slice(var.get())
+            entry.config(background=self._entry_bg)
+        except ValueError:
+            entry.config(background='#f4c7c3')
 
     def update_result_table_view(self) -> None:
         """
-        Refresh the result tables based on current DataFrame results.
+        Refresh the result tables after the compare results changed.
+
+        Only the table of the selected tab is filled now; the others are emptied and filled
+        when their tab is selected for the first time (see _on_result_tab_changed).
+        """
+        self._rendered_tables = [False] * len(self.result_tables)
+        selected = self.notebook.index(self.notebook.select()) if self.notebook.select() else None
+        for idx, table in enumerate(self.result_tables):
+            if idx != selected:
+                # Outdated rows are dropped, so the table no longer holds on to the previous result
+                table.clear()
+        self._render_selected_table()
+
+    def _render_selected_table(self) -> None:
+        """
+        Fill the table of the selected tab unless it already shows the current result.
+        """
+        if not self.notebook.select():
+            return
+        idx = self.notebook.index(self.notebook.select())
+        if not self._rendered_tables[idx]:
+            self._render_result_table(idx)
+
+    def _render_result_table(self, idx: int) -> None:
+        """
+        Fill one result table: columns, headings with sort commands, column widths and the rows in view.
         """
         if not hasattr(self, '_sort_states'):
             self._sort_states = [{} for _ in self.result_tables]
-        for idx, tree in enumerate(self.result_tables):
-            tree.delete(*tree.get_children())
-            df = self._result_dfs[idx] if self._result_dfs and len(self._result_dfs) > idx else None
-            sort_state = self._sort_states[idx] if hasattr(self, '_sort_states') else {}
-            tree['displaycolumns'] = '#all'
-            if df is not None and not df.empty:
-                cols = list(df.columns)
-                tree['columns'] = cols
-                for col in cols:
-                    arrow = ''
-                    if col in sort_state:
-                        arrow = ' ▲' if sort_state[col] else ' ▼'
-                    tree.heading(col, text=col + arrow, command=lambda c=col, t=tree, i=idx: self._sort_result_column(i, t, c, False))
-                    maxlen = max([len(str(val)) for val in df[col]] + [len(str(col))])
-                    width = min(max(80, maxlen * 8), 300)
-                    tree.column(col, width=width, minwidth=80, stretch=False)
-                for _, row in df.iterrows():
-                    tree.insert('', 'end', values=list(row))
-            else:
-                tree['columns'] = []
+        table = self.result_tables[idx]
+        tree = table.tree
+        result = self._results[idx] if self._results and len(self._results) > idx else None
+        sort_state = self._sort_states[idx]
+        tree['displaycolumns'] = '#all'
+        search_column = self.search_columns[idx]
+        self._search_states[idx] = None
+        self.search_status_labels[idx].config(text='')
+        if result is not None and not result.empty:
+            cols = list(result.columns)
+            tree['columns'] = cols
+            search_column['values'] = cols
+            if search_column.get() not in cols:
+                keys = [self.column_combo1.get(), self.column_combo2.get()]
+                search_column.set(next((c for c in keys if c in cols), cols[0]))
+            # Widths are estimated from a sample of rows; the table widens columns while scrolling
+            lengths = text_lengths(result.take(sample_positions(len(result))))
+            for col, length in zip(cols, lengths):
+                arrow = ''
+                if col in sort_state:
+                    arrow = ' ▲' if sort_state[col] else ' ▼'
+                tree.heading(col, text=col + arrow, command=lambda c=col, t=table, i=idx: self._sort_result_column(i, t, c, False))
+                tree.column(col, width=column_width(max(length, len(str(col)))), minwidth=80, stretch=False)
+            # Only the rows in view are built and inserted; more follow while scrolling
+            table.set_result(result)
+        else:
+            table.clear()
+            tree['columns'] = []
+            search_column['values'] = []
+            search_column.set('')
+        self._rendered_tables[idx] = True
 
-    def _sort_result_column(self, idx: int, tree: Any, col: str, reverse: bool) -> None:
+    def _search_result(self, idx: int) -> None:
+        """
+        Find the text of a tab's search box in the selected column and scroll its table to the hit.
+
+        An exact value is found via the hash index of the shown result; if no value matches
+        exactly, rows containing the text are found instead. Searching the same text again
+        moves on to the next hit.
+        """
+        text = self.search_entries[idx].get().strip()
+        column = self.search_columns[idx].get()
+        table = self.result_tables[idx]
+        status = self.search_status_labels[idx]
+        if not text or not column or table.result is None:
+            status.config(text='')
+            return
+        state = self._search_states[idx]
+        if state is not None and state['key'] == (text, column) and state['result'] is table.result:
+            state['current'] = (state['current'] + 1) % len(state['hits'])
+        else:
+            hits, exact = table.result.find(column, text)
+            if not len(hits):
+                self._search_states[idx] = None
+                status.config(text=self._get_text('search_no_hits'))
+                return
+            # Hits are rows of the shown (possibly sorted) result
+            state = {'key': (text, column), 'result': table.result, 'hits': hits, 'exact': exact, 'current': 0}
+            self._search_states[idx] = state
+        table.select_row(int(state['hits'][state['current']]))
+        key = 'search_hit' if state['exact'] else 'search_hit_contains'
+        status.config(text=self._get_text(key).format(current=state['current'] + 1, count=f"{len(state['hits']):,}"))
+
+    def _on_result_tab_changed(self, event=None) -> None:
+        """
+        Fill the table of a tab when it is selected for the first time since the results changed;
+        the full rows of a summary-mode result are built first.
+        """
+        if not self.notebook.select():
+            return
+        if self._lazy_results:
+            self.controller.materialize_result(self.notebook.index(self.notebook.select()))
+        self._render_selected_table()
+
+    def show_progress(self, state: ProgressState) -> None:
+        """
+        Show the progress of a running operation in the progress bar and the status line above it.
+
+        Args:
+            state (ProgressState): Progress passed on by a ProgressReporter.
+        """
+        self.progress['value'] = state.fraction * 100
+        self.progress_label.config(text=self._format_progress(state))
+        # Only pending redraws are processed, so no user event can start another operation meanwhile
+        self.root.update_idletasks()
+
+    def show_cancelled(self) -> None:
+        """
+        Show that a running operation was cancelled; the results shown before stay unchanged.
+        """
+        self.progress['value'] = 0
+        self.progress_label.config(text=self._get_text('progress_cancelled'))
+
+    def _format_progress(self, state: ProgressState) -> str:
+        """
+        Describe a progress state, e.g. 'Comparing: 1,200,000 / 3,000,000 rows · 850,000 rows/s · 0:03 left'.
+        """
+        def amount(value: float) -> str:
+            text = format_amount(value, state.unit)
+            return text if state.unit == 'bytes' else f"{text} {self._get_text('unit_' + state.unit)}"
+
+        if state.fraction >= 1.0:
+            return self._get_text('progress_done').format(elapsed=format_duration(state.elapsed))
+        parts = []
+        if state.total:
+            parts.append(f"{format_amount(state.done, state.unit)} / {amount(state.total)}")
+        elif state.done:
+            parts.append(amount(state.done))
+        if state.rate:
+            parts.append(f"{amount(state.rate)}/s")
+        if state.eta is not None:
+            parts.append(self._get_text('progress_eta').format(eta=format_duration(state.eta)))
+        text = self._get_text('progress_' + state.stage)
+        return f"{text}: {' · '.join(parts)}" if parts else text
+
+    def show_diff_summary(self, mismatches: Any) -> None:
+        """
+        Show the number of mismatches per compared column below the changed-rows table.
+
+        Args:
+            mismatches (Any): Series with the mismatch count per column, or None while not yet computed.
+        """
+        if mismatches is None:
+            self.diff_summary_label.config(text='')
+            return
+        counts = ', '.join(f'{col}: {count}' for col, count in mismatches.items() if count)
+        self.diff_summary_label.config(text=f"{self._get_text('mismatches_per_column')}: {counts or '-'}"
+                                            f"   ({CELL_MARK}= {self._get_text('changed_value')})")
+
+    def _sort_result_column(self, idx: int, table: VirtualTable, col: str, reverse: bool) -> None:
         """
         Sort a result table column in ascending or descending order.
         """
-        df = self._result_dfs[idx]
-        if df is None or df.empty:
+        result = self._results[idx]
+        if result is None or result.empty:
             return
         try:
-            sorted_df = df.sort_values(by=col, ascending=not reverse)
+            # Only the row positions are reordered; the table builds the rows in view
+            sorted_result = result.sorted(col, ascending=not reverse)
         except Exception:
             return
-        tree.delete(*tree.get_children())
-        for _, row in sorted_df.iterrows():
-            tree.insert('', 'end', values=list(row))
+        table.set_result(sorted_result)
         if not hasattr(self, '_sort_states'):
             self._sort_states = [{} for _ in self.result_tables]
-        self._sort_states[idx] = {c: None for c in df.columns}
+        self._sort_states[idx] = {c: None for c in result.columns}
         self._sort_states[idx][col] = not reverse
-        for c in df.columns:
+        for c in result.columns:
             arrow = ''
             if c == col:
                 arrow = ' ▲' if not reverse else ' ▼'
-            tree.heading(c, text=c + arrow, command=lambda cc=c, t=tree, i=idx: self._sort_result_column(i, t, cc, False if cc != col else not reverse))
+            table.tree.heading(c, text=c + arrow, command=lambda cc=c, t=table, i=idx: self._sort_result_column(i, t, cc, False if cc != col else not reverse))
     
     def open_filter_window(self, csv_num: int) -> None:
         """
@@ -379,7 +641,8 @@ class HomeView(TranslationMixin):
         def on_apply(filter_str):
             from ..controllers.filter_controller import FilterController
             fc = FilterController(df)
-            filtered = fc.apply_filter(filter_str)
+            fc.apply_filter(filter_str)
+            filtered = fc.get_filtered()
             if filtered is not None:
                 if csv_num == 1:
                     self.df1 = filtered
@@ -407,6 +670,69 @@ class HomeView(TranslationMixin):
         else:
             self.column_combo2.set(values2[0])
     
+    def update_key_menus(self) -> None:
+        """
+        Rebuild the menus for additional key columns from the loaded DataFrames, keeping valid selections.
+        """
+        for file_num, df, menu, btn in ((1, self.df1, self.extra_keys_menu1, self.extra_keys_btn1),
+                                        (2, self.df2, self.extra_keys_menu2, self.extra_keys_btn2)):
+            menu.delete(0, 'end')
+            columns = list(df.columns) if df is not None else []
+            self._extra_keys[file_num] = [c for c in self._extra_keys[file_num] if c in columns]
+            self._extra_key_vars[file_num] = {}
+            for col in columns:
+                var = tk.BooleanVar(value=col in self._extra_keys[file_num])
+                menu.add_checkbutton(label=col, variable=var, command=lambda n=file_num, c=col: self._toggle_extra_key(n, c))
+                self._extra_key_vars[file_num][col] = var
+            btn.config(state='normal' if columns else 'disabled')
+            self._update_extra_keys_label(file_num)
+
+    def _toggle_extra_key(self, file_num: int, col: str) -> None:
+        """
+        Add or remove an additional key column, keeping the order of selection for pairing both files.
+        Selecting a column for CSV 1 also selects a column with the same name for CSV 2.
+        """
+        selected = self._extra_keys[file_num]
+        if self._extra_key_vars[file_num][col].get():
+            if col not in selected:
+                selected.append(col)
+            other_vars = self._extra_key_vars[2]
+            if file_num == 1 and col in other_vars and col not in self._extra_keys[2]:
+                other_vars[col].set(True)
+                self._extra_keys[2].append(col)
+                self._update_extra_keys_label(2)
+        elif col in selected:
+            selected.remove(col)
+        self._update_extra_keys_label(file_num)
+
+    def _update_extra_keys_label(self, file_num: int) -> None:
+        """
+        Show the number of selected additional key columns on the menu button.
+        """
+        btn = self.extra_keys_btn1 if file_num == 1 else self.extra_keys_btn2
+        count = len(self._extra_keys[file_num])
+        text = self._get_text('extra_keys')
+        btn.config(text=f"{text} ({count})" if count else text)
+
+    def get_extra_key_columns(self, file_num: int) -> List[str]:
+        """
+        Return the additional key columns of CSV 1 or CSV 2 in the order they were selected.
+        """
+        return list(self._extra_keys[file_num])
+
+    def get_date_columns(self, file_num: int) -> List[str]:
+        """
+        Return the columns of CSV 1 or CSV 2 declared as dates.
+        """
+        var = self.date_columns1_var if file_num == 1 else self.date_columns2_var
+        return parse_column_list(var.get())
+
+    def get_normalization(self) -> List[str]:
+        """
+        Return the selected key normalisation transforms.
+        """
+        return [name for name, var in self._normalize_vars.items() if var.get()]
+
     def update_filter_buttons(self):
         if self.df1 is not None:
             self.filter1_btn.config(state='normal')
@@ -430,4 +756,19 @@ class HomeView(TranslationMixin):
         
         # Update buttons
         self.compare_btn.config(text=self._get_text('compare'))
-        self.export_btn.config(text=self._get_text('export_comparison'))
\ No newline at end of file
+        self.out_of_core_btn.config(text=self._get_text('compare_out_of_core'))
+        self.cancel_btn.config(text=self._get_text('cancel'))
+        self.parallel_check.config(text=self._get_text('use_all_cores'))
+        self.sorted_check.config(text=self._get_text('files_sorted'))
+        self.multiset_check.config(text=self._get_text('count_duplicates'))
+        self.summary_check.config(text=self._get_text('counts_only'))
+        self.cache_check.config(text=self._get_text('cache_on_disk'))
+        self.fuzzy_check.config(text=self._get_text('fuzzy_match'))
+        self.normalize_btn.config(text=self._get_text('normalize_keys'))
+        self.date_columns1_label.config(text=self._get_text('date_columns'))
+        self.date_columns2_label.config(text=self._get_text('date_columns'))
+        for i, name in enumerate(self._normalize_vars):
+            self.normalize_menu.entryconfig(i, label=self._get_text(f'normalize_{name}'))
+        self.export_btn.config(text=self._get_text('export_comparison'))
+        for search_label in self.search_labels:
+            search_label.config(text=self._get_text('search'))
\ No newline at end of file
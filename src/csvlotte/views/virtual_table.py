@@ -0,0 +1,202 @@
+"""
+Module for VirtualTable: a table for results of any size that only holds the rows around the visible ones.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Tuple
+
+from ..utils.helpers import text_lengths
+
+# Rows held as table items above and below the visible rows
+VIRTUAL_BUFFER_ROWS = 200
+# Visible rows assumed until the table has been drawn
+VIRTUAL_INITIAL_ROWS = 50
+# Shown in front of the values of marked cells (e.g. changed values)
+CELL_MARK = '≠ '
+
+
+def column_width(length: int) -> int:
+    """Return the width in pixels of a table column for its longest text (80 to 300 pixels)."""
+    return min(max(80, length * 8), 300)
+
+
+def visible_window(first: int, visible: int, total: int, buffer: int) -> Tuple[int, int]:
+    """
+    Return the rows (start, stop) to hold as items so that the rows first..first+visible are
+    shown with up to buffer rows before and after them, within 0..total.
+    """
+    first = min(max(first, 0), max(total - visible, 0))
+    return max(0, first - buffer), min(total, first + visible + buffer)
+
+
+class VirtualTable(tk.Frame):
+    """
+    Table with scrollbars for a result of any size, backed by the result instead of one item per row.
+
+    The Treeview only holds the visible rows plus buffer_rows before and after them. When
+    scrolling (scrollbar, mouse wheel or keyboard) comes near the end of the held rows, the
+    same items are refilled with the rows around the new position, built with result.page().
+    The vertical scrollbar is driven by the row count of the whole result. Headings and
+    column widths are set on the tree attribute as for a plain Treeview; columns are widened
+    when rows loaded while scrolling hold longer values than the initial widths allow for.
+    Cells flagged by result.page_marks() are shown with CELL_MARK in front of their value.
+    """
+
+    def __init__(self, master: Any, buffer_rows: int = VIRTUAL_BUFFER_ROWS, **kwargs: Any) -> None:
+        """
+        Args:
+            master (Any): Parent widget.
+            buffer_rows (int): Rows held before and after the visible rows.
+        """
+        super().__init__(master, **kwargs)
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self.buffer_rows = buffer_rows
+        self.tree = ttk.Treeview(self, show='headings')
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        xscroll = ttk.Scrollbar(self, orient='horizontal', command=self.tree.xview)
+        xscroll.grid(row=1, column=0, sticky='ew')
+        self.tree.configure(xscrollcommand=xscroll.set)
+        # The scrollbar spans all rows of the result, not only the items of the Treeview
+        self.yscroll = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.yscroll.grid(row=0, column=1, sticky='ns')
+        self.tree.configure(yscrollcommand=self._on_tree_scrolled)
+        self.result = None
+        # Rows of the result held by the items, the first visible row and the rows that fit in view
+        self._start = 0
+        self._stop = 0
+        self._first = 0
+        self._visible = VIRTUAL_INITIAL_ROWS
+        self._refill_pending = False
+        # Row of the result selected with select_row(), kept on its item while items are refilled
+        self._selected_row = None
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows of the shown result."""
+        return len(self.result) if self.result is not None else 0
+
+    def set_result(self, result: Any) -> None:
+        """
+        Show a result from its first row.
+
+        Args:
+            result (Any): Object with len(), page(start, stop) returning a DataFrame and
+                page_marks(start, stop) (e.g. RowsResult), or None.
+        """
+        self.result = result
+        self._selected_row = None
+        self._first = 0
+        self._fill(0)
+        self._place()
+
+    def clear(self) -> None:
+        """Remove all rows."""
+        self.set_result(None)
+
+    def scroll_to(self, row: int) -> None:
+        """Show the result from a row on, loading the rows around it if they are not held yet."""
+        row = min(max(row, 0), max(self.row_count - self._visible, 0))
+        self._first = row
+        if row < self._start or (row + self._visible > self._stop and self._stop < self.row_count):
+            self._fill(row)
+        self._place()
+
+    def select_row(self, row: int) -> None:
+        """Scroll to a row of the result and select it, e.g. for a search hit."""
+        self._selected_row = row
+        self.scroll_to(max(row - self._visible // 2, 0))
+        self._show_selection()
+
+    def _show_selection(self) -> None:
+        """Select the item showing the selected row, as the items are reused for other rows."""
+        items = self.tree.get_children()
+        row = self._selected_row
+        if row is not None and self._start <= row < self._stop:
+            self.tree.selection_set(items[row - self._start])
+            self.tree.focus(items[row - self._start])
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+    def _fill(self, first: int) -> None:
+        """Load the rows around first into the items of the Treeview, reusing the existing items."""
+        start, stop = visible_window(first, self._visible, self.row_count, self.buffer_rows)
+        items = self.tree.get_children()
+        count = 0
+        if stop > start:
+            page = self.result.page(start, stop)
+            marks = self.result.page_marks(start, stop)
+            self._widen_columns(page)
+            for count, row in enumerate(page.itertuples(index=False), 1):
+                values = list(row)
+                if marks is not None:
+                    values = [f'{CELL_MARK}{value}' if mark else value for value, mark in zip(values, marks[count - 1])]
+                if count <= len(items):
+                    self.tree.item(items[count - 1], values=values)
+                else:
+                    self.tree.insert('', 'end', values=values)
+        if len(items) > count:
+            self.tree.delete(*items[count:])
+        self._start, self._stop = start, stop
+        self._show_selection()
+
+    def _widen_columns(self, page: Any) -> None:
+        """Widen the columns whose values in the loaded rows are longer than their current width allows."""
+        columns = self.tree['columns']
+        if len(columns) != page.shape[1]:
+            return
+        for col, length in zip(columns, text_lengths(page)):
+            width = column_width(length)
+            if width > int(self.tree.column(col, 'width')):
+                self.tree.column(col, width=width)
+
+    def _place(self) -> None:
+        """Scroll the Treeview to the first visible row and update the scrollbar."""
+        held = self._stop - self._start
+        if held:
+            self.tree.yview_moveto((self._first - self._start) / held)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self) -> None:
+        """Show the position of the visible rows within the whole result."""
+        total = self.row_count
+        if not total:
+            self.yscroll.set(0.0, 1.0)
+            return
+        self.yscroll.set(self._first / total, min((self._first + self._visible) / total, 1.0))
+
+    def _on_scrollbar(self, *args: str) -> None:
+        """Handle dragging and clicking the vertical scrollbar."""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.row_count))
+        elif args[0] == 'scroll':
+            step = self._visible if args[2] == 'pages' else 1
+            self.scroll_to(self._first + int(args[1]) * step)
+
+    def _on_tree_scrolled(self, lo: str, hi: str) -> None:
+        """
+        Follow scrolling inside the Treeview (mouse wheel, keyboard, resizing) and load
+        further rows once the view comes near the end of the held rows.
+        """
+        held = self._stop - self._start
+        if not held or not self.tree.winfo_ismapped():
+            # Tables of hidden tabs have no height yet; they are measured once they are shown
+            self._update_scrollbar()
+            return
+        self._visible = max(1, round((float(hi) - float(lo)) * held))
+        self._first = self._start + round(float(lo) * held)
+        self._update_scrollbar()
+        margin = self.buffer_rows // 4
+        near_top = self._start > 0 and self._first - self._start < margin
+        near_bottom = self._stop < self.row_count and self._stop - (self._first + self._visible) < margin
+        if (near_top or near_bottom) and not self._refill_pending:
+            # Refilled after the current scroll event, as the Treeview is still updating its view
+            self._refill_pending = True
+            self.after_idle(self._refill)
+
+    def _refill(self) -> None:
+        """Load the rows around the current position."""
+        self._refill_pending = False
+        self._fill(self._first)
+        self._place()
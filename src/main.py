@@ -3,6 +3,7 @@ Main entrypoint for the CSVLotte application. Initializes the GUI and starts the
 """
 
 from csvlotte.controllers.home_controller import HomeController
+import multiprocessing
 import tkinter as tk
 def main() -> None:
     """
@@ -11,6 +12,8 @@ def main() -> None:
     Returns:
         None
     """
+    # Required for the compare process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = HomeController(root)
     root.mainloop()
@@ -0,0 +1,91 @@
+"""
+Tests for the background tasks in background.py
+"""
+import threading
+import time
+from csvlotte.utils.background import BackgroundTask
+
+
+class FakeRoot:
+    """Stands in for the Tk root: after() callbacks are run by pump() on the test thread."""
+
+    def __init__(self) -> None:
+        self.pending = []
+
+    def after(self, ms, callback) -> None:
+        self.pending.append(callback)
+
+    def pump(self, task: BackgroundTask, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while task.is_running and time.monotonic() < deadline:
+            callbacks, self.pending = self.pending, []
+            for callback in callbacks:
+                callback()
+            time.sleep(0.001)
+
+
+def make_task(root, work, outcome, threaded=True):
+    """Create a task that records its callbacks in outcome."""
+    return BackgroundTask(
+        root, work, [('compare', 1)],
+        on_progress=lambda state: outcome.setdefault('progress', []).append(state),
+        on_done=lambda result: outcome.__setitem__('done', (result, threading.current_thread())),
+        on_error=lambda error: outcome.__setitem__('error', error),
+        on_cancel=lambda: outcome.__setitem__('cancelled', True),
+        threaded=threaded,
+    )
+
+
+class TestBackgroundTask:
+    """Test cases for BackgroundTask."""
+
+    def test_result_is_delivered_on_the_polling_thread(self):
+        """The work runs in a worker; result and final progress arrive through the polling loop."""
+        root = FakeRoot()
+        outcome = {}
+        worker = []
+
+        def work(reporter):
+            worker.append(threading.current_thread())
+            reporter.start('compare', total=10)
+            reporter.update(10)
+            return 42
+
+        task = make_task(root, work, outcome)
+        task.start()
+        root.pump(task)
+        assert outcome['done'] == (42, threading.current_thread())
+        assert worker[0] is not threading.current_thread()
+        assert outcome['progress'][-1].fraction == 1.0
+
+    def test_cancel_stops_at_next_report(self):
+        """A cancelled task stops at its next progress report and delivers no result."""
+        root = FakeRoot()
+        outcome = {}
+        started = threading.Event()
+
+        def work(reporter):
+            reporter.start('compare')
+            started.set()
+            while True:
+                reporter.advance(1)
+                time.sleep(0.001)
+
+        task = make_task(root, work, outcome)
+        task.start()
+        assert started.wait(5)
+        task.cancel()
+        root.pump(task)
+        assert outcome.get('cancelled') and 'done' not in outcome
+
+    def test_errors_and_inline_mode(self):
+        """Errors of the work reach on_error; without a thread everything happens inside start()."""
+        outcome = {}
+
+        def work(reporter):
+            raise ValueError('kaputt')
+
+        task = make_task(FakeRoot(), work, outcome, threaded=False)
+        task.start()
+        assert not task.is_running
+        assert str(outcome['error']) == 'kaputt'
@@ -0,0 +1,367 @@
+"""
+Tests for the compare engine in compare.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from csvlotte.utils.compare import (
+    compare_keys, duplicate_positions, encode_keys, keys_are_sorted, merge_compare_keys, multiset_compare, parse_slice,
+    slice_keys,
+)
+
+
+def _set_based(series1, series2):
+    """Reference implementation: the original set/isin comparison."""
+    set1, set2 = set(series1), set(series2)
+    common = set1 & set2
+    return (
+        np.flatnonzero(series1.isin(set1 - set2)),
+        np.flatnonzero(series1.isin(common)),
+        np.flatnonzero(series2.isin(common)),
+        np.flatnonzero(series2.isin(set2 - set1)),
+    )
+
+
+class TestCompareKeys:
+    """Test cases for compare_keys."""
+
+    def test_partitions(self):
+        """Rows are split into only/common partitions per side."""
+        s1 = pd.Series(['Alice', 'Bob', 'Charlie', 'Bob'])
+        s2 = pd.Series(['Bob', 'David', 'Eve'])
+        only1, common1, common2, only2 = compare_keys(s1, s2)
+        assert list(only1) == [0, 2]
+        assert list(common1) == [1, 3]
+        assert list(common2) == [0]
+        assert list(only2) == [1, 2]
+
+    def test_matches_set_based_reference(self):
+        """The engine yields the same partitions as the set-based comparison."""
+        rng = np.random.default_rng(42)
+        s1 = pd.Series(rng.integers(0, 500, 2000))
+        s2 = pd.Series(rng.integers(250, 750, 1500))
+        for got, expected in zip(compare_keys(s1, s2), _set_based(s1, s2)):
+            assert np.array_equal(got, expected)
+
+    def test_ignores_index_labels(self):
+        """Filtered frames with gaps in the index are handled by position."""
+        s1 = pd.Series(['a', 'b', 'c'], index=[10, 20, 30])
+        s2 = pd.Series(['c', 'a'], index=[5, 7])
+        only1, common1, common2, only2 = compare_keys(s1, s2)
+        assert list(only1) == [1]
+        assert list(common1) == [0, 2]
+        assert list(common2) == [0, 1]
+        assert len(only2) == 0
+
+    def test_missing_values_match(self):
+        """Missing keys on both sides count as common, like in a set."""
+        s1 = pd.Series([1.0, np.nan, 3.0])
+        s2 = pd.Series([np.nan, 3.0])
+        only1, common1, common2, only2 = compare_keys(s1, s2)
+        assert list(only1) == [0]
+        assert list(common1) == [1, 2]
+        assert list(common2) == [0, 1]
+
+    def test_mixed_numeric_dtypes(self):
+        """Integer and float keys with equal values match."""
+        s1 = pd.Series([1, 2, 3])
+        s2 = pd.Series([2.0, 3.0, 4.5])
+        only1, common1, common2, only2 = compare_keys(s1, s2)
+        assert list(only1) == [0]
+        assert list(only2) == [2]
+
+    def test_numeric_and_text_keys(self):
+        """A numeric key column is compared with a text column on its text, like in the streamed compare."""
+        only1, common1, common2, only2 = compare_keys(pd.Series([1.0, 2.0, 10.0]), pd.Series(['1', '10', 'x']))
+        assert list(common1) == [0, 2] and list(common2) == [0, 1]
+
+    @pytest.mark.parametrize("s1,s2", [
+        (pd.Series([], dtype=object), pd.Series(['a'])),
+        (pd.Series(['a']), pd.Series([], dtype=object)),
+    ])
+    def test_empty_side(self, s1, s2):
+        """An empty side puts every row of the other side into its only partition."""
+        only1, common1, common2, only2 = compare_keys(s1, s2)
+        assert len(common1) == 0 and len(common2) == 0
+        assert len(only1) == len(s1)
+        assert len(only2) == len(s2)
+
+
+class TestSlicing:
+    """Test cases for parse_slice and slice_keys."""
+
+    @pytest.mark.parametrize("spec,expected", [
+        ("", None),
+        ("  ", None),
+        (":5", slice(None, 5, None)),
+        ("-4:", slice(-4, None, None)),
+        ("1:5:2", slice(1, 5, 2)),
+        ("[2:]", slice(2, None, None)),
+        ("3", slice(3, None, None)),
+    ])
+    def test_parse_valid(self, spec, expected):
+        """Valid specs are parsed into slice objects."""
+        assert parse_slice(spec) == expected
+
+    @pytest.mark.parametrize("spec", ["a:3", "1:2:3:4", "::0", "1.5:"])
+    def test_parse_invalid(self, spec):
+        """Invalid specs raise instead of being ignored per row."""
+        with pytest.raises(ValueError):
+            parse_slice(spec)
+
+    def test_slice_non_string_keys(self):
+        """Numeric keys are sliced on their string representation."""
+        result = slice_keys(pd.Series([12345, 67890]), parse_slice("-3:"))
+        assert list(result) == ["345", "890"]
+
+
+class TestCompositeKeys:
+    """Test cases for composite key encoding."""
+
+    def setup_method(self):
+        """Set up test data for each test method."""
+        self.df1 = pd.DataFrame({
+            'account': [1, 1, 2, 3],
+            'date': ['2024-01-01', '2024-01-02', '2024-01-01', '2024-01-01'],
+            'currency': ['EUR', 'EUR', 'USD', 'EUR'],
+        })
+        self.df2 = pd.DataFrame({
+            'konto': [1, 2, 3, 1],
+            'datum': ['2024-01-02', '2024-01-01', '2024-01-01', '2024-01-01'],
+            'waehrung': ['EUR', 'EUR', 'EUR', 'EUR'],
+        })
+
+    def test_composite_partitions(self):
+        """Rows match only if all key columns match."""
+        only1, common1, common2, only2 = compare_keys(self.df1, self.df2)
+        assert list(only1) == [2]
+        assert list(common1) == [0, 1, 3]
+        assert list(common2) == [0, 2, 3]
+        assert list(only2) == [1]
+
+    def test_list_of_series(self):
+        """Key columns can be passed as a list of Series."""
+        keys1 = [self.df1['account'], self.df1['currency']]
+        keys2 = [self.df2['konto'], self.df2['waehrung']]
+        only1, common1, common2, only2 = compare_keys(keys1, keys2)
+        assert list(only1) == [2]
+        assert list(only2) == [1]
+
+    def test_codes_are_dense(self):
+        """Combined codes stay dense, one code per distinct key tuple."""
+        codes1, codes2, size = encode_keys(self.df1, self.df2)
+        assert size == 5
+        assert codes1.max() < size and codes2.max() < size
+
+    def test_matches_tuple_reference(self):
+        """Encoding agrees with comparing row tuples on high-cardinality columns."""
+        rng = np.random.default_rng(7)
+        df1 = pd.DataFrame({'a': rng.integers(0, 60000, 5000), 'b': rng.integers(0, 60000, 5000), 'c': rng.integers(0, 3, 5000)})
+        df2 = pd.concat([df1.sample(2000, random_state=1), pd.DataFrame({'a': rng.integers(0, 60000, 1000), 'b': rng.integers(0, 60000, 1000), 'c': rng.integers(0, 3, 1000)})], ignore_index=True)
+        tuples1 = pd.Series(list(df1.itertuples(index=False, name=None)))
+        tuples2 = pd.Series(list(df2.itertuples(index=False, name=None)))
+        for got, expected in zip(compare_keys(df1, df2), _set_based(tuples1, tuples2)):
+            assert np.array_equal(got, expected)
+
+    def test_mismatched_column_count(self):
+        """Both sides need the same number of key columns."""
+        with pytest.raises(ValueError):
+            encode_keys(self.df1, self.df2[['konto']])
+
+
+def _run_now(fn, *args):
+    """Run a pool task in-process and return a finished future."""
+    from concurrent.futures import Future
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
+
+class TestParallelCompare:
+    """Test cases for parallel_compare_keys."""
+
+    def test_matches_single_core(self):
+        """The process pool yields the same partitions as compare_keys."""
+        from csvlotte.utils.parallel_compare import parallel_compare_keys
+        rng = np.random.default_rng(3)
+        s1 = pd.Series([f'K{i}' for i in rng.integers(0, 4000, 6000)])
+        s2 = pd.Series([f'K{i}' for i in rng.integers(2000, 6000, 5000)])
+        extra1 = pd.Series(rng.integers(0, 2, 6000))
+        extra2 = pd.Series(rng.integers(0, 2, 5000))
+        expected = compare_keys([s1, extra1], [s2, extra2])
+        result = parallel_compare_keys([s1, extra1], [s2, extra2], workers=2, min_rows=0)
+        for got, exp in zip(result, expected):
+            assert np.array_equal(got, exp)
+
+    def test_matches_on_values_not_hashes(self):
+        """Colliding hashes never make keys match, and int and float keys match like in compare_keys."""
+        from unittest.mock import patch
+        from csvlotte.utils import parallel_compare
+        s1 = pd.Series([1, 2, 9, 10])
+        s2 = pd.Series([1.0, 3.0, 10.0])
+        expected = compare_keys(s1, s2)
+        result = parallel_compare.parallel_compare_keys(s1, s2, workers=2, min_rows=0)
+        for got, exp in zip(result, expected):
+            assert np.array_equal(got, exp)
+        # Every key in partition 0: the values still decide the match
+        with patch.object(parallel_compare, '_partition_ids', side_effect=lambda columns, n: np.zeros(len(columns[0]), dtype=np.uint16)):
+            with patch.object(parallel_compare, '_get_pool') as get_pool:
+                get_pool.return_value.submit.side_effect = _run_now
+                result = parallel_compare.parallel_compare_keys(pd.Series(['a', 'b']), pd.Series(['b', 'c']), workers=2, min_rows=0)
+        assert [list(p) for p in result] == [[0], [1], [0], [1]]
+
+    def test_pool_spawns_workers(self):
+        """The shared pool starts its workers with spawn, never by forking the threaded Tk process."""
+        from unittest.mock import patch
+        from csvlotte.utils import parallel_compare
+        parallel_compare.shutdown_pool()
+        with patch.object(parallel_compare, 'ProcessPoolExecutor') as executor:
+            parallel_compare._get_pool(2)
+            parallel_compare.shutdown_pool()
+        assert executor.call_args.kwargs['mp_context'].get_start_method() == 'spawn'
+
+    def test_small_inputs_stay_in_process(self):
+        """Inputs below min_rows fall back to compare_keys."""
+        from csvlotte.utils.parallel_compare import parallel_compare_keys
+        result = parallel_compare_keys(pd.Series(['a', 'b']), pd.Series(['b']), workers=4)
+        assert [list(p) for p in result] == [[0], [1], [0], []]
+
+
+class TestAsymmetricCompare:
+    """Test cases for the asymmetric compare that hashes only the smaller side."""
+
+    @pytest.mark.parametrize("swap", [False, True])
+    @pytest.mark.parametrize("bloom_min_keys", [None, 1])
+    def test_matches_hash_compare(self, swap, bloom_min_keys):
+        """Probing the large side yields the same partitions as compare_keys, for either side being small."""
+        from csvlotte.utils.asymmetric_compare import asymmetric_compare_keys
+        rng = np.random.default_rng(5)
+        small = [pd.Series([f'K{i}' for i in rng.integers(0, 300, 40)]).where(rng.random(40) > 0.1),
+                 pd.Series(rng.integers(0, 2, 40))]
+        large = [pd.Series([f'K{i}' for i in rng.integers(0, 3000, 5000)]).where(rng.random(5000) > 0.1),
+                 pd.Series(rng.integers(0, 2, 5000))]
+        keys1, keys2 = (large, small) if swap else (small, large)
+        for got, expected in zip(asymmetric_compare_keys(keys1, keys2, bloom_min_keys), compare_keys(keys1, keys2)):
+            assert np.array_equal(got, expected)
+
+    @pytest.mark.parametrize("bloom_min_keys", [None, 1])
+    def test_mixed_key_types_match_hash_compare(self, bloom_min_keys):
+        """Numbers against texts and integers against floats match like in compare_keys."""
+        from csvlotte.utils.asymmetric_compare import asymmetric_compare_keys
+        ints = pd.Series([1, 2])
+        for large in (pd.Series(['1', 'x'] * 60), pd.Series([2.0, np.nan] * 60)):
+            for got, expected in zip(asymmetric_compare_keys(ints, large, bloom_min_keys), compare_keys(ints, large)):
+                assert np.array_equal(got, expected)
+        assert len(asymmetric_compare_keys(ints, pd.Series(['1', 'x'] * 60), bloom_min_keys)[1]) == 1
+
+    def test_bloom_filter_keeps_matches(self):
+        """The Bloom filter pre-check never drops a matching key and rejects most others."""
+        from csvlotte.utils.asymmetric_compare import BloomFilter, KeyProbe, key_hashes
+        small = pd.Series([f'K{i}' for i in range(5000)])
+        large = pd.Series([f'K{i}' for i in range(2500, 12500)])
+        plain = KeyProbe(small)
+        filtered = KeyProbe(small, bloom_min_keys=1)
+        assert filtered.uses_bloom and not plain.uses_bloom
+        assert np.array_equal(filtered.lookup(large), plain.lookup(large))
+        bloom = BloomFilter(key_hashes(small))
+        assert bloom.might_contain(key_hashes(small)).all()
+        assert bloom.might_contain(key_hashes(large.iloc[2500:])).mean() < 0.05
+
+
+class TestIncrementalCompare:
+    """Test cases for the compare that keeps the encoded keys of each file."""
+
+    def test_matches_hash_compare(self):
+        """First and repeated compares yield the same partitions as compare_keys."""
+        from csvlotte.utils.incremental_compare import ProbeCache, cached_compare_keys
+        rng = np.random.default_rng(8)
+        keys1 = [pd.Series([f'K{i}' for i in rng.integers(0, 300, 2000)]).where(rng.random(2000) > 0.1),
+                 pd.Series(rng.integers(0, 3, 2000))]
+        keys2 = [pd.Series([f'K{i}' for i in rng.integers(100, 400, 1500)]).where(rng.random(1500) > 0.1),
+                 pd.Series(rng.integers(0, 3, 1500))]
+        filtered2 = [col.iloc[::3] for col in keys2]
+        cache = ProbeCache()
+        for k1, k2 in ((keys1, keys2), (keys1, filtered2), (keys1[:1], keys2[:1])):
+            for got, expected in zip(cached_compare_keys(cache, k1, k2), compare_keys(k1, k2)):
+                assert np.array_equal(got, expected)
+
+    def test_only_changed_side_is_encoded(self):
+        """After changing file 2, the stored encoding of file 1 is reused."""
+        from unittest.mock import patch
+        from csvlotte.utils import incremental_compare
+        keys1 = pd.Series(['a', 'b', 'c'])
+        cache = incremental_compare.ProbeCache()
+        incremental_compare.cached_compare_keys(cache, keys1, pd.Series(['b', 'd']))
+        probe1 = cache.get(keys1)
+        with patch.object(incremental_compare, 'KeyProbe', wraps=incremental_compare.KeyProbe) as mock_probe:
+            result = incremental_compare.cached_compare_keys(cache, keys1, pd.Series(['c', 'a']))
+        assert mock_probe.call_count == 1
+        assert cache.get(keys1) is probe1
+        assert [list(p) for p in result] == [[1], [0, 2], [0, 1], []]
+
+    def test_mixed_key_types_match_hash_compare(self):
+        """Numbers against texts and integers against floats match like in compare_keys, also from the cache."""
+        from csvlotte.utils.incremental_compare import ProbeCache, cached_compare_keys
+        cache = ProbeCache()
+        ints = pd.Series([1, 2, 3])
+        for k1, k2 in ((ints, pd.Series(['1', 'x', '3'])), (ints, pd.Series([3.0, 1.0])), (ints, pd.Series([2.0, np.nan]))):
+            for got, expected in zip(cached_compare_keys(cache, k1, k2), compare_keys(k1, k2)):
+                assert np.array_equal(got, expected)
+        assert [list(p) for p in cached_compare_keys(ProbeCache(), ints, pd.Series(['1', 'x', '3']))] == [[1], [0, 2], [0, 2], [1]]
+
+
+class TestMergeCompare:
+    """Test cases for the sort-merge compare of pre-sorted keys."""
+
+    def test_detects_sorted_keys(self):
+        """Only single, ascending key columns without gaps count as sorted."""
+        assert keys_are_sorted(pd.Series([1, 2, 2, 5]), pd.Series([0, 3]))
+        assert not keys_are_sorted(pd.Series([2, 1]), pd.Series([0, 3]))
+        assert not keys_are_sorted(pd.Series([1.0, np.nan]), pd.Series([0.0]))
+        assert not keys_are_sorted(pd.DataFrame({'a': [1], 'b': [2]}), pd.DataFrame({'a': [1], 'b': [2]}))
+
+    @pytest.mark.parametrize("make", [lambda x: x, lambda x: np.array([f'{v:06d}' for v in x], dtype=object)])
+    def test_matches_hash_compare(self, make):
+        """The merge pass yields the same partitions as the hash-based compare."""
+        rng = np.random.default_rng(11)
+        s1 = pd.Series(make(np.sort(rng.integers(0, 3000, 4000))))
+        s2 = pd.Series(make(np.sort(rng.integers(1000, 4000, 3500))))
+        for got, expected in zip(merge_compare_keys(s1, s2), compare_keys(s1, s2)):
+            assert np.array_equal(got, expected)
+
+    def test_empty(self):
+        """Empty inputs give empty partitions."""
+        result = merge_compare_keys(pd.Series([], dtype=object), pd.Series([], dtype=object))
+        assert all(len(p) == 0 for p in result)
+
+
+class TestMultisetCompare:
+    """Test cases for the duplicate-aware compare."""
+
+    def test_occurrences_are_paired(self):
+        """Surplus occurrences of a key go to the only partitions."""
+        s1 = pd.Series(['a', 'b', 'a', 'c', 'a'])
+        s2 = pd.Series(['a', 'd', 'c', 'c'])
+        (only1, common1, common2, only2), differences, duplicates = multiset_compare(s1, s2)
+        assert list(only1) == [1, 2, 4]
+        assert list(common1) == [0, 3]
+        assert list(common2) == [0, 2]
+        assert list(only2) == [1, 3]
+        assert differences.values.tolist() == [['a', 3, 1, 2], ['b', 1, 0, 1], ['c', 1, 2, -1], ['d', 0, 1, -1]]
+        assert [list(d) for d in duplicates] == [[0, 2, 4], [2, 3]]
+
+    def test_without_duplicates_matches_compare_keys(self):
+        """Unique keys give the same partitions as the set-like compare."""
+        s1 = pd.Series(np.arange(0, 100))
+        s2 = pd.Series(np.arange(50, 150))
+        partitions, differences, duplicates = multiset_compare(s1, s2)
+        for got, expected in zip(partitions, compare_keys(s1, s2)):
+            assert np.array_equal(got, expected)
+        assert len(differences) == 100
+        assert all(len(d) == 0 for d in duplicates)
+
+    def test_duplicate_positions(self):
+        """All rows of a repeated composite key are reported."""
+        keys = pd.DataFrame({'a': [1, 1, 2, 1], 'b': ['x', 'y', 'x', 'x']})
+        codes, _, size = encode_keys(keys, keys.iloc[:0])
+        assert list(duplicate_positions(codes, np.bincount(codes, minlength=size))) == [0, 3]
@@ -0,0 +1,74 @@
+"""
+Tests for the row diff in diff.py
+"""
+import numpy as np
+import pandas as pd
+from csvlotte.utils.diff import CHANGED_COLUMNS, changed_cells, diff_rows, match_rows, values_equal
+from csvlotte.utils.result import RowsResult
+
+
+class TestDiffRows:
+    """Test cases for the changed-rows diff."""
+
+    def setup_method(self):
+        """Set up test data for each test method."""
+        self.df1 = pd.DataFrame({
+            'id': [1, 2, 3, 4, 2],
+            'amount': [10.0, 20.0, np.nan, 40.0, 99.0],
+            'name': ['a', 'b', 'c', 'd', 'x'],
+            'only1': [0, 0, 0, 0, 0],
+        })
+        self.df2 = pd.DataFrame({
+            'key': [4, 3, 2, 5],
+            'amount': [41, np.nan, 20, 50],
+            'name': ['d', 'c', 'B', 'e'],
+        })
+
+    def test_match_rows_uses_first_duplicate(self):
+        """Matched pairs are ordered by file 1 and use the first row of a duplicate key."""
+        pos1, pos2 = match_rows(self.df1['id'], self.df2['key'])
+        assert list(pos1) == [1, 2, 3]
+        assert list(pos2) == [2, 1, 0]
+
+    def test_changed_rows_and_counts(self):
+        """Only differing matched rows are reported, with flags and counts per column."""
+        changed, flags, mismatches = diff_rows(self.df1, self.df2, self.df1['id'], self.df2['key'], ['id'], ['key'])
+        assert list(changed['id']) == [2, 4]
+        assert list(changed[CHANGED_COLUMNS]) == ['name', 'amount']
+        assert list(changed['amount (1)']) == [20.0, 40.0]
+        assert list(changed['amount (2)']) == [20, 41]
+        assert flags.values.tolist() == [[False, True], [True, False]]
+        assert mismatches.to_dict() == {'amount': 1, 'name': 1}
+
+    def test_changed_cells_follow_sorting(self):
+        """Both value columns of a changed column are marked per row, also in a sorted result."""
+        changed, flags, _ = diff_rows(self.df1, self.df2, self.df1['id'], self.df2['key'], ['id'], ['key'])
+        marks = changed_cells(changed, flags)
+        columns = list(changed.columns)
+        assert [columns[j] for j in np.flatnonzero(marks[0])] == ['name (1)', 'name (2)']
+        assert [columns[j] for j in np.flatnonzero(marks[1])] == ['amount (1)', 'amount (2)']
+        result = RowsResult(changed, marks=marks).sorted('id', ascending=False)
+        assert result.page_marks(0, 2).tolist() == marks[::-1].tolist()
+        assert RowsResult(changed).page_marks(0, 2) is None
+
+    def test_chunks_give_same_result(self):
+        """Comparing in small chunks gives the same result as one chunk."""
+        rng = np.random.default_rng(5)
+        df1 = pd.DataFrame({'id': rng.permutation(3000), 'v': rng.integers(0, 3, 3000)})
+        df2 = pd.DataFrame({'id': rng.permutation(3000), 'v': rng.integers(0, 3, 3000)})
+        whole = diff_rows(df1, df2, df1['id'], df2['id'], ['id'], ['id'])
+        chunked = diff_rows(df1, df2, df1['id'], df2['id'], ['id'], ['id'], chunk_rows=128)
+        pd.testing.assert_frame_equal(whole[0], chunked[0])
+        pd.testing.assert_series_equal(whole[2], chunked[2])
+
+    def test_reports_progress_per_chunk(self):
+        """The completed fraction of the matched pairs is reported after every chunk."""
+        df = pd.DataFrame({'id': range(10), 'v': 0})
+        fractions = []
+        diff_rows(df, df, df['id'], df['id'], ['id'], ['id'], chunk_rows=4, progress=fractions.append)
+        assert fractions == [0.4, 0.8, 1.0]
+
+    def test_values_equal_mixed_types(self):
+        """Numbers and text are compared on their text; missing values match each other."""
+        equal = values_equal(pd.Series(['1', 'x', None]), pd.Series([1, 2, np.nan]))
+        assert list(equal) == [True, False, True]
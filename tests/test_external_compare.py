@@ -0,0 +1,224 @@
+"""
+Tests for the out-of-core compare in external_compare.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from csvlotte.utils.compare import compare_keys
+from csvlotte.utils.external_compare import CsvSource, NotSortedError, external_sort, partitioned_compare, sorted_merge_compare
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    """Write two overlapping CSV files and return their paths and frames."""
+    rng = np.random.default_rng(0)
+    df1 = pd.DataFrame({
+        'id': [f'K{i}' for i in rng.integers(0, 3000, 8000)],
+        'amount': rng.integers(0, 100, 8000),
+    })
+    df2 = pd.DataFrame({
+        'key': [f'K{i}' for i in rng.integers(1500, 4500, 6000)],
+        'text': 'x',
+    })
+    path1 = tmp_path / 'a.csv'
+    path2 = tmp_path / 'b.csv'
+    df1.to_csv(path1, sep=';', index=False)
+    df2.to_csv(path2, sep=';', index=False)
+    return str(path1), str(path2), df1, df2
+
+
+class TestPartitionedCompare:
+    """Test cases for partitioned_compare."""
+
+    def _out_paths(self, tmp_path):
+        return [str(tmp_path / f'out{i}.csv') for i in range(4)]
+
+    def test_matches_in_memory_compare(self, csv_files, tmp_path):
+        """Streamed results contain the same rows as the in-memory compare."""
+        path1, path2, df1, df2 = csv_files
+        out_paths = self._out_paths(tmp_path)
+        progress = []
+        counts = partitioned_compare(CsvSource(path1, ['id']), CsvSource(path2, ['key']), out_paths,
+                                     n_partitions=5, chunksize=1000, progress=progress.append)
+        expected = compare_keys(df1['id'], df2['key'])
+        assert counts == tuple(len(pos) for pos in expected)
+        frames = [df1, df1, df2, df2]
+        for out_path, frame, pos in zip(out_paths, frames, expected):
+            result = pd.read_csv(out_path, sep=';', encoding='latin1')
+            assert list(result.columns) == list(frame.columns)
+            reference = frame.iloc[pos]
+            assert sorted(map(tuple, result.values.tolist())) == sorted(map(tuple, reference.values.tolist()))
+        assert progress[-1] == pytest.approx(1.0)
+
+    def test_filter_and_slice(self, csv_files, tmp_path):
+        """Filters and key slices are applied to every chunk."""
+        path1, path2, df1, df2 = csv_files
+        out_paths = self._out_paths(tmp_path)
+        counts = partitioned_compare(CsvSource(path1, ['id'], key_slice=slice(1, None), filter_str='amount < 50'),
+                                     CsvSource(path2, ['key'], key_slice=slice(1, None)), out_paths,
+                                     n_partitions=3, chunksize=700)
+        filtered = df1[df1['amount'] < 50]
+        expected = compare_keys(filtered['id'].str[1:], df2['key'].str[1:])
+        assert counts == tuple(len(pos) for pos in expected)
+
+    def test_normalized_keys(self, tmp_path):
+        """Key normalisation is applied to every chunk."""
+        path1 = tmp_path / 'a.csv'
+        path2 = tmp_path / 'b.csv'
+        pd.DataFrame({'id': ['007', ' X', 'y']}).to_csv(path1, sep=';', index=False)
+        pd.DataFrame({'id': ['7', 'x ']}).to_csv(path2, sep=';', index=False)
+        counts = partitioned_compare(CsvSource(str(path1), ['id'], transforms=['strip', 'casefold', 'numbers']),
+                                     CsvSource(str(path2), ['id'], transforms=['strip', 'casefold', 'numbers']),
+                                     self._out_paths(tmp_path), n_partitions=2)
+        assert counts == (1, 2, 2, 0)
+
+    def test_empty_results_have_headers(self, tmp_path):
+        """Outputs without rows are still valid CSV files with a header."""
+        path1 = tmp_path / 'a.csv'
+        path2 = tmp_path / 'b.csv'
+        pd.DataFrame({'id': ['a', 'b']}).to_csv(path1, sep=';', index=False)
+        pd.DataFrame({'id': ['c']}).to_csv(path2, sep=';', index=False)
+        out_paths = self._out_paths(tmp_path)
+        counts = partitioned_compare(CsvSource(str(path1), ['id']), CsvSource(str(path2), ['id']), out_paths, n_partitions=2)
+        assert counts == (2, 0, 0, 1)
+        common = pd.read_csv(out_paths[1], sep=';')
+        assert list(common.columns) == ['id'] and common.empty
+
+    def test_numeric_keys_match_in_memory_compare(self, tmp_path):
+        """Integer and float spellings of the same id match like in memory, and filters see numbers."""
+        path1 = tmp_path / 'a.csv'
+        path2 = tmp_path / 'b.csv'
+        df1 = pd.DataFrame({'id': [1, 2, 9, 10]})
+        df2 = pd.DataFrame({'id': [1.0, 2.0, 9.0, 10.0]})
+        df1.to_csv(path1, sep=';', index=False)
+        df2.to_csv(path2, sep=';', index=False)
+        expected = compare_keys(pd.read_csv(path1, sep=';')['id'], pd.read_csv(path2, sep=';')['id'])
+        counts = partitioned_compare(CsvSource(str(path1), ['id']), CsvSource(str(path2), ['id']),
+                                     self._out_paths(tmp_path), n_partitions=2, chunksize=3)
+        assert counts == tuple(len(pos) for pos in expected) == (0, 4, 4, 0)
+        counts = partitioned_compare(CsvSource(str(path1), ['id'], filter_str='id > 5'), CsvSource(str(path2), ['id']),
+                                     self._out_paths(tmp_path), n_partitions=2)
+        assert counts == (0, 2, 2, 2)
+
+    def test_result_does_not_depend_on_chunk_size(self, tmp_path):
+        """A key column read as numbers in one chunk and as text in another still matches by value."""
+        path1 = tmp_path / 'a.csv'
+        path2 = tmp_path / 'b.csv'
+        path1.write_text('id\n123\n456\nABC\n')
+        path2.write_text('id\n123\n456\n')
+        for chunksize in (2, 100):
+            counts = partitioned_compare(CsvSource(str(path1), ['id']), CsvSource(str(path2), ['id']),
+                                         self._out_paths(tmp_path), n_partitions=1, chunksize=chunksize)
+            assert counts == (1, 2, 2, 0)
+
+    def test_results_keep_the_format_of_their_file(self, tmp_path):
+        """Each result file is written with the separator and encoding of the file its rows come from."""
+        path1 = tmp_path / 'a.csv'
+        path2 = tmp_path / 'b.csv'
+        pd.DataFrame({'id': ['a', 'ö']}).to_csv(path1, sep=',', index=False, encoding='utf-8')
+        pd.DataFrame({'id': ['ö'], 'x': [1]}).to_csv(path2, sep='|', index=False, encoding='latin1')
+        out_paths = self._out_paths(tmp_path)
+        partitioned_compare(CsvSource(str(path1), ['id'], sep=',', encoding='utf-8'),
+                            CsvSource(str(path2), ['id'], sep='|', encoding='latin1'), out_paths, n_partitions=2)
+        assert pd.read_csv(out_paths[1], sep=',', encoding='utf-8')['id'].tolist() == ['ö']
+        assert pd.read_csv(out_paths[2], sep='|', encoding='latin1').columns.tolist() == ['id', 'x']
+
+
+class TestSortedMergeCompare:
+    """Test cases for sorted_merge_compare."""
+
+    def _out_paths(self, tmp_path):
+        return [str(tmp_path / f'out{i}.csv') for i in range(4)]
+
+    def _sorted_files(self, csv_files, tmp_path):
+        path1, path2, df1, df2 = csv_files
+        df1 = df1.sort_values('id', kind='stable', ignore_index=True)
+        df2 = df2.sort_values('key', kind='stable', ignore_index=True)
+        df1.to_csv(path1, sep=';', index=False)
+        df2.to_csv(path2, sep=';', index=False)
+        return path1, path2, df1, df2
+
+    def test_matches_in_memory_compare(self, csv_files, tmp_path):
+        """The streaming merge yields the same rows in file order as the in-memory compare."""
+        path1, path2, df1, df2 = self._sorted_files(csv_files, tmp_path)
+        out_paths = self._out_paths(tmp_path)
+        progress = []
+        counts = sorted_merge_compare(CsvSource(path1, ['id']), CsvSource(path2, ['key']), out_paths,
+                                      chunksize=333, progress=progress.append)
+        expected = compare_keys(df1['id'], df2['key'])
+        assert counts == tuple(len(pos) for pos in expected)
+        for out_path, frame, pos in zip(out_paths, [df1, df1, df2, df2], expected):
+            result = pd.read_csv(out_path, sep=';', encoding='latin1')
+            assert result.values.tolist() == frame.iloc[pos].values.tolist()
+        assert progress[-1] == pytest.approx(1.0)
+
+    def test_numeric_order(self, tmp_path):
+        """Files sorted by number are merged in numeric order, also when sorted externally."""
+        path1 = tmp_path / 'a.csv'
+        path2 = tmp_path / 'b.csv'
+        pd.DataFrame({'id': [1, 2, 9, 10, 10, 100]}).to_csv(path1, sep=';', index=False)
+        pd.DataFrame({'id': [2.0, 10.0, 11.0]}).to_csv(path2, sep=';', index=False)
+        out_paths = self._out_paths(tmp_path)
+        counts = sorted_merge_compare(CsvSource(str(path1), ['id']), CsvSource(str(path2), ['id']), out_paths, chunksize=2)
+        assert counts == (3, 3, 2, 1)
+        assert pd.read_csv(out_paths[1], sep=';')['id'].tolist() == [2, 10, 10]
+        pd.DataFrame({'id': [10, 1, 100, 9]}).to_csv(path1, sep=';', index=False)
+        with pytest.raises(NotSortedError):
+            sorted_merge_compare(CsvSource(str(path1), ['id']), CsvSource(str(path2), ['id']), out_paths)
+        counts = sorted_merge_compare(CsvSource(str(path1), ['id']), CsvSource(str(path2), ['id']), out_paths,
+                                      presort=True, tmp_dir=str(tmp_path))
+        assert counts == (3, 1, 1, 2)
+        assert pd.read_csv(out_paths[0], sep=';')['id'].tolist() == [1, 9, 100]
+
+    def test_unsorted_input_raises(self, csv_files, tmp_path):
+        """Unsorted files are detected while streaming."""
+        path1, path2, _, _ = csv_files
+        with pytest.raises(NotSortedError):
+            sorted_merge_compare(CsvSource(path1, ['id']), CsvSource(path2, ['key']), self._out_paths(tmp_path),
+                                 chunksize=500)
+
+    def test_presort_unsorted_input(self, csv_files, tmp_path):
+        """With presort, unsorted files are sorted externally before the merge."""
+        path1, path2, df1, df2 = csv_files
+        out_paths = self._out_paths(tmp_path)
+        source1 = CsvSource(path1, ['id'], key_slice=slice(1, None), filter_str='amount < 50')
+        source2 = CsvSource(path2, ['key'], key_slice=slice(1, None))
+        counts = sorted_merge_compare(source1, source2, out_paths, chunksize=400, presort=True)
+        filtered = df1[df1['amount'] < 50]
+        expected = compare_keys(filtered['id'].str[1:], df2['key'].str[1:])
+        assert counts == tuple(len(pos) for pos in expected)
+        common2 = pd.read_csv(out_paths[2], sep=';', encoding='latin1')
+        assert sorted(common2['key']) == sorted(df2['key'].iloc[expected[2]])
+
+    def test_external_sort_merges_runs(self, csv_files, tmp_path):
+        """Several sorted runs are merged into one sorted file with all rows."""
+        path1, _, df1, _ = csv_files
+        sorted_source = external_sort(CsvSource(path1, ['id']), str(tmp_path), 1, run_rows=900)
+        result = pd.read_csv(sorted_source.path, sep=';', encoding='utf-8')
+        assert result['id'].is_monotonic_increasing
+        assert sorted(result.values.tolist()) == sorted(df1.values.tolist())
+
+
+class TestAsymmetricFileCompare:
+    """Test cases for asymmetric_file_compare."""
+
+    @pytest.mark.parametrize("small_first,bloom_min_keys", [(True, None), (False, 1)])
+    def test_matches_in_memory_compare(self, tmp_path, small_first, bloom_min_keys):
+        """The small file is probed by the streamed large file; results keep the file order."""
+        from csvlotte.utils.asymmetric_compare import asymmetric_file_compare
+        rng = np.random.default_rng(2)
+        small = pd.DataFrame({'id': [f'K{i}' for i in rng.integers(0, 3000, 60)], 'x': 1})
+        large = pd.DataFrame({'id': [f'K{i}' for i in rng.integers(0, 3000, 5000)], 'y': 2})
+        df1, df2 = (small, large) if small_first else (large, small)
+        df1.to_csv(tmp_path / 'a.csv', sep=';', index=False)
+        df2.to_csv(tmp_path / 'b.csv', sep=';', index=False)
+        out_paths = [str(tmp_path / f'out{i}.csv') for i in range(4)]
+        progress = []
+        counts = asymmetric_file_compare(CsvSource(str(tmp_path / 'a.csv'), ['id']), CsvSource(str(tmp_path / 'b.csv'), ['id']),
+                                         out_paths, chunksize=700, bloom_min_keys=bloom_min_keys, progress=progress.append)
+        expected = compare_keys(df1['id'], df2['id'])
+        assert counts == tuple(len(pos) for pos in expected)
+        for out_path, frame, pos in zip(out_paths, [df1, df1, df2, df2], expected):
+            result = pd.read_csv(out_path, sep=';', encoding='latin1')
+            assert result.values.tolist() == frame.iloc[pos].values.tolist()
+        assert progress[-1] == pytest.approx(1.0)
@@ -0,0 +1,66 @@
+"""
+Tests for the filter dialog logic in filter_controller.py
+"""
+import pandas as pd
+import pytest
+from csvlotte.controllers.filter_controller import FilterController
+
+
+class TestFilterController:
+    """Test cases for FilterController."""
+
+    def setup_method(self):
+        """Set up a small DataFrame for every test."""
+        self.df = pd.DataFrame({'id': [1, 2, 3, 4], 'country': ['DE', 'US', 'DE', 'FR']})
+        self.controller = FilterController(self.df)
+
+    def test_filter_keeps_mask_instead_of_rows(self):
+        """A filter is counted from its mask; the filtered rows are only built when asked for."""
+        assert self.controller.apply_filter("country = 'DE'") == 2
+        assert self.controller.row_count == 2
+        assert self.controller.df_filtered is None
+        rows = self.controller.get_rows_result()
+        assert rows.df is self.df and list(rows.positions) == [0, 2]
+        assert list(self.controller.get_filtered()['id']) == [1, 3]
+
+    def test_no_filter_keeps_all_rows(self):
+        """An empty filter shows all rows of the original DataFrame."""
+        self.controller.apply_filter("country = 'DE'")
+        assert self.controller.apply_filter('') == 4
+        assert self.controller.get_filtered() is self.df
+        assert len(self.controller.get_rows_result()) == 4
+
+    def test_invalid_filter_is_raised_and_keeps_current_filter(self):
+        """An unparsable filter is reported to the caller and leaves the applied filter in place."""
+        self.controller.apply_filter("country = 'DE'")
+        with pytest.raises(Exception):
+            self.controller.apply_filter('unknown > 1')
+        assert self.controller.row_count == 2
+        assert list(self.controller.get_filtered()['id']) == [1, 3]
+
+    def test_estimate_matches_on_sample(self):
+        """The preview counts small frames exactly and extrapolates from a sample of large ones."""
+        assert self.controller.estimate_matches("country = 'DE'") == (2, True)
+        df = pd.DataFrame({'id': range(10_000)})
+        controller = FilterController(df)
+        estimate, exact = controller.estimate_matches('id < 2500', sample_rows=1000)
+        assert not exact and 2000 <= estimate <= 3000
+        # The current filter is left untouched
+        assert controller.row_count == 10_000 and controller.mask is None
+
+    def test_estimate_matches_raises_filter_errors(self):
+        """Errors in a typed filter are reported to the preview instead of ignored."""
+        with pytest.raises(Exception):
+            self.controller.estimate_matches('unknown > 1')
+
+    def test_declared_date_columns_are_kept(self):
+        """Filters, previews and the filtered rows use the dates parsed once for the loaded DataFrame."""
+        from unittest.mock import patch
+        from csvlotte.utils.helpers import declare_date_columns, declared_date_columns
+        df = pd.DataFrame({'day': [f'2024-01-{d:02d}' for d in range(1, 31)] * 100})
+        declare_date_columns(df, ['day'])
+        controller = FilterController(df)
+        with patch('csvlotte.utils.helpers.to_dates', side_effect=AssertionError('parsed again')):
+            assert controller.estimate_matches("day <= '10.01.2024'", sample_rows=300)[0] > 0
+            assert controller.apply_filter("day <= '10.01.2024'") == 1000
+            assert declared_date_columns(controller.get_filtered()) == ['day']
@@ -0,0 +1,76 @@
+"""
+Tests for the fuzzy compare in fuzzy.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from csvlotte.utils.fuzzy import candidate_pairs, fuzzy_match, key_text, levenshtein_similarity
+
+
+def _levenshtein(a, b):
+    """Reference implementation: textbook dynamic programming."""
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+class TestLevenshtein:
+    """Test cases for the vectorised edit distance."""
+
+    def test_known_pairs(self):
+        """Classic examples give the expected similarities."""
+        scores = levenshtein_similarity(np.array(['kitten', 'abc', '', 'Müller'], dtype=object),
+                                        np.array(['sitting', 'abc', 'xy', 'Mueller'], dtype=object))
+        assert scores == pytest.approx([1 - 3 / 7, 1.0, 0.0, 1 - 2 / 7])
+
+    def test_matches_reference(self):
+        """Random pairs of different lengths agree with the reference implementation."""
+        rng = np.random.default_rng(1)
+        words1 = np.array([''.join(rng.choice(list('abc'), rng.integers(0, 8))) for _ in range(500)], dtype=object)
+        words2 = np.array([''.join(rng.choice(list('abc'), rng.integers(0, 8))) for _ in range(500)], dtype=object)
+        expected = [1 - _levenshtein(a, b) / max(len(a), len(b), 1) for a, b in zip(words1, words2)]
+        assert levenshtein_similarity(words1, words2) == pytest.approx(expected)
+
+
+class TestFuzzyMatch:
+    """Test cases for blocking and fuzzy_match."""
+
+    def test_candidate_pairs_are_cross_file(self):
+        """Candidates only pair keys of different files and are far fewer than all pairs."""
+        values1 = np.array([f'name{i:04d}' for i in range(0, 1000, 2)], dtype=object)
+        values2 = np.array([f'name{i:04d}' for i in range(1, 1000, 2)], dtype=object)
+        idx1, idx2 = candidate_pairs(values1, values2, window=2)
+        assert len(idx1) < len(values1) * len(values2) / 50
+        assert idx1.max() < len(values1) and idx2.max() < len(values2)
+
+    def test_finds_typos(self):
+        """Slightly different keys are reported with their similarity, best first."""
+        keys1 = pd.Series(['Hauptstraße 5', 'Bahnhofstr. 12', 'Am Markt 1'])
+        keys2 = pd.Series(['Bahnhofstr 12', 'Hauptstrasse 5', 'Lindenweg 3'])
+        result = fuzzy_match(keys1, keys2, threshold=0.8)
+        assert result.values.tolist() == [['Bahnhofstr. 12', 'Bahnhofstr 12', 0.929], ['Hauptstraße 5', 'Hauptstrasse 5', 0.857]]
+
+    def test_reports_progress_per_batch(self):
+        """The completed fraction is reported after the candidates and after every scored batch."""
+        from unittest.mock import patch
+        fractions = []
+        keys1 = pd.Series([f'Kunde {i:04d}' for i in range(0, 400, 2)])
+        keys2 = pd.Series([f'Kunde {i:04d}' for i in range(1, 400, 2)])
+        with patch('csvlotte.utils.fuzzy.FUZZY_BATCH', 100):
+            fuzzy_match(keys1, keys2, threshold=0.8, workers=1, progress=fractions.append)
+        assert fractions[0] == 0.1 and len(fractions) > 2
+        assert fractions == sorted(fractions) and fractions[-1] == pytest.approx(1.0)
+
+    def test_threshold_filters(self):
+        """Pairs below the threshold are left out."""
+        result = fuzzy_match(pd.Series(['Meier']), pd.Series(['Mayer']), threshold=0.7)
+        assert result.empty
+
+    def test_composite_key_text(self):
+        """Composite keys are joined into one text."""
+        text = key_text(pd.DataFrame({'a': ['Max', None], 'b': [1, 2]}))
+        assert list(text) == ['Max 1', ' 2']
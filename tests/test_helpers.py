@@ -3,7 +3,8 @@ Tests for utility functions in helpers.py
 """
 import pytest
 import pandas as pd
-from src.csvlotte.utils.helpers import sql_where_to_pandas
+from src.csvlotte.utils.helpers import (sql_where_to_pandas, filter_namespace, to_dates, sample_positions, text_lengths,
+                                       declare_date_columns, declared_date_columns, parse_column_list)
 
 
 class TestSqlWhereToPandas:
@@ -342,5 +343,131 @@ class TestSqlWhereToPandas:
         expected = "@df['user.name'] == 'Bob'"
         assert result == expected
 
+class TestDateColumns:
+    """Test cases for typed date columns and DATE literals."""
+
+    def setup_method(self):
+        """Set up test data for each test method."""
+        self.df = pd.DataFrame({
+            'booked': ['2024-01-15', '2024-03-01', '2023-12-31', None],
+            'created': ['2024-01-15 10:00:00', '2024-01-15T11:30', '2024-02-01 00:00:00', '2024-02-02 08:15:00'],
+            'label': ['a', 'b', 'c', 'd'],
+            'mixed': ['2024-01-01', 'kein Datum', '2024-01-03', '2024-01-04'],
+            'amount': [1, 2, 3, 4]
+        })
+
+    def query(self, expr):
+        """Evaluate a translated filter like the application does."""
+        return self.df.query(expr, engine='python', local_dict=filter_namespace(self.df))
+
+    def test_to_dates_parses_iso_text(self):
+        """ISO text becomes datetime64, values that are no date become NaT."""
+        parsed = to_dates(self.df['mixed'])
+        assert pd.api.types.is_datetime64_any_dtype(parsed)
+        assert pd.isna(parsed.iloc[1]) and not pd.isna(parsed.iloc[0])
+        assert pd.api.types.is_datetime64_any_dtype(to_dates(self.df['created']))
+
+    def test_namespace_parses_each_column_once(self):
+        """A column compared several times in one filter is parsed only once."""
+        to_date = filter_namespace(self.df)['to_date']
+        column = self.df['booked']
+        assert to_date(column) is to_date(column)
+
+    def test_dates_are_parsed_once_per_frame(self):
+        """Later filters and previews on the same frame reuse the parsed column."""
+        from unittest.mock import patch
+        self.query(sql_where_to_pandas("booked >= DATE('2024-01-01')"))
+        with patch('src.csvlotte.utils.helpers.to_dates', side_effect=AssertionError('parsed again')):
+            assert len(self.query(sql_where_to_pandas("booked < DATE('2024-01-01')"))) == 1
+
+    def test_declared_date_columns(self):
+        """Declared columns are parsed at once and compare plain quoted values as dates."""
+        from unittest.mock import patch
+        declare_date_columns(self.df, parse_column_list(' created, booked '))
+        assert declared_date_columns(self.df) == ['created', 'booked']
+        result = sql_where_to_pandas("created >= '15.01.2024 10:30' AND booked BETWEEN '2024-01-01' AND '2024-03-01'",
+                                     date_columns=declared_date_columns(self.df))
+        with patch('src.csvlotte.utils.helpers.to_dates', side_effect=AssertionError('parsed again')):
+            assert list(self.query(result).index) == [1]
+            filtered = self.df.iloc[[1, 2]]
+            declare_date_columns(filtered, ['booked'], parsed_from=self.df)
+        assert declared_date_columns(filtered) == ['booked']
+        with pytest.raises(ValueError):
+            declare_date_columns(self.df, ['missing'])
+
+    def test_date_function_literal(self):
+        """DATE('...') is normalised to an ISO literal and only types the compared column."""
+        result = sql_where_to_pandas("booked >= DATE('2024-01-01')")
+        assert result == "@to_date(booked) >= '2024-01-01'"
+        filtered = self.query(result)
+        assert len(filtered) == 2
+        assert filtered['booked'].dtype == object
+
+    def test_date_keyword_literal_german_notation(self):
+        """DATE '31.12.2023' is read day first."""
+        result = sql_where_to_pandas("booked = DATE '31.12.2023'")
+        assert result == "(@to_date(booked) >= '2023-12-31') & (@to_date(booked) < '2024-01-01')"
+        assert len(self.query(result)) == 1
+
+    def test_date_equality_matches_whole_day(self):
+        """Equality with a day matches every time of that day."""
+        filtered = self.query(sql_where_to_pandas("created = DATE('2024-01-15')"))
+        assert list(filtered.index) == [0, 1]
+
+    def test_date_not_equal(self):
+        """Inequality against a date keeps all other rows."""
+        result = sql_where_to_pandas("booked <> DATE('2024-03-01')")
+        assert result == "~((@to_date(booked) >= '2024-03-01') & (@to_date(booked) < '2024-03-02'))"
+        assert len(self.query(result)) == 3
+
+    def test_date_between(self):
+        """BETWEEN accepts date literals and includes every time of a whole end day."""
+        result = sql_where_to_pandas("created BETWEEN DATE('2024-01-15') AND DATE('2024-02-02')")
+        assert result == "(@to_date(created) >= '2024-01-15') & (@to_date(created) < '2024-02-03')"
+        assert len(self.query(result)) == 4
+        result = sql_where_to_pandas("created BETWEEN DATE('2024-01-15') AND DATE('2024-01-15 11:00')")
+        assert result == "(@to_date(created) >= '2024-01-15') & (@to_date(created) <= '2024-01-15T11:00:00')"
+        assert len(self.query(result)) == 1
+
+    def test_date_literal_with_time(self):
+        """Literals with a time part keep the time."""
+        result = sql_where_to_pandas("created > DATE('2024-01-15 10:30')")
+        assert result == "@to_date(created) > '2024-01-15T10:30:00'"
+        assert len(self.query(result)) == 3
+
+    def test_like_on_date_column_uses_text(self):
+        """Date columns keep their text, so LIKE still works next to DATE comparisons."""
+        result = sql_where_to_pandas("booked LIKE '2024-01%' OR booked = DATE('2023-12-31')")
+        assert list(self.query(result).index) == [0, 2]
+
+    def test_dates_that_are_no_dates_do_not_match(self):
+        """Values that are no date match no date comparison."""
+        assert list(self.query(sql_where_to_pandas("mixed >= DATE('2024-01-01')")).index) == [0, 2, 3]
+
+    def test_invalid_date_literal(self):
+        """Invalid dates raise a ValueError instead of comparing strings."""
+        with pytest.raises(ValueError):
+            sql_where_to_pandas("booked > DATE('kein Datum')")
+
+
+
+class TestColumnWidths:
+    """Test cases for the sampled column width estimation."""
+
+    def test_sample_positions_are_bounded(self):
+        """Large row counts are sampled at head, tail and in between; small ones completely."""
+        positions = sample_positions(1_000_000, sample_rows=90)
+        assert len(positions) == 90 and len(set(positions)) == 90
+        assert list(positions[:30]) == list(range(30))
+        assert list(positions[-30:]) == list(range(999_970, 1_000_000))
+        assert list(sample_positions(1_000_000, sample_rows=90)) == list(positions)
+        assert list(sample_positions(5)) == [0, 1, 2, 3, 4]
+
+    def test_text_lengths_match_displayed_values(self):
+        """Lengths are those of the str() form of every value, per column."""
+        df = pd.DataFrame({'a': [1, 12345, None], 'b': ['x', 'yyyy', 'zz'], 'c': [1.5, 2.25, 3.0]})
+        assert text_lengths(df) == [max(len(str(v)) for v in df[col]) for col in df.columns]
+        assert text_lengths(df.iloc[:0]) == [0, 0, 0]
+
 if __name__ == "__main__":
     pytest.main([__file__])
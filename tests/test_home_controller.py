@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock, call
 import pandas as pd
 from csvlotte.controllers.home_controller import HomeController
+from csvlotte.utils.fuzzy import fuzzy_match
 
 
 
@@ -21,26 +22,12 @@ class TestHomeController:
     ])
     def test_apply_slice_python_syntax(self, input_str, expected):
         # Arrange
-        from csvlotte.controllers.home_controller import HomeController
-        controller = self.controller
+        from csvlotte.utils.compare import parse_slice, slice_keys
         series = pd.Series(["Alice", "Bob", "Charlie"])
         # Act
-        def apply_slice(series, slice_str):
-            if not slice_str:
-                return series
-            try:
-                def do_slice(val):
-                    try:
-                        parts = (slice_str + '::').split(':')[:3]
-                        args = [int(x) if x.strip() else None for x in parts]
-                        return val[slice(*args)]
-                    except Exception:
-                        return val
-                return series.astype(str).apply(do_slice)
-            except Exception:
-                return series
-        # Assert
-        assert list(apply_slice(series, input_str)) == expected
+        result = slice_keys(series, parse_slice(input_str))
+        # Assert
+        assert list(result) == expected
     """Test cases for HomeController."""
     
     def setup_method(self):
@@ -56,6 +43,8 @@ class TestHomeController:
         
         # Import and create controller after patching
         self.controller = HomeController(self.mock_root)
+        # Compares run inline, so their results can be checked right after the call
+        self.controller.run_in_background = False
         
         # Setup mock view attributes
         self._setup_mock_view_attributes()
@@ -78,6 +67,8 @@ class TestHomeController:
         self.mock_view.file2_path = None
         self.mock_view.df1 = None
         self.mock_view.df2 = None
+        self.mock_view.file1_preview_only = False
+        self.mock_view.file2_preview_only = False
         
         # UI components
         self.mock_view.file1_label = Mock()
@@ -87,6 +78,7 @@ class TestHomeController:
         self.mock_view.file1_reload_btn = Mock()
         self.mock_view.file2_reload_btn = Mock()
         self.mock_view.compare_btn = Mock()
+        self.mock_view.out_of_core_btn = Mock()
         self.mock_view.export_btn = Mock()
         self.mock_view.progress = Mock()
         self.mock_view.notebook = Mock()
@@ -107,12 +99,23 @@ class TestHomeController:
         self.mock_view.filter2_var = Mock()
         self.mock_view.col1_text_var = Mock()
         self.mock_view.col2_text_var = Mock()
+        self.mock_view.parallel_var = Mock()
+        self.mock_view.sorted_var = Mock()
+        self.mock_view.multiset_var = Mock()
+        self.mock_view.fuzzy_var = Mock()
+        self.mock_view.summary_var = Mock()
+        self.mock_view.cache_var = Mock()
+        self.mock_view.fuzzy_threshold_var = Mock()
         
         # Methods
         self.mock_view.update_filter_buttons = Mock()
         self.mock_view.open_filter_window = Mock()
         self.mock_view.update_result_table_view = Mock()
         self.mock_view.sync_column_selection = Mock()
+        self.mock_view.update_key_menus = Mock()
+        self.mock_view.get_extra_key_columns = Mock(return_value=[])
+        self.mock_view.get_normalization = Mock(return_value=[])
+        self.mock_view.get_date_columns = Mock(return_value=[])
         
         # Setup default returns for variables
         self.mock_view.delim_var1.get.return_value = ''
@@ -123,10 +126,20 @@ class TestHomeController:
         self.mock_view.filter2_var.get.return_value = ''
         self.mock_view.col1_text_var.get.return_value = ''
         self.mock_view.col2_text_var.get.return_value = ''
+        self.mock_view.parallel_var.get.return_value = False
+        self.mock_view.sorted_var.get.return_value = False
+        self.mock_view.multiset_var.get.return_value = False
+        self.mock_view.fuzzy_var.get.return_value = False
+        self.mock_view.summary_var.get.return_value = False
+        self.mock_view.cache_var.get.return_value = False
+        self.mock_view.fuzzy_threshold_var.get.return_value = '0.85'
         
         # Additional attributes
-        self.mock_view.result_table_labels = ['Label1', 'Label2', 'Label3', 'Label4']
-        self.mock_view._result_dfs = []
+        self.mock_view.result_table_labels = ['Label1', 'Label2', 'Label3', 'Label4', 'Label5', 'Label6', 'Label7', 'Label8', 'Label9']
+        self.mock_view._results = []
+        self.mock_view._lazy_results = {}
+        self.mock_view.file1_fingerprint = None
+        self.mock_view.file2_fingerprint = None
         self.mock_view.root = self.mock_root
 
     # Tests for load_file method
@@ -169,18 +182,50 @@ class TestHomeController:
     @patch('csvlotte.controllers.home_controller.pd.read_csv')
     @patch('csvlotte.controllers.home_controller.messagebox.showerror')
     def test_load_file_csv_read_error(self, mock_messagebox, mock_read_csv, mock_filedialog):
-        """Test handling of CSV reading errors."""
+        """Test that a new file that cannot be read leaves the loaded file, its path and label as they were."""
         # Arrange
         test_path = '/path/to/invalid.csv'
         mock_filedialog.return_value = test_path
         mock_read_csv.side_effect = Exception('File format error')
+        self.mock_view.file1_path = '/path/to/old.csv'
+        self.mock_view.df1 = self.test_df
         
         # Act
         self.controller.load_file(1)
         
         # Assert
         mock_messagebox.assert_called_once_with('Fehler', 'Datei 1 konnte nicht geladen werden:\nFile format error')
-        assert self.mock_view.df1 is None
+        assert self.mock_view.df1 is self.test_df
+        assert self.mock_view.file1_path == '/path/to/old.csv'
+        self.mock_view.file1_label.config.assert_not_called()
+
+    @patch('csvlotte.controllers.home_controller.filedialog.askopenfilename')
+    @patch('csvlotte.controllers.home_controller.pd.read_csv')
+    def test_load_file_cancelled(self, mock_read_csv, mock_filedialog):
+        """Test that a cancelled load keeps the path, label, data and fingerprint of the loaded file."""
+        # Arrange
+        mock_filedialog.return_value = '/path/to/new.csv'
+        self.mock_view.file1_path = '/path/to/old.csv'
+        self.mock_view.df1 = self.test_df
+        self.mock_view.file1_fingerprint = ('old',)
+
+        def cancel_while_reading(*args, **kwargs):
+            self.controller.cancel_task()
+            return pd.DataFrame({'id': [1]})
+
+        mock_read_csv.side_effect = cancel_while_reading
+
+        # Act
+        with patch('csvlotte.controllers.home_controller.file_fingerprint', return_value=('new',)):
+            self.controller.load_file(1)
+
+        # Assert
+        self.mock_view.show_cancelled.assert_called_once()
+        assert self.mock_view.file1_path == '/path/to/old.csv'
+        assert self.mock_view.df1 is self.test_df
+        assert self.mock_view.file1_fingerprint == ('old',)
+        self.mock_view.file1_label.config.assert_not_called()
+        assert self.controller.task is None
 
     @patch('csvlotte.controllers.home_controller.filedialog.askopenfilename')
     @patch('csvlotte.controllers.home_controller.pd.read_csv')
@@ -216,6 +261,24 @@ class TestHomeController:
         # Check that DataFrame was filtered correctly
         assert len(self.mock_view.df1) == 2  # Bob and Charlie (age > 25)
 
+    @patch('csvlotte.controllers.home_controller.filedialog.askopenfilename')
+    @patch('csvlotte.controllers.home_controller.pd.read_csv')
+    def test_load_file_with_declared_date_columns(self, mock_read_csv, mock_filedialog):
+        """Declared date columns are parsed once at load and compared as dates by the filter."""
+        from csvlotte.utils.helpers import declared_date_columns, to_dates
+        mock_filedialog.return_value = '/path/to/test.csv'
+        mock_read_csv.return_value = pd.DataFrame({'joined': ['2024-01-31 08:00', '2023-12-01', '2024-02-01']})
+        self.mock_view.get_date_columns.return_value = ['joined']
+        self.mock_view.filter1_var.get.return_value = "joined BETWEEN '01.12.2023' AND '31.01.2024'"
+
+        with patch('csvlotte.utils.helpers.to_dates', wraps=to_dates) as mock_parse:
+            self.controller.load_file(1)
+
+        assert list(self.mock_view.df1.index) == [0, 1]
+        assert self.mock_view.df1['joined'].dtype == object
+        assert declared_date_columns(self.mock_view.df1) == ['joined']
+        mock_parse.assert_called_once()
+
     @patch('csvlotte.controllers.home_controller.filedialog.askopenfilename')
     @patch('csvlotte.controllers.home_controller.pd.read_csv')
     @patch('csvlotte.controllers.home_controller.messagebox.showerror')
@@ -236,6 +299,45 @@ class TestHomeController:
         assert args[0] == 'Fehler'
         assert 'Filter für Datei 1 ungültig:' in args[1]
 
+    @patch('csvlotte.controllers.home_controller.os.path.getsize')
+    @patch('csvlotte.controllers.home_controller.filedialog.askopenfilename')
+    @patch('csvlotte.controllers.home_controller.pd.read_csv')
+    def test_load_large_file_preview_only(self, mock_read_csv, mock_filedialog, mock_getsize):
+        """Test that files above the size limit are only previewed."""
+        # Arrange
+        from csvlotte.controllers.home_controller import LARGE_FILE_BYTES, PREVIEW_ROWS
+        test_path = '/path/to/huge.csv'
+        mock_filedialog.return_value = test_path
+        mock_getsize.return_value = LARGE_FILE_BYTES + 1
+        mock_read_csv.return_value = self.test_df.copy()
+        
+        # Act
+        self.controller.load_file(2)
+        
+        # Assert
+        mock_read_csv.assert_called_once_with(test_path, sep=';', encoding='latin1', nrows=PREVIEW_ROWS)
+        assert self.mock_view.file2_preview_only is True
+
+    @patch('csvlotte.controllers.home_controller.LOAD_CHUNK_ROWS', 2)
+    @patch('csvlotte.controllers.home_controller.LOAD_PROGRESS_BYTES', 0)
+    @patch('csvlotte.controllers.home_controller.filedialog.askopenfilename')
+    def test_load_file_reports_progress(self, mock_filedialog, tmp_path):
+        """Test that larger files are read in chunks and the bytes read are shown as progress."""
+        # Arrange
+        path = tmp_path / 'a.csv'
+        path.write_text('id;name\n1;a\n2;b\n3;c\n4;d\n5;e\n', encoding='latin1')
+        mock_filedialog.return_value = str(path)
+
+        # Act
+        self.controller.load_file(1)
+
+        # Assert
+        assert list(self.mock_view.df1['id']) == [1, 2, 3, 4, 5]
+        states = [call.args[0] for call in self.mock_view.show_progress.call_args_list]
+        assert states[0].stage == 'load' and states[0].unit == 'bytes'
+        assert states[0].total == path.stat().st_size
+        assert states[-1].fraction == 1.0
+
     # Tests for reload_file method
     @patch('csvlotte.controllers.home_controller.pd.read_csv')
     @patch('csvlotte.controllers.home_controller.messagebox.showerror')
@@ -402,10 +504,526 @@ class TestHomeController:
         self.controller.compare_csvs()
         
         # Assert
-        assert len(self.mock_view._result_dfs) == 4
+        assert len(self.mock_view._results) == 9
         self.mock_view.export_btn.config.assert_called_with(state='normal')
         self.mock_view.update_result_table_view.assert_called_once()
 
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_cancelled(self, mock_style):
+        """Test that a cancelled compare keeps the shown results and re-enables the compare buttons."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'name': ['Alice', 'Bob']})
+        self.mock_view.df2 = pd.DataFrame({'name': ['Bob']})
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        shown = [Mock()]
+        self.mock_view._results = shown
+        compare_partitions = self.controller._compare_partitions
+
+        def cancel_while_comparing(*args):
+            self.controller.cancel_task()
+            return compare_partitions(*args)
+
+        # Act
+        with patch.object(self.controller, '_compare_partitions', side_effect=cancel_while_comparing):
+            self.controller.compare_csvs()
+
+        # Assert
+        self.mock_view.show_cancelled.assert_called_once()
+        assert self.mock_view._results is shown
+        self.mock_view.update_result_table_view.assert_not_called()
+        assert self.controller.task is None
+        self.mock_view.cancel_btn.config.assert_called_with(state='disabled')
+        self.mock_view.compare_btn.config.assert_called_with(state='normal')
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_cancelled_inside_compare(self, mock_style):
+        """Test that a cancel during the compare stops between its steps, before the keys are hashed."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'name': ['Bob', 'Alice']})
+        self.mock_view.df2 = pd.DataFrame({'name': ['Bob']})
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+
+        def cancel_while_checking(*args):
+            self.controller.cancel_task()
+            return False
+
+        # Act
+        with patch('csvlotte.controllers.home_controller.keys_are_sorted', side_effect=cancel_while_checking), \
+                patch('csvlotte.controllers.home_controller.cached_compare_keys') as mock_compare:
+            self.controller.compare_csvs()
+
+        # Assert
+        mock_compare.assert_not_called()
+        self.mock_view.show_cancelled.assert_called_once()
+        assert self.controller.task is None
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_reports_stages(self, mock_style):
+        """Test that a compare passes its stages and row counts on to the view, ending complete."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'name': ['Alice', 'Bob', 'Charlie']})
+        self.mock_view.df2 = pd.DataFrame({'name': ['Bob', 'David']})
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+
+        # Act
+        self.controller.compare_csvs()
+
+        # Assert
+        states = [call.args[0] for call in self.mock_view.show_progress.call_args_list]
+        assert [state.stage for state in states[:2]] == ['keys', 'compare']
+        assert states[0].total == 5
+        fractions = [state.fraction for state in states]
+        assert fractions == sorted(fractions) and fractions[-1] == 1.0
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_changed_rows(self, mock_style):
+        """Test that matched rows with differing values fill the changed-rows tab."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'name': ['Alice', 'Bob', 'Charlie'], 'age': [25, 30, 35]})
+        self.mock_view.df2 = pd.DataFrame({'name': ['Bob', 'Charlie'], 'age': [31, 35]})
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        changed = self.mock_view._results[4].frame()
+        assert list(changed['name']) == ['Bob']
+        assert list(changed['age (2)']) == [31]
+        self.mock_view.notebook.tab.assert_any_call(4, text='Label5 (1)', state='normal')
+        mismatches = self.mock_view.show_diff_summary.call_args[0][0]
+        assert mismatches.to_dict() == {'age': 1}
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_multiset(self, mock_style):
+        """Test that the duplicate-aware mode pairs occurrences and fills the duplicate tabs."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'name': ['Bob', 'Alice', 'Bob', 'Bob']})
+        self.mock_view.df2 = pd.DataFrame({'name': ['Bob', 'Alice', 'Alice']})
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.multiset_var.get.return_value = True
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        only1, common1, common2, only2, changed, counts, dup1, dup2, fuzzy = self.mock_view._results
+        assert list(only1.positions) == [2, 3]
+        assert list(common1.positions) == [0, 1]
+        assert list(only2.positions) == [2]
+        assert counts.frame().values.tolist() == [['Bob', 3, 1, 2], ['Alice', 1, 2, -1]]
+        assert list(dup1.positions) == [0, 2, 3]
+        assert list(dup2.positions) == [1, 2]
+        self.mock_view.notebook.tab.assert_any_call(6, text='Label7 (3)', state='normal')
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_duplicate_tabs_disabled(self, mock_style):
+        """Test that the duplicate-aware tabs stay disabled in the normal compare."""
+        # Arrange
+        self.mock_view.df1 = self.test_df.copy()
+        self.mock_view.df2 = self.test_df.copy()
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        assert self.mock_view._results[5:] == [None, None, None, None]
+        self.mock_view.notebook.tab.assert_any_call(5, text='Label6', state='disabled')
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_normalized_keys(self, mock_style):
+        """Test that normalised keys match and are reused by a repeated compare."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'id': ['00123', 'ABC ', '7']})
+        self.mock_view.df2 = pd.DataFrame({'id': [123.0, 'abc', 8]})
+        self.mock_view.column_combo1.get.return_value = 'id'
+        self.mock_view.column_combo2.get.return_value = 'id'
+        self.mock_view.get_normalization.return_value = ['strip', 'casefold', 'numbers']
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        
+        # Act
+        self.controller.compare_csvs()
+        with patch('csvlotte.utils.normalize.normalize_keys') as mock_normalize:
+            self.controller.compare_csvs()
+        
+        # Assert
+        only1, common1, common2, only2 = self.mock_view._results[:4]
+        assert list(common1.positions) == [0, 1]
+        assert list(only1.positions) == [2]
+        assert list(only2.positions) == [2]
+        mock_normalize.assert_not_called()
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_fuzzy(self, mock_style):
+        """Test that the fuzzy mode lists probable matches of the unmatched keys."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'name': ['Anna Schmidt', 'Bob', 'Carla Meyer']})
+        self.mock_view.df2 = pd.DataFrame({'name': ['Bob', 'Anna Schmitt', 'Dora']})
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.fuzzy_var.get.return_value = True
+        self.mock_view.fuzzy_threshold_var.get.return_value = '0,8'
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        matches = self.mock_view._results[8].frame()
+        assert matches.values.tolist() == [['Anna Schmidt', 'Anna Schmitt', 0.917]]
+        self.mock_view.notebook.tab.assert_any_call(8, text='Label9 (1)', state='normal')
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_fuzzy_deferred_in_summary_mode(self, mock_style):
+        """Test that the summary mode only scores the probable matches when their tab is opened."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'name': ['Anna Schmidt', 'Bob']})
+        self.mock_view.df2 = pd.DataFrame({'name': ['Bob', 'Anna Schmitt']})
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.fuzzy_var.get.return_value = True
+        self.mock_view.fuzzy_threshold_var.get.return_value = '0.8'
+        self.mock_view.summary_var.get.return_value = True
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+
+        # Act
+        with patch('csvlotte.controllers.home_controller.fuzzy_match', wraps=fuzzy_match) as mock_fuzzy:
+            self.controller.compare_csvs()
+            mock_fuzzy.assert_not_called()
+            self.mock_view.notebook.tab.assert_any_call(8, text='Label9 (?)', state='normal')
+            self.controller.materialize_result(8)
+
+        # Assert
+        mock_fuzzy.assert_called_once()
+        assert self.mock_view._results[8].frame()['Ähnlichkeit'].tolist() == [0.917]
+
+    @patch('csvlotte.controllers.home_controller.messagebox.showerror')
+    def test_compare_csvs_fuzzy_invalid_threshold(self, mock_showerror):
+        """Test that an invalid similarity threshold is reported before comparing."""
+        # Arrange
+        self.mock_view.df1 = self.test_df.copy()
+        self.mock_view.df2 = self.test_df.copy()
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.fuzzy_var.get.return_value = True
+        self.mock_view.fuzzy_threshold_var.get.return_value = 'abc'
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        mock_showerror.assert_called_once_with('Fehler', 'Die Ähnlichkeitsschwelle muss zwischen 0 und 1 liegen!')
+        self.mock_view.update_result_table_view.assert_not_called()
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_summary_mode(self, mock_style):
+        """Test that the summary mode shows counts and samples and builds rows on demand."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'name': [f'n{i}' for i in range(300)]})
+        self.mock_view.df2 = pd.DataFrame({'name': [f'n{i}' for i in range(150, 400)]})
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.summary_var.get.return_value = True
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        
+        # Act
+        with patch('csvlotte.controllers.home_controller.diff_rows') as mock_diff:
+            self.controller.compare_csvs()
+            mock_diff.assert_not_called()
+        
+        # Assert
+        assert len(self.mock_view._results[0]) == 100
+        assert self.mock_view._results[4] is None
+        self.mock_view.notebook.tab.assert_any_call(0, text='Label1 (150)', state='normal')
+        self.mock_view.notebook.tab.assert_any_call(4, text='Label5 (?)', state='normal')
+        assert call(1) not in self.mock_view.notebook.select.call_args_list
+        
+        self.mock_view.update_result_table_view.reset_mock()
+        self.controller.materialize_result(0)
+        assert len(self.mock_view._results[0]) == 150
+        self.mock_view._render_result_table.assert_called_once_with(0)
+        self.mock_view.update_result_table_view.assert_not_called()
+        assert 0 not in self.mock_view._lazy_results
+        self.controller.materialize_result(4)
+        assert self.mock_view._results[4].empty
+        self.mock_view.notebook.tab.assert_any_call(4, text='Label5 (0)', state='normal')
+
+    def test_materialize_result_cancelled(self):
+        """A cancelled build of a deferred result keeps it deferred and shows the cancel."""
+        from csvlotte.utils.result import LazyResult
+
+        def build(progress):
+            self.controller.cancel_task()
+            progress(0.5)
+
+        self.mock_view._lazy_results = {4: LazyResult(build)}
+        self.mock_view._results = [None] * 5
+
+        self.controller.materialize_result(4)
+
+        assert 4 in self.mock_view._lazy_results and self.mock_view._results[4] is None
+        self.mock_view.show_cancelled.assert_called_once()
+        assert self.controller.task is None
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_composite_key(self, mock_style):
+        """Test comparison on a composite key of two columns."""
+        # Arrange
+        df1 = pd.DataFrame({'account': [1, 1, 2], 'currency': ['EUR', 'USD', 'EUR']})
+        df2 = pd.DataFrame({'konto': [1, 2, 2], 'waehrung': ['USD', 'EUR', 'CHF']})
+        self.mock_view.df1 = df1
+        self.mock_view.df2 = df2
+        self.mock_view.column_combo1.get.return_value = 'account'
+        self.mock_view.column_combo2.get.return_value = 'konto'
+        self.mock_view.get_extra_key_columns.side_effect = lambda n: ['currency'] if n == 1 else ['waehrung']
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        only1, common1, common2, only2 = self.mock_view._results[:4]
+        assert list(only1.positions) == [0]
+        assert list(common1.positions) == [1, 2]
+        assert list(common2.positions) == [0, 1]
+        assert list(only2.positions) == [2]
+
+    @patch('csvlotte.controllers.home_controller.parallel_compare_keys')
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_parallel(self, mock_style, mock_parallel):
+        """Test that the parallel option uses the process pool compare."""
+        # Arrange
+        import numpy as np
+        self.mock_view.df1 = self.test_df.copy()
+        self.mock_view.df2 = self.test_df.copy()
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.parallel_var.get.return_value = True
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        empty = np.array([], dtype=np.int64)
+        mock_parallel.return_value = (empty, np.arange(3), np.arange(3), empty)
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        mock_parallel.assert_called_once()
+        assert len(self.mock_view._results[1]) == 3
+
+    @patch('csvlotte.controllers.home_controller.messagebox.showerror')
+    def test_compare_csvs_key_count_mismatch(self, mock_showerror):
+        """Test that composite keys need the same number of columns on both sides."""
+        # Arrange
+        self.mock_view.df1 = self.test_df.copy()
+        self.mock_view.df2 = self.test_df.copy()
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.get_extra_key_columns.side_effect = lambda n: ['age'] if n == 1 else []
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        mock_showerror.assert_called_once_with('Fehler', 'Bitte für beide Dateien gleich viele weitere Schlüsselspalten auswählen!')
+
+    def test_compare_csvs_preview_redirects_out_of_core(self):
+        """Test that previewed large files are compared out-of-core."""
+        # Arrange
+        self.mock_view.df1 = self.test_df.copy()
+        self.mock_view.df2 = self.test_df.copy()
+        self.mock_view.file1_preview_only = True
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        
+        # Act
+        with patch.object(self.controller, 'compare_csvs_out_of_core') as mock_out_of_core:
+            self.controller.compare_csvs()
+        
+        # Assert
+        mock_out_of_core.assert_called_once()
+        self.mock_view.update_result_table_view.assert_not_called()
+
+    @patch('csvlotte.controllers.home_controller.messagebox.showinfo')
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    @patch('csvlotte.controllers.home_controller.filedialog.askdirectory')
+    def test_compare_csvs_out_of_core(self, mock_askdirectory, mock_style, mock_showinfo, tmp_path):
+        """Test out-of-core compare writes the four result files."""
+        # Arrange
+        path1 = tmp_path / 'a.csv'
+        path2 = tmp_path / 'b.csv'
+        pd.DataFrame({'name': ['Alice', 'Bob', 'Charlie']}).to_csv(path1, sep=';', index=False)
+        pd.DataFrame({'name': ['Bob', 'David']}).to_csv(path2, sep=';', index=False)
+        self.mock_view.file1_path = str(path1)
+        self.mock_view.file2_path = str(path2)
+        self.mock_view.df1 = pd.read_csv(path1, sep=';')
+        self.mock_view.df2 = pd.read_csv(path2, sep=';')
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        out_dir = tmp_path / 'out'
+        out_dir.mkdir()
+        mock_askdirectory.return_value = str(out_dir)
+        
+        # Act
+        self.controller.compare_csvs_out_of_core()
+        
+        # Assert
+        assert sorted(p.name for p in out_dir.iterdir()) == ['Label1.csv', 'Label2.csv', 'Label3.csv', 'Label4.csv']
+        assert sorted(pd.read_csv(out_dir / 'Label1.csv', sep=';')['name']) == ['Alice', 'Charlie']
+        assert list(pd.read_csv(out_dir / 'Label4.csv', sep=';')['name']) == ['David']
+        mock_showinfo.assert_called_once()
+
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_result_cache(self, mock_style, tmp_path):
+        """Test that an unchanged compare reuses the stored partitions, also from disk in a new session."""
+        # Arrange
+        from csvlotte.utils.result_cache import ResultCache
+        self.mock_view.df1 = pd.DataFrame({'name': ['Charlie', 'Alice', 'Bob']})
+        self.mock_view.df2 = pd.DataFrame({'name': ['David', 'Bob']})
+        self.mock_view.file1_fingerprint = ('/data/a.csv', 30, 1, ';', 'latin1')
+        self.mock_view.file2_fingerprint = ('/data/b.csv', 20, 1, ';', 'latin1')
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.cache_var.get.return_value = True
+        self.mock_view.col1_text_var.get.return_value = '0:'
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        self.controller.result_cache = ResultCache(cache_dir=str(tmp_path))
+        
+        # Act
+        self.controller.compare_csvs()
+        from csvlotte.utils.incremental_compare import cached_compare_keys
+        with patch('csvlotte.controllers.home_controller.cached_compare_keys', wraps=cached_compare_keys) as mock_compare_keys:
+            self.controller.compare_csvs()
+            self.controller.result_cache = ResultCache(cache_dir=str(tmp_path))
+            self.controller.compare_csvs()
+            mock_compare_keys.assert_not_called()
+            # Filtering again with the same text and row count still selects other rows
+            df1 = self.mock_view.df1
+            self.mock_view.filter1_var.get.return_value = "name != 'Bob'"
+            self.mock_view.df1 = df1[df1['name'] != 'Alice']
+            self.controller.compare_csvs()
+            self.mock_view.df1 = df1[df1['name'] != 'Bob']
+            self.controller.compare_csvs()
+            assert mock_compare_keys.call_count == 2
+        
+        # Assert
+        assert len(list(tmp_path.iterdir())) == 3
+        assert len(self.mock_view._results[1]) == 0
+
+    @patch('csvlotte.controllers.home_controller.cached_compare_keys')
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_asymmetric(self, mock_style, mock_compare_keys):
+        """Test that a short list against a much larger file only hashes the short side."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'id': ['K7', 'X1']})
+        self.mock_view.df2 = pd.DataFrame({'id': [f'K{i}' for i in range(200, 0, -1)]})
+        self.mock_view.column_combo1.get.return_value = 'id'
+        self.mock_view.column_combo2.get.return_value = 'id'
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        mock_compare_keys.assert_not_called()
+        only1, common1, common2, only2 = self.mock_view._results[:4]
+        assert list(only1.positions) == [1]
+        assert list(common2.column('id')) == ['K7']
+        assert len(only2) == 199
+
+    @patch('csvlotte.controllers.home_controller.cached_compare_keys')
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    def test_compare_csvs_sorted_keys_use_merge(self, mock_style, mock_compare_keys):
+        """Test that keys sorted on both sides are compared by merging instead of hashing."""
+        # Arrange
+        self.mock_view.df1 = pd.DataFrame({'id': [1, 2, 4, 7]})
+        self.mock_view.df2 = pd.DataFrame({'id': [2, 3, 7]})
+        self.mock_view.column_combo1.get.return_value = 'id'
+        self.mock_view.column_combo2.get.return_value = 'id'
+        self.mock_view.notebook.select.return_value = 'tab1'
+        self.mock_view.notebook.index.return_value = 0
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        mock_compare_keys.assert_not_called()
+        only1, common1, common2, only2 = self.mock_view._results[:4]
+        assert list(only1.column('id')) == [1, 4]
+        assert list(common2.column('id')) == [2, 7]
+        assert list(only2.column('id')) == [3]
+
+    @patch('csvlotte.controllers.home_controller.messagebox.askyesno', return_value=True)
+    @patch('csvlotte.controllers.home_controller.messagebox.showinfo')
+    @patch('csvlotte.controllers.home_controller.ttk.Style')
+    @patch('csvlotte.controllers.home_controller.filedialog.askdirectory')
+    def test_compare_csvs_out_of_core_sorted(self, mock_askdirectory, mock_style, mock_showinfo, mock_askyesno, tmp_path):
+        """Test that the sorted option merges the files and offers to sort unsorted input."""
+        # Arrange
+        path1 = tmp_path / 'a.csv'
+        path2 = tmp_path / 'b.csv'
+        pd.DataFrame({'name': ['Charlie', 'Alice', 'Bob']}).to_csv(path1, sep=';', index=False)
+        pd.DataFrame({'name': ['Bob', 'David']}).to_csv(path2, sep=';', index=False)
+        self.mock_view.file1_path = str(path1)
+        self.mock_view.file2_path = str(path2)
+        self.mock_view.df1 = pd.read_csv(path1, sep=';')
+        self.mock_view.df2 = pd.read_csv(path2, sep=';')
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.sorted_var.get.return_value = True
+        out_dir = tmp_path / 'out'
+        out_dir.mkdir()
+        mock_askdirectory.return_value = str(out_dir)
+        
+        # Act
+        self.controller.compare_csvs_out_of_core()
+        
+        # Assert
+        mock_askyesno.assert_called_once()
+        assert list(pd.read_csv(out_dir / 'Label1.csv', sep=';')['name']) == ['Alice', 'Charlie']
+        assert list(pd.read_csv(out_dir / 'Label2.csv', sep=';')['name']) == ['Bob']
+        mock_showinfo.assert_called_once()
+
+    @patch('csvlotte.controllers.home_controller.messagebox.showerror')
+    def test_compare_csvs_invalid_slice(self, mock_showerror):
+        """Test that an invalid slice spec is reported before comparing."""
+        # Arrange
+        self.mock_view.df1 = self.test_df.copy()
+        self.mock_view.df2 = self.test_df.copy()
+        self.mock_view.column_combo1.get.return_value = 'name'
+        self.mock_view.column_combo2.get.return_value = 'name'
+        self.mock_view.col2_text_var.get.return_value = '1:x'
+        
+        # Act
+        self.controller.compare_csvs()
+        
+        # Assert
+        mock_showerror.assert_called_once()
+        assert 'Slice für Datei 2 ungültig' in mock_showerror.call_args[0][1]
+        self.mock_view.update_result_table_view.assert_not_called()
+
     # Tests for export_results_button method
     @patch('csvlotte.controllers.compare_export_controller.CompareExportController')
     def test_export_results_button(self, mock_export_controller):
@@ -413,7 +1031,7 @@ class TestHomeController:
         # Arrange
         self.mock_view.notebook.select.return_value = 'tab1'
         self.mock_view.notebook.index.return_value = 1
-        self.mock_view._result_dfs = [Mock(), Mock(), Mock(), Mock()]
+        self.mock_view._results = [Mock(), Mock(), Mock(), Mock()]
         self.mock_view.file1_path = '/path/to/file1.csv'
         mock_controller_instance = Mock()
         mock_export_controller.return_value = mock_controller_instance
@@ -431,7 +1049,7 @@ class TestHomeController:
         # Arrange
         self.mock_view.notebook.select.return_value = 'tab1'
         self.mock_view.notebook.index.return_value = 1
-        self.mock_view._result_dfs = [Mock(), Mock(), Mock(), Mock()]
+        self.mock_view._results = [Mock(), Mock(), Mock(), Mock()]
         delattr(self.mock_view, 'file1_path')  # Remove file1_path attribute
         mock_controller_instance = Mock()
         mock_export_controller.return_value = mock_controller_instance
@@ -445,6 +1063,38 @@ class TestHomeController:
         call_args = mock_export_controller.call_args[0]
         assert call_args[4] is None  # default_dir should be None
 
+    def test_export_builds_only_the_exported_lazy_result(self, tmp_path):
+        """Deferred results of the summary mode are only built for the tab that is exported."""
+        from csvlotte.controllers.compare_export_controller import CompareExportController
+        from csvlotte.utils.result import LazyResult, RowsResult
+        build_changed = Mock(return_value=RowsResult(pd.DataFrame({'id': [1, 2]})))
+        build_other = Mock(return_value=RowsResult(pd.DataFrame({'id': [3]})))
+        lazy = {0: LazyResult(build_other), 4: LazyResult(build_changed)}
+        controller = CompareExportController(None, [None] * 5, ['L'] * 5, 4, lazy_results=lazy)
+        path = str(tmp_path / 'changed.csv')
+        outcome = []
+        controller.export_result(4, [], path, on_finished=lambda *args: outcome.append(args))
+        assert outcome == [(True, None)]
+        assert pd.read_csv(path, sep=';')['id'].tolist() == [1, 2]
+        build_changed.assert_called_once()
+        build_other.assert_not_called()
+
+    @patch('csvlotte.controllers.compare_export_controller.CompareExportView')
+    def test_export_dialog_builds_unbuilt_lazy_result(self, mock_view_class, tmp_path):
+        """The dialog lists the columns of a deferred result that was not built yet."""
+        from csvlotte.controllers.compare_export_controller import CompareExportController
+        from csvlotte.utils.result import LazyResult, RowsResult
+        build = Mock(return_value=RowsResult(pd.DataFrame({'id': [1], 'Geänderte Spalten': ['name']})))
+        lazy = {4: LazyResult(build)}
+        controller = CompareExportController(None, [None] * 5, ['L'] * 5, 4, lazy_results=lazy)
+        controller.open_export_dialog()
+        build.assert_called_once()
+        results = mock_view_class.call_args[0][2]
+        assert list(results[4].columns) == ['id', 'Geänderte Spalten']
+        # The export reuses the built result
+        controller.export_result(4, [], str(tmp_path / 'changed.csv'))
+        build.assert_called_once()
+
     # Tests for update_columns method
     def test_update_columns_both_dataframes(self):
         """Test updating columns when both DataFrames are loaded."""
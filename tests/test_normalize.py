@@ -0,0 +1,78 @@
+"""
+Tests for the key normalisation in normalize.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from csvlotte.utils.normalize import KeyCache, normalize_keys
+
+
+class TestNormalizeKeys:
+    """Test cases for normalize_keys."""
+
+    def test_no_transforms_keeps_column(self):
+        """Without transforms the column is returned unchanged."""
+        series = pd.Series([1, 2])
+        assert normalize_keys(series, []) is series
+
+    def test_strip_and_casefold(self):
+        """Whitespace and case differences disappear."""
+        result = normalize_keys(pd.Series(['ABC ', ' abc', 'Straße']), ['strip', 'casefold'])
+        assert list(result) == ['abc', 'abc', 'strasse']
+
+    def test_leading_zeros(self):
+        """Leading zeros are removed, a single zero and decimals stay intact."""
+        result = normalize_keys(pd.Series(['00123', '000', '0.5', '00A1']), ['leading_zeros'])
+        assert list(result) == ['123', '0', '0.5', 'A1']
+
+    @pytest.mark.parametrize("raw,expected", [
+        ('00123', '123'), (123, '123'), (1.0, '1'), ('+7.50', '7.5'), ('1,0', '1'),
+        ('-0', '0'), ('.5', '0.5'), ('12345678901234567890', '12345678901234567890'), ('A-1', 'A-1'),
+    ])
+    def test_numbers(self, raw, expected):
+        """Numbers are rewritten in one canonical text form without losing digits."""
+        assert normalize_keys(pd.Series([raw], dtype=object), ['numbers']).iloc[0] == expected
+
+    def test_nfkc(self):
+        """Compatibility characters such as full-width digits are unified."""
+        assert normalize_keys(pd.Series(['１２３']), ['nfkc']).iloc[0] == '123'
+
+    def test_missing_values_stay_missing(self):
+        """Missing keys are not turned into text."""
+        result = normalize_keys(pd.Series(['a', np.nan]), ['strip'])
+        assert pd.isna(result.iloc[1])
+
+    def test_unknown_transform(self):
+        """Unknown transform names are rejected."""
+        with pytest.raises(ValueError):
+            normalize_keys(pd.Series(['a']), ['upper'])
+
+
+class TestKeyCache:
+    """Test cases for KeyCache."""
+
+    def test_reuses_prepared_keys(self):
+        """A repeated request with the same settings is served from the cache."""
+        cache = KeyCache()
+        df = pd.DataFrame({'id': [' A1', 'b2 ']})
+        first = cache.get(df, 'id', slice(1, None), ['strip'])
+        assert cache.get(df, 'id', slice(1, None), ['strip']) is first
+        assert cache.get(df, 'id', slice(1, None), ['strip', 'casefold']) is not first
+        assert list(first) == ['A1', '2']
+
+    def test_new_frame_misses(self):
+        """A reloaded file is a new DataFrame and is prepared again."""
+        cache = KeyCache()
+        df = pd.DataFrame({'id': ['a']})
+        first = cache.get(df, 'id')
+        reloaded = pd.DataFrame({'id': ['b']})
+        assert list(cache.get(reloaded, 'id')) == ['b']
+        assert cache.get(df, 'id') is first
+
+    def test_evicts_least_recently_used(self):
+        """The cache holds at most max_entries key columns."""
+        cache = KeyCache(max_entries=2)
+        frames = [pd.DataFrame({'id': [i]}) for i in range(3)]
+        for df in frames:
+            cache.get(df, 'id', transforms=['numbers'])
+        assert len(cache._entries) == 2
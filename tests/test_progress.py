@@ -0,0 +1,62 @@
+"""
+Tests for the progress reporting in progress.py
+"""
+import pytest
+from csvlotte.utils.progress import ProgressReporter, format_amount, format_duration
+
+
+class FakeClock:
+    """Clock that only advances when told to."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestProgressReporter:
+    """Test cases for ProgressReporter and its formatting helpers."""
+
+    def test_stage_weights_rate_and_eta(self):
+        """Progress within a stage is scaled by its weight; throughput and ETA follow the elapsed time."""
+        clock = FakeClock()
+        states = []
+        reporter = ProgressReporter(states.append, [('load', 1), ('compare', 3)], interval=0, clock=clock)
+        reporter.start('load', total=1000)
+        clock.now = 2.0
+        reporter.update(500)
+        state = states[-1]
+        assert state.fraction == pytest.approx(0.125)
+        assert state.rate == pytest.approx(250.0)
+        assert state.eta == pytest.approx(14.0)
+        reporter.start('compare')
+        reporter.set_fraction(0.5)
+        assert states[-1].fraction == pytest.approx(0.625)
+        assert states[-1].rate is None
+        reporter.finish()
+        assert states[-1].fraction == 1.0 and states[-1].eta == 0.0
+        with pytest.raises(ValueError):
+            reporter.start('export')
+
+    def test_updates_are_throttled(self):
+        """Frequent updates are dropped within the interval, stage changes and finish are not."""
+        clock = FakeClock()
+        states = []
+        reporter = ProgressReporter(states.append, [('compare', 1)], interval=1.0, clock=clock)
+        reporter.start('compare', total=100)
+        for done in range(1, 51):
+            reporter.advance(1)
+        assert len(states) == 1
+        clock.now = 1.5
+        reporter.advance(1)
+        assert len(states) == 2 and states[-1].done == 51
+        reporter.finish()
+        assert len(states) == 3 and states[-1].done == 100
+
+    def test_formatting(self):
+        """Durations read as m:ss or h:mm:ss, bytes in MB and rows with separators."""
+        assert format_duration(75) == '1:15'
+        assert format_duration(3725) == '1:02:05'
+        assert format_amount(3 * 1024 ** 2, 'bytes') == '3.0 MB'
+        assert format_amount(1234567, 'rows') == '1,234,567'
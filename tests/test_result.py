@@ -0,0 +1,100 @@
+"""
+Tests for the compare results in result.py
+"""
+import numpy as np
+import pandas as pd
+from unittest.mock import Mock, patch
+from csvlotte.utils.result import LazyResult, RowsResult
+
+
+class TestRowsResult:
+    """Test cases for RowsResult."""
+
+    def test_stores_positions_only(self):
+        """A result keeps int32 positions into the file and builds rows on request."""
+        df = pd.DataFrame({'a': range(10), 'b': list('abcdefghij')})
+        result = RowsResult(df, np.array([7, 2, 5], dtype=np.int64))
+        assert result.positions.dtype == np.int32 and result.df is df
+        assert len(result) == 3 and not result.empty
+        assert list(result.page(1, 3)['b']) == ['c', 'f']
+        assert list(result.head(2).column('a')) == [7, 2]
+        assert list(result.take(np.array([0, 2]))['a']) == [7, 5]
+
+    def test_sorted_reorders_positions(self):
+        """Sorting is stable, puts missing values last and leaves the original result untouched."""
+        df = pd.DataFrame({'a': [3.0, np.nan, 1.0, 3.0]})
+        result = RowsResult(df)
+        assert list(result.sorted('a').positions) == [2, 0, 3, 1]
+        assert list(result.sorted('a', ascending=False).positions) == [0, 3, 2, 1]
+        assert list(result.positions) == [0, 1, 2, 3]
+
+    def test_sort_order_is_computed_once(self):
+        """The permutation of a column and direction is kept and reused by later sorts."""
+        df = pd.DataFrame({'a': [3, 1, 2]})
+        result = RowsResult(df, np.array([0, 1, 2]))
+        order = result.sort_order('a')
+        assert list(order) == [1, 2, 0]
+        assert result.sort_order('a') is order
+        assert result.sort_order('a', ascending=False) is not order
+        with patch.object(RowsResult, 'column', side_effect=AssertionError('sorted again')):
+            sorted_result = result.sorted('a')
+        assert list(sorted_result.column('a')) == [1, 2, 3]
+
+    def test_find_uses_index_then_substring(self):
+        """Exact values are found via a kept index, other texts as substrings; hits are result rows."""
+        df = pd.DataFrame({'key': ['A1', 'b2', 'A1', 'x12', 7]})
+        result = RowsResult(df, np.array([4, 2, 1, 0, 3]))
+        rows, exact = result.find('key', 'A1')
+        assert exact and list(rows) == [1, 3]
+        assert list(result.lookup('key', '7')) == [0]
+        assert len(result.lookup('key', 'missing')) == 0
+        assert 'key' in result._indexes
+        rows, exact = result.find('key', 'a')
+        assert not exact and list(rows) == [1, 3]
+        assert list(result.contains('key', '1')) == [1, 3, 4]
+
+    def test_to_csv_in_chunks(self, tmp_path):
+        """The export writes all rows chunk by chunk and leaves out excluded columns."""
+        df = pd.DataFrame({'a': range(5), 'b': list('vwxyz')})
+        path = tmp_path / 'out.csv'
+        RowsResult(df, np.array([4, 0, 2])).to_csv(str(path), exclude_columns=['b'], chunk_rows=2)
+        assert path.read_text(encoding='latin1').splitlines() == ['a', '4', '0', '2']
+
+    def test_to_csv_reports_rows_written(self, tmp_path):
+        """The export reports the rows written after every chunk."""
+        written = []
+        RowsResult(pd.DataFrame({'a': range(5)})).to_csv(str(tmp_path / 'out.csv'), chunk_rows=2, progress=written.append)
+        assert written == [2, 4, 5]
+
+
+class TestLazyResult:
+    """Test cases for LazyResult."""
+
+    def test_rows_are_ready(self):
+        """Row results are available at once, as they only hold positions."""
+        df = pd.DataFrame({'a': range(10)})
+        result = LazyResult.rows(df, np.array([1, 3, 5, 7]))
+        assert result.count == 4 and result.is_built
+        assert list(result.sample(2).column('a')) == [1, 3]
+        assert list(result.result().frame()['a']) == [1, 3, 5, 7]
+
+    def test_result_is_built_once(self):
+        """The build function runs only on first use and sets the count."""
+        build = Mock(return_value=RowsResult(pd.DataFrame({'a': [1, 2]})))
+        result = LazyResult(build)
+        assert result.count is None and result.sample(5) is None
+        result.result()
+        result.result()
+        build.assert_called_once_with(None)
+        assert result.count == 2
+
+    def test_result_passes_progress_to_build(self):
+        """A progress callback given to result() reaches the build function."""
+        fractions = []
+
+        def build(progress):
+            progress(0.5)
+            return RowsResult(pd.DataFrame({'a': [1]}))
+
+        LazyResult(build).result(fractions.append)
+        assert fractions == [0.5]
@@ -0,0 +1,48 @@
+"""
+Tests for the compare result cache in result_cache.py
+"""
+import os
+import pandas as pd
+from csvlotte.utils.result_cache import ResultCache, file_fingerprint, rows_fingerprint
+
+
+class TestResultCache:
+    """Test cases for ResultCache and file_fingerprint."""
+
+    def test_fingerprint_changes_with_file(self, tmp_path):
+        """A rewritten file gets a new fingerprint; missing files have none."""
+        path = tmp_path / 'a.csv'
+        path.write_text('id\n1\n')
+        first = file_fingerprint(str(path), ';', 'latin1')
+        path.write_text('id\n1\n2\n')
+        os.utime(path, ns=(first[2] + 10 ** 9, first[2] + 10 ** 9))
+        assert file_fingerprint(str(path), ';', 'latin1') != first
+        assert file_fingerprint(str(path), ',', 'latin1') != file_fingerprint(str(path), ';', 'latin1')
+        assert file_fingerprint(str(tmp_path / 'missing.csv'), ';', 'latin1') is None
+
+    def test_rows_fingerprint_follows_the_rows(self):
+        """Frames with the same rows of a file share a fingerprint; other rows of the same count do not."""
+        df = pd.DataFrame({'id': [1, 2, 3, 4]})
+        assert rows_fingerprint(df) == rows_fingerprint(df.copy())
+        assert rows_fingerprint(df[df['id'] > 1]) == rows_fingerprint(df.iloc[1:].copy())
+        assert rows_fingerprint(df[df['id'] != 2]) != rows_fingerprint(df[df['id'] != 3])
+
+    def test_memory_entries_are_bounded(self, tmp_path):
+        """Only max_entries results are kept in memory, and nothing is written without persist."""
+        cache = ResultCache(max_entries=2, cache_dir=str(tmp_path))
+        for i in range(3):
+            cache.put(('key', i), i)
+        assert cache.get(('key', 0)) is None
+        assert cache.get(('key', 2)) == 2
+        assert list(tmp_path.iterdir()) == []
+
+    def test_disk_entries_survive_sessions(self, tmp_path):
+        """Persisted results are found by a new cache; the oldest files are pruned."""
+        cache = ResultCache(cache_dir=str(tmp_path), disk_entries=2)
+        for i in range(3):
+            cache.put(('key', i, (1, None)), [i], persist=True)
+            os.utime(cache._path(('key', i, (1, None))), (i, i))
+        later = ResultCache(cache_dir=str(tmp_path))
+        assert later.get(('key', 2, (1, None))) == [2]
+        assert later.get(('key', 0, (1, None))) is None
+        assert len(list(tmp_path.iterdir())) == 2
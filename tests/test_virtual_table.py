@@ -0,0 +1,19 @@
+"""
+Tests for the row window of the virtual result table in virtual_table.py
+"""
+from csvlotte.views.virtual_table import visible_window
+
+
+class TestVisibleWindow:
+    """Test cases for visible_window."""
+
+    def test_buffer_around_visible_rows(self):
+        """The visible rows are held with a buffer on both sides."""
+        assert visible_window(1000, 30, 1_000_000, 200) == (800, 1230)
+
+    def test_clipped_at_both_ends(self):
+        """The window never reaches beyond the result, and scrolling past the end shows the last rows."""
+        assert visible_window(0, 30, 1_000_000, 200) == (0, 230)
+        assert visible_window(999_990, 30, 1_000_000, 200) == (999_770, 1_000_000)
+        assert visible_window(0, 30, 10, 200) == (0, 10)
+        assert visible_window(0, 30, 0, 200) == (0, 0)